@@ -0,0 +1,275 @@
+"""
+근사 최근접 이웃(ANN) 인덱스 (중복 검사용)
+- IvfIndex: NumPy 구현 IVF (구면 k-means 분할 + nprobe개 리스트만 탐색)
+- HnswIndex: hnswlib 설치 시 사용 가능한 네이티브 백엔드 (선택)
+- 공통 API: add(ids, vectors) / search(queries, k) / max_similarity(queries) / save / load
+- 후보 점수는 원본 벡터 내적(정확한 코사인)이라 재정렬 오차 없음, 놓치는 경우만 근사
+- IVF 중심점은 학습 시점보다 ANN_RETRAIN_FACTOR배 커지면 전체 벡터로 재학습
+"""
+import logging
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # 선택 의존성
+    hnswlib = None
+
+from config import ANN_BACKEND, ANN_NPROBE, ANN_RETRAIN_FACTOR, LOG_FORMAT, LOG_LEVEL
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+
+def _as_matrix(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors[None, :] if vectors.ndim == 1 else vectors
+
+
+class IvfIndex:
+    """NumPy IVF-Flat 인덱스 (내적 = 코사인, 입력은 정규화 벡터)"""
+
+    backend = "ivf"
+
+    def __init__(self, dim: int, nlist: Optional[int] = None, nprobe: int = ANN_NPROBE,
+                 seed: int = 0, train_iters: int = 10, retrain_factor: float = ANN_RETRAIN_FACTOR):
+        self.dim = dim
+        self.fixed_nlist = nlist
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+        self.train_iters = train_iters
+        self.retrain_factor = retrain_factor
+        self.trained_size = 0
+        self.centroids: Optional[np.ndarray] = None
+        self.list_vectors: list = []
+        self.list_ids: list = []
+
+    def __len__(self) -> int:
+        return int(sum(len(ids) for ids in self.list_ids))
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray) -> None:
+        """구면 k-means로 중심점 학습 (표본 최대 nlist × 64개)"""
+        vectors = _as_matrix(vectors)
+        n = len(vectors)
+        nlist = self.fixed_nlist or int(np.clip(4 * np.sqrt(n), 16, 4096))
+        nlist = max(1, min(nlist, n))
+        rng = np.random.default_rng(self.seed)
+
+        sample = vectors[rng.choice(n, size=min(n, nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(self.train_iters):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+                else:
+                    centroids[c] = sample[rng.integers(len(sample))]  # 빈 클러스터 재시드
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids /= norms
+
+        self.nlist = nlist
+        self.trained_size = n
+        self.centroids = centroids.astype(np.float32)
+        self.list_vectors = [np.zeros((0, self.dim), dtype=np.float32) for _ in range(nlist)]
+        self.list_ids = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """증분 추가 (미학습 상태면 이번 벡터로 학습, 학습 시점보다 retrain_factor배 커지면 재학습)"""
+        vectors = _as_matrix(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0:
+            return
+        if not self.is_trained:
+            self.train(vectors)
+        elif self.retrain_factor and len(self) + len(ids) >= self.retrain_factor * max(self.trained_size, 1):
+            # 초기 표본으로 잡은 중심점/리스트 수가 커진 이력을 대표하지 못함 → 전체로 다시 분할
+            ids = np.concatenate(self.list_ids + [ids])
+            vectors = np.vstack(self.list_vectors + [vectors])
+            before = self.trained_size
+            self.train(vectors)
+            logger.info(f"🧭 IVF 재학습: {before}개 → {len(ids)}개 기준 (nlist {self.nlist})")
+
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        for c in np.unique(assign):
+            mask = assign == c
+            self.list_vectors[c] = np.vstack([self.list_vectors[c], vectors[mask]])
+            self.list_ids[c] = np.concatenate([self.list_ids[c], ids[mask]])
+
+    def remove(self, ids: np.ndarray) -> None:
+        """id 삭제 (해당 리스트만 필터링)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        for c in range(len(self.list_ids)):
+            keep = ~np.isin(self.list_ids[c], ids)
+            if not keep.all():
+                self.list_vectors[c] = self.list_vectors[c][keep]
+                self.list_ids[c] = self.list_ids[c][keep]
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """질의별 상위 k (점수, id), 후보가 모자라면 점수 -inf / id -1"""
+        queries = _as_matrix(queries)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        labels = np.full((len(queries), k), -1, dtype=np.int64)
+        if not self.is_trained or len(self) == 0:
+            return scores, labels
+
+        nprobe = min(self.nprobe, self.nlist)
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+
+        for qi, query in enumerate(queries):
+            lists = [c for c in probes[qi] if len(self.list_ids[c])]
+            if not lists:
+                continue
+            cand_vectors = np.vstack([self.list_vectors[c] for c in lists])
+            cand_ids = np.concatenate([self.list_ids[c] for c in lists])
+            sims = cand_vectors @ query
+
+            top = min(k, len(sims))
+            best = np.argpartition(-sims, top - 1)[:top]
+            best = best[np.argsort(-sims[best])]
+            scores[qi, :top] = sims[best]
+            labels[qi, :top] = cand_ids[best]
+
+        return scores, labels
+
+    def max_similarity(self, queries: np.ndarray) -> np.ndarray:
+        scores, _ = self.search(queries, k=1)
+        return np.where(np.isfinite(scores[:, 0]), scores[:, 0], 0.0).astype(np.float32)
+
+    def save(self, path: Path) -> None:
+        sizes = np.array([len(ids) for ids in self.list_ids], dtype=np.int64)
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                sizes=sizes,
+                vectors=np.vstack(self.list_vectors) if len(self) else np.zeros((0, self.dim), np.float32),
+                ids=np.concatenate(self.list_ids) if len(self) else np.zeros(0, np.int64),
+                nprobe=np.array(self.nprobe),
+                trained_size=np.array(self.trained_size)
+            )
+
+    def load(self, path: Path) -> None:
+        with np.load(path) as data:
+            self.centroids = data["centroids"]
+            self.nlist = len(self.centroids)
+            offsets = np.concatenate([[0], np.cumsum(data["sizes"])])
+            vectors, ids = data["vectors"], data["ids"]
+            self.list_vectors = [vectors[offsets[i]:offsets[i + 1]] for i in range(self.nlist)]
+            self.list_ids = [ids[offsets[i]:offsets[i + 1]] for i in range(self.nlist)]
+            self.trained_size = int(data["trained_size"]) if "trained_size" in data else len(ids)
+
+
+class HnswIndex:
+    """hnswlib HNSW 인덱스 (pip install hnswlib 필요)"""
+
+    backend = "hnsw"
+
+    def __init__(self, dim: int, ef: int = 64, m: int = 16, ef_construction: int = 200):
+        if hnswlib is None:
+            raise ImportError("hnswlib 미설치: pip install hnswlib")
+        self.dim = dim
+        self.ef = ef
+        self.m = m
+        self.ef_construction = ef_construction
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(max_elements=1024, ef_construction=ef_construction, M=m)
+        self.index.set_ef(ef)
+        self.deleted: set = set()
+
+    def __len__(self) -> int:
+        return self.index.get_current_count() - len(self.deleted)
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        vectors = _as_matrix(vectors)
+        if len(vectors) == 0:
+            return
+        needed = self.index.get_current_count() + len(vectors)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, self.index.get_max_elements() * 2))
+
+        ids = np.asarray(ids, dtype=np.int64)
+        for label in set(ids.tolist()) & self.deleted:
+            self.index.unmark_deleted(label)  # 같은 id 재추가 시 벡터 교체
+            self.deleted.discard(label)
+        self.index.add_items(vectors, ids)
+
+    def remove(self, ids: np.ndarray) -> None:
+        for label in np.asarray(ids, dtype=np.int64):
+            try:
+                self.index.mark_deleted(int(label))
+                self.deleted.add(int(label))
+            except RuntimeError:
+                pass  # 없는 id
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        queries = _as_matrix(queries)
+        if len(self) == 0:
+            return (np.full((len(queries), k), -np.inf, dtype=np.float32),
+                    np.full((len(queries), k), -1, dtype=np.int64))
+        k_eff = min(k, len(self))
+        labels, distances = self.index.knn_query(queries, k=k_eff)
+        return (1.0 - distances).astype(np.float32), labels.astype(np.int64)
+
+    def max_similarity(self, queries: np.ndarray) -> np.ndarray:
+        scores, _ = self.search(queries, k=1)
+        return np.where(np.isfinite(scores[:, 0]), scores[:, 0], 0.0).astype(np.float32)
+
+    def save(self, path: Path) -> None:
+        """hnswlib 인덱스 + 삭제 표시 id를 파일 1개(npz)로 (hnswlib은 삭제 목록을 조회할 API가 없음)"""
+        path = Path(path)
+        fd, raw_path = tempfile.mkstemp(dir=path.parent, suffix=".hnsw.part")
+        os.close(fd)
+        try:
+            self.index.save_index(raw_path)
+            raw = np.fromfile(raw_path, dtype=np.uint8)
+        finally:
+            Path(raw_path).unlink(missing_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, hnsw=raw, deleted=np.array(sorted(self.deleted), dtype=np.int64))
+
+    def load(self, path: Path) -> None:
+        path = Path(path)
+        self.index = hnswlib.Index(space="ip", dim=self.dim)
+        try:
+            with np.load(path) as data:
+                raw, deleted = data["hnsw"], data["deleted"]
+        except (ValueError, KeyError, zipfile.BadZipFile):
+            # 이전 형식 (hnswlib 파일 그대로): 삭제 목록 없음 → 개수가 안 맞으면 저장소가 재구축
+            self.index.load_index(str(path))
+            self.index.set_ef(self.ef)
+            self.deleted = set()
+            return
+
+        fd, raw_path = tempfile.mkstemp(dir=path.parent, suffix=".hnsw.part")
+        os.close(fd)
+        try:
+            raw.tofile(raw_path)
+            self.index.load_index(raw_path)
+        finally:
+            Path(raw_path).unlink(missing_ok=True)
+        self.index.set_ef(self.ef)
+        self.deleted = set(deleted.tolist())
+
+
+def build_index(dim: int, backend: str = ANN_BACKEND):
+    """설정된 백엔드로 인덱스 생성 ('exact'면 None, hnswlib 없으면 IVF로 대체)"""
+    if backend == "exact":
+        return None
+    if backend == "hnsw":
+        if hnswlib is not None:
+            return HnswIndex(dim)
+        logger.warning("⚠️ hnswlib 미설치 → IVF 인덱스 사용")
+    return IvfIndex(dim)
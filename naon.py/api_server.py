@@ -26,7 +26,8 @@ from smart_curator import SmartCurator
 from shorts_generator import generate_shorts
 from persona_manager import persona_manager
 from sentiment_analyzer import SentimentAnalyzer
-from trend_analyzer import TrendAnalyzer
+from trend_snapshot import get_trend_snapshots
+from trend_stream import get_trend_stream
 from upload_scheduler import UploadScheduler
 from performance_tracker import PerformanceTracker
 
@@ -57,8 +58,7 @@ def initialize():
     if not _initialized:
         logger.info("🚀 Flask 초기화")
         persona_manager.fetch_all_personas()
-        analyzer = TrendAnalyzer(DB_ENGINE)
-        analyzer.analyze_recent_trends(days=7)
+        get_trend_snapshots(DB_ENGINE).get(days=7)  # 큐레이터/트렌드 API와 공유
         logger.info("✅ 초기화 완료")
         _initialized = True
 
@@ -129,12 +129,14 @@ def run_premium_curate() -> Dict[str, Any]:
         agro_count: int = data.get('agro_count', 1)
         info_count: int = data.get('info_count', 1)
         min_quality: float = data.get('min_quality_score', 6.0)
+        full_refresh: bool = bool(data.get('full_refresh', False))
 
         curator = SmartCurator(DB_ENGINE)
         result = curator.curate_premium(
             agro_count=agro_count,
             info_count=info_count,
-            min_quality_score=min_quality
+            min_quality_score=min_quality,
+            full_refresh=full_refresh
         )
 
         return jsonify({
@@ -189,17 +191,32 @@ def api_generate_shorts() -> Dict[str, Any]:
 
 @app.route('/api/trends', methods=['GET'])
 def get_trends() -> Dict[str, Any]:
-    """트렌드 분석"""
+    """트렌드 분석 (공유 스냅샷, TTL 안에서는 재계산 없음)"""
     try:
         days = int(request.args.get('days', 7))
-        analyzer = TrendAnalyzer(DB_ENGINE)
-        trends = analyzer.analyze_recent_trends(days=days)
-        return jsonify({"success": True, "data": trends[:20]})
+        snapshot = get_trend_snapshots(DB_ENGINE).get(days=days)
+        return jsonify({"success": True, "data": snapshot.trends[:20], "version": snapshot.version})
     except Exception as e:
         logger.error(f"❌ 트렌드 실패: {e}", exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route('/api/trends/live', methods=['GET'])
+def get_live_trends() -> Dict[str, Any]:
+    """실시간 트렌드 (감쇠 top-k, 메인 루프가 저장한 상태를 읽음)"""
+    try:
+        limit = int(request.args.get('limit', 20))
+        stream = get_trend_stream(DB_ENGINE)
+        stream.load()
+        # 메인 루프가 돌지 않으면 (상태가 없거나 오래됨) 여기서 직접 갱신
+        if stream.state_age() > 2 * stream.save_interval:
+            stream.sync()
+        return jsonify({"success": True, "data": stream.top(limit)})
+    except Exception as e:
+        logger.error(f"❌ 실시간 트렌드 실패: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @app.route('/api/queue', methods=['GET'])
 def get_queue() -> Dict[str, Any]:
     """큐 목록"""
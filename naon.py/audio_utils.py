@@ -0,0 +1,186 @@
+"""
+오디오 유틸리티 (외부 프로세스 없이 in-process 처리)
+- MP3 프레임 헤더 파싱으로 재생 길이 계산
+- WAV 길이 계산
+- PCM 템포 변경 (WSOLA, 음정 유지)
+"""
+import logging
+import wave
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config import LOG_FORMAT, LOG_LEVEL
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+# MPEG 비트레이트 테이블 (kbps)
+_BITRATES = {
+    ("1", 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    ("1", 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    ("2", 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    ("2", 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+_SAMPLE_RATES = {
+    "1": [44100, 48000, 32000],
+    "2": [22050, 24000, 16000],
+    "2.5": [11025, 12000, 8000],
+}
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """ID3v2 태그 크기만큼 건너뛸 오프셋"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def mp3_duration(path: Path) -> Optional[float]:
+    """MP3 프레임을 순회하며 재생 길이(초) 계산 (CBR/VBR 모두 정확)"""
+    try:
+        data = Path(path).read_bytes()
+    except OSError as e:
+        logger.warning(f"MP3 읽기 실패: {e}")
+        return None
+
+    pos = _skip_id3v2(data)
+    total_samples = 0
+    sample_rate = 0
+    end = len(data) - 4
+
+    while pos <= end:
+        if data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+            pos += 1
+            continue
+
+        b1, b2 = data[pos + 1], data[pos + 2]
+        version_bits = (b1 >> 3) & 0x03
+        layer_bits = (b1 >> 1) & 0x03
+        bitrate_idx = (b2 >> 4) & 0x0F
+        sr_idx = (b2 >> 2) & 0x03
+        padding = (b2 >> 1) & 0x01
+
+        version = {0: "2.5", 2: "2", 3: "1"}.get(version_bits)
+        layer = {1: 3, 2: 2}.get(layer_bits)
+        if version is None or layer is None or bitrate_idx in (0, 15) or sr_idx == 3:
+            pos += 1
+            continue
+
+        bitrate = _BITRATES[("1" if version == "1" else "2", layer)][bitrate_idx] * 1000
+        sr = _SAMPLE_RATES[version][sr_idx]
+
+        if layer == 3 and version != "1":
+            samples, coef = 576, 72
+        else:
+            samples, coef = 1152, 144
+
+        frame_len = coef * bitrate // sr + padding
+        if frame_len <= 4:
+            pos += 1
+            continue
+
+        total_samples += samples
+        sample_rate = sr
+        pos += frame_len
+
+    if not sample_rate:
+        return None
+    return total_samples / sample_rate
+
+
+def wav_duration(path: Path) -> Optional[float]:
+    """WAV 재생 길이(초)"""
+    try:
+        with wave.open(str(path), "rb") as wf:
+            return wf.getnframes() / float(wf.getframerate())
+    except (OSError, wave.Error) as e:
+        logger.warning(f"WAV 읽기 실패: {e}")
+        return None
+
+
+def probe_duration(path: Path) -> Optional[float]:
+    """확장자 기준 재생 길이 계산 (ffprobe 불필요)"""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".wav":
+        return wav_duration(path)
+    if suffix == ".mp3":
+        return mp3_duration(path)
+    return None
+
+
+def time_stretch(
+        samples: np.ndarray,
+        rate: float,
+        sample_rate: int,
+        frame_ms: float = 40.0,
+        search_ms: float = 10.0
+) -> np.ndarray:
+    """
+    WSOLA 템포 변경 (rate > 1 이면 빨라짐, 음정 유지)
+
+    samples: (n,) 또는 (n, channels) float PCM
+    """
+    if abs(rate - 1.0) < 1e-3 or len(samples) == 0:
+        return samples
+
+    mono_input = samples.ndim == 1
+    pcm = samples[:, None] if mono_input else samples
+    n, channels = pcm.shape
+
+    frame = max(64, int(sample_rate * frame_ms / 1000))
+    hop = frame // 2
+    tol = max(1, int(sample_rate * search_ms / 1000))
+    window = np.hanning(frame)
+
+    # 탐색 구간이 경계를 넘지 않도록 앞뒤 패딩
+    padded = np.pad(pcm, ((tol, frame + 2 * tol + hop), (0, 0)))
+    guide = padded.mean(axis=1)
+
+    out_len = int(n / rate)
+    out = np.zeros((out_len + frame, channels))
+    norm = np.zeros(out_len + frame)
+
+    prev = tol
+    k = 0
+    while True:
+        out_pos = k * hop
+        nominal = int(round(out_pos * rate)) + tol
+        if out_pos >= out_len or nominal - tol >= n:
+            break
+
+        if k == 0:
+            pos = nominal
+        else:
+            # 직전 프레임의 자연스러운 연속 구간과 가장 비슷한 위치 선택
+            target = guide[prev + hop: prev + hop + frame]
+            lo = nominal - tol
+            region = guide[lo: nominal + tol + frame]
+            corr = np.correlate(region, target, mode="valid")
+            pos = lo + int(np.argmax(corr))
+
+        out[out_pos: out_pos + frame] += padded[pos: pos + frame] * window[:, None]
+        norm[out_pos: out_pos + frame] += window
+        prev = pos
+        k += 1
+
+    norm[norm < 1e-8] = 1.0
+    result = (out / norm[:, None])[:out_len]
+    return result[:, 0] if mono_input else result
+
+
+def apply_tempo(clip, rate: float):
+    """moviepy AudioClip에 PCM 템포 적용 (서브프로세스 없이 메모리에서 처리)"""
+    if abs(rate - 1.0) < 1e-3:
+        return clip
+
+    from moviepy.audio.AudioClip import AudioArrayClip
+
+    fps = int(getattr(clip, "fps", None) or 44100)
+    samples = clip.to_soundarray(fps=fps)
+    stretched = time_stretch(samples, rate, fps)
+    return AudioArrayClip(np.clip(stretched, -1.0, 1.0), fps=fps)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+중복 검사 ANN 벤치마크 (recall vs latency)
+- 토픽 군집형 합성 임베딩(정규화)으로 제작 이력 N개 생성
+- 질의: 절반은 이력의 근접 중복(코사인 0.90 이상), 절반은 새 글
+- 전수 비교(exact) 대비 IVF(nprobe별) / HNSW(설치 시)의
+  recall@1, SIMILARITY_THRESHOLD 중복 판정 일치율, 질의당 지연 비교
+
+Usage:
+    python bench_ann.py [--size 100000] [--dim 384] [--queries 400] [--nprobe 4,8,16,32]
+"""
+import argparse
+import time
+from typing import Dict, Any, List
+
+import numpy as np
+
+from ann_index import IvfIndex, HnswIndex, hnswlib
+from config import SIMILARITY_THRESHOLD
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return (x / np.linalg.norm(x, axis=-1, keepdims=True)).astype(np.float32)
+
+
+def make_corpus(size: int, dim: int, topics: int, seed: int) -> np.ndarray:
+    """토픽 중심 + 잡음 (같은 토픽 코사인 ~0.5, 실제 SBERT 분포와 비슷한 군집)"""
+    rng = np.random.default_rng(seed)
+    centers = _normalize(rng.normal(size=(topics, dim)))
+    assign = rng.integers(topics, size=size)
+    noise = _normalize(rng.normal(size=(size, dim)))
+    return _normalize(centers[assign] + 1.0 * noise)
+
+
+def make_queries(corpus: np.ndarray, count: int, seed: int) -> np.ndarray:
+    """근접 중복(코사인 0.90~0.98) 절반 + 새 글 절반"""
+    rng = np.random.default_rng(seed + 1)
+    dim = corpus.shape[1]
+    n_dup = count // 2
+
+    base = corpus[rng.integers(len(corpus), size=n_dup)]
+    target_cos = rng.uniform(0.90, 0.98, size=(n_dup, 1))
+    ortho = rng.normal(size=(n_dup, dim))
+    ortho -= (ortho * base).sum(axis=1, keepdims=True) * base
+    ortho = _normalize(ortho)
+    dups = _normalize(target_cos * base + np.sqrt(1 - target_cos ** 2) * ortho)
+
+    fresh = make_corpus(count - n_dup, dim, topics=64, seed=seed + 2)
+    return np.vstack([dups, fresh])
+
+
+def evaluate(name: str, index, queries: np.ndarray, exact_scores: np.ndarray,
+             exact_ids: np.ndarray, threshold: float) -> Dict[str, Any]:
+    latencies = []
+    scores = np.zeros(len(queries), dtype=np.float32)
+    ids = np.zeros(len(queries), dtype=np.int64)
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        s, l = index.search(query, k=1)
+        latencies.append(time.perf_counter() - started)
+        scores[i], ids[i] = s[0, 0], l[0, 0]
+
+    exact_dup = exact_scores > threshold
+    ann_dup = scores > threshold
+    return {
+        "name": name,
+        "recall@1": float(np.mean(ids == exact_ids)),
+        "dup_recall": float(np.mean(ann_dup[exact_dup])) if exact_dup.any() else 1.0,
+        "agreement": float(np.mean(ann_dup == exact_dup)),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000)
+    }
+
+
+def run_benchmark(size: int, dim: int, queries: int, nprobes: List[int],
+                  threshold: float, seed: int) -> Dict[str, Any]:
+    corpus = make_corpus(size, dim, topics=max(16, size // 200), seed=seed)
+    qs = make_queries(corpus, queries, seed)
+    ids = np.arange(size, dtype=np.int64)
+
+    # 전수 비교 기준값
+    latencies = []
+    exact_scores = np.zeros(len(qs), dtype=np.float32)
+    exact_ids = np.zeros(len(qs), dtype=np.int64)
+    for i, query in enumerate(qs):
+        started = time.perf_counter()
+        sims = corpus @ query
+        best = int(np.argmax(sims))
+        latencies.append(time.perf_counter() - started)
+        exact_scores[i], exact_ids[i] = sims[best], best
+
+    rows = [{
+        "name": "exact", "recall@1": 1.0, "dup_recall": 1.0, "agreement": 1.0,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000)
+    }]
+    build = {}
+
+    started = time.perf_counter()
+    ivf = IvfIndex(dim, seed=seed)
+    ivf.add(ids, corpus)
+    build["ivf"] = time.perf_counter() - started
+    for nprobe in nprobes:
+        ivf.nprobe = nprobe
+        rows.append(evaluate(f"ivf nprobe={nprobe}", ivf, qs, exact_scores, exact_ids, threshold))
+
+    if hnswlib is not None:
+        started = time.perf_counter()
+        hnsw = HnswIndex(dim)
+        hnsw.add(ids, corpus)
+        build["hnsw"] = time.perf_counter() - started
+        rows.append(evaluate("hnsw ef=64", hnsw, qs, exact_scores, exact_ids, threshold))
+
+    return {
+        "size": size, "dim": dim, "queries": len(qs), "threshold": threshold,
+        "duplicates": int((exact_scores > threshold).sum()),
+        "nlist": ivf.nlist, "build_seconds": build, "rows": rows
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="중복 검사 ANN recall/latency 벤치마크")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--nprobe", default="4,8,16,32")
+    parser.add_argument("--threshold", type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        args.size, args.dim, args.queries,
+        [int(n) for n in args.nprobe.split(",")], args.threshold, args.seed
+    )
+
+    print(f"\n{'=' * 72}")
+    print(f"ANN 벤치마크: 이력 {report['size']:,}개 × {report['dim']}차원, 질의 {report['queries']}개 "
+          f"(중복 {report['duplicates']}개, 임계값 {report['threshold']:.2f}), nlist={report['nlist']}")
+    print(f"구축 시간: " + ", ".join(f"{k} {v:.1f}s" for k, v in report["build_seconds"].items()))
+    print(f"{'=' * 72}")
+    print(f"{'index':<16} {'recall@1':>9} {'dup_recall':>11} {'agree':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for r in report["rows"]:
+        print(f"{r['name']:<16} {r['recall@1']:>9.3f} {r['dup_recall']:>11.3f} {r['agreement']:>7.3f} "
+              f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+큐레이션 end-to-end 벤치마크 (합성 게시판 코퍼스)
+- 로컬 PostgreSQL의 별도 벤치 DB에 AI_BOARD / AI_REPLY / shorts_queue 합성 코퍼스 생성 (COPY)
+  · 한국어 70% / 영어 30% 문장 풀에서 조합, 본문 길이 로그정규 (수십 ~ 수천 자)
+  · 게시글당 댓글 수 음이항 분포 (0개 많고 꼬리 김), 조회수는 댓글 수와 상관
+  · 일부는 제작 이력(status=1) / 대기(0) / 실패(2), 제작본의 재게시글 섞음
+- SmartCurator.curate_premium, TwoTrackCurator.curate를 시나리오별 별도 프로세스에서 실행
+  · 1회차 = 콜드 (빈 캐시 + 모델 로드), 이후 회차 = 웜 (--churn이면 회차 사이 새 글/댓글 주입)
+  · 회차별 wall time, DB 왕복(cursor execute 수), 인코더 호출/문장 수/시간, RSS
+- 결과는 jsonl 이력에 누적, 같은 코퍼스(크기/시드)의 직전 기록과 비교 출력
+
+Usage:
+    python bench_curation.py [--posts 10000] [--replies-per-post 8] [--db naon_bench]
+                             [--runs 2] [--churn 50] [--reseed] [--label 메모]
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing as mp
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import sqlalchemy
+from sqlalchemy.engine import Engine, make_url
+
+from config import BASE_DIR, DB_CONNECTION_STRING, EMBEDDING_BACKEND
+
+DEFAULT_HISTORY = BASE_DIR / "cache" / "bench_curation.jsonl"
+BENCH_CACHE_DIR = BASE_DIR / "cache" / "bench"
+
+CORPUS_DDL = [
+    "DROP TABLE IF EXISTS AI_BOARD, AI_REPLY, shorts_queue, reply_sentiment, keyword_trends, "
+    "board_stats, sync_watermarks, keyword_rollups, keyword_rollup_posts, board_keywords, board_keywords_indexed, bench_corpus CASCADE",
+    """
+    CREATE TABLE AI_BOARD (
+        bno BIGINT PRIMARY KEY, title TEXT, content TEXT, shorts_script TEXT,
+        hit INT, p_id TEXT, writer TEXT, regdate TIMESTAMP
+    )
+    """,
+    "CREATE TABLE AI_REPLY (rno BIGINT PRIMARY KEY, bno BIGINT, content TEXT, regdate TIMESTAMP)",
+    """
+    CREATE TABLE shorts_queue (
+        bno BIGINT, status INT, priority INT DEFAULT 0,
+        quality_score FLOAT DEFAULT 0, video_path TEXT
+    )
+    """,
+    "CREATE TABLE reply_sentiment (rno BIGINT PRIMARY KEY, sentiment TEXT, score FLOAT, analyzed_date TIMESTAMP)",
+    """
+    CREATE TABLE keyword_trends (
+        keyword TEXT PRIMARY KEY, frequency INT, avg_hit FLOAT,
+        avg_reply_count FLOAT, trend_score FLOAT, last_seen TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE bench_corpus (
+        posts INT, replies BIGINT, produced INT, seed INT,
+        dirty BOOLEAN DEFAULT FALSE, created_at TIMESTAMP DEFAULT NOW()
+    )
+    """,
+]
+
+# ===============================
+# 합성 텍스트
+# ===============================
+KO_SUBJECTS = ["오픈AI", "엔비디아", "구글", "삼성전자", "SK하이닉스", "메타", "애플",
+               "마이크로소프트", "네이버", "카카오", "테슬라", "앤트로픽", "AMD", "인텔"]
+KO_TOPICS = ["GPT-5", "HBM4", "제미나이", "AI 반도체", "자율주행", "온디바이스 AI", "오픈소스 LLM",
+             "데이터센터", "AI 규제", "로보틱스", "생성형 AI", "클라우드", "AI 에이전트", "딥러닝 칩"]
+KO_PREDICATES = ["신제품을 공개했다", "실적이 시장 예상을 웃돌았다", "대규모 투자를 발표했다",
+                 "규제 논란에 휩싸였다", "성능이 크게 향상됐다", "가격 인하를 예고했다",
+                 "양산에 들어갔다", "서비스 종료를 알렸다", "파트너십을 맺었다", "보안 문제가 드러났다"]
+KO_FILLERS = ["업계에서는 이번 발표가 시장 판도를 바꿀 것으로 보고 있다.",
+              "전문가들은 당분간 경쟁이 더 치열해질 것이라고 전망했다.",
+              "주가는 발표 직후 큰 폭으로 움직였다.",
+              "국내 기업들도 대응 전략 마련에 나섰다.",
+              "개발자 커뮤니티의 반응은 엇갈리고 있다.",
+              "자세한 내용은 다음 달 공개될 예정이다."]
+EN_SUBJECTS = ["OpenAI", "Nvidia", "Google", "Samsung", "Meta", "Apple", "Microsoft",
+               "Anthropic", "Tesla", "AMD", "Intel", "Amazon"]
+EN_TOPICS = ["GPT-5", "HBM4", "Gemini", "AI chips", "self-driving", "on-device AI", "open-source LLMs",
+             "data centers", "AI regulation", "robotics", "generative AI", "cloud pricing", "AI agents"]
+EN_PREDICATES = ["unveiled a new product", "beat market expectations", "announced a major investment",
+                 "faces regulatory pushback", "reported a big performance jump", "plans price cuts",
+                 "started mass production", "is shutting down a service", "signed a partnership"]
+EN_FILLERS = ["Analysts say the move could reshape the market.",
+              "Competition is expected to intensify over the coming months.",
+              "Shares moved sharply after the announcement.",
+              "Developers had mixed reactions online.",
+              "More details are expected next month."]
+KO_REPLIES = ["와 대박이네요 좋은 정보 감사합니다", "이건 좀 별로인 듯", "정리 깔끔하네요 최고",
+              "광고 아닌가요? 실망입니다", "다음 소식도 기대할게요", "ㅋㅋㅋ 이게 되네", "음 글쎄요",
+              "완전 유익함", "출처가 어디죠?", "주식 팔아야 하나요 ㅠㅠ"]
+EN_REPLIES = ["Great write-up, thanks!", "This is terrible news honestly", "Amazing progress, love it",
+              "Not impressed, overhyped again", "Interesting, need more data", "lol",
+              "Worst launch ever", "Super helpful summary", "Source?", "Can't wait to try this"]
+
+
+def _sentence_pool(rng: np.random.Generator, size: int, korean: bool) -> List[str]:
+    subjects, topics, predicates, fillers = (
+        (KO_SUBJECTS, KO_TOPICS, KO_PREDICATES, KO_FILLERS) if korean
+        else (EN_SUBJECTS, EN_TOPICS, EN_PREDICATES, EN_FILLERS)
+    )
+    pool = []
+    for _ in range(size):
+        s, t, p = rng.choice(subjects), rng.choice(topics), rng.choice(predicates)
+        if korean:
+            sentence = f"{s}가 {t} 관련해 {p}. {rng.choice(fillers)}"
+        else:
+            sentence = f"{s} {p} around {t}. {rng.choice(fillers)}"
+        pool.append(f"{sentence} ({rng.integers(1, 10000)})")  # 문장 단위 변이
+    return pool
+
+
+class CorpusGenerator:
+    """시드 고정 합성 코퍼스 (bno 순서 = 작성 시각 순서)"""
+
+    def __init__(self, posts: int, replies_per_post: float, seed: int, days: int = 60):
+        self.posts = posts
+        self.replies_per_post = replies_per_post
+        self.rng = np.random.default_rng(seed)
+        self.now = datetime.now().replace(microsecond=0)
+        self.days = days
+        self.pools = {True: _sentence_pool(self.rng, 3000, True), False: _sentence_pool(self.rng, 2000, False)}
+        self.next_rno = 1
+        self.produced: Dict[int, Tuple[str, str]] = {}  # 재게시 원본 (제목, 본문)
+
+    def _title(self, korean: bool) -> str:
+        rng = self.rng
+        if korean:
+            prefix = rng.choice(["", "", "[속보] ", "[단독] ", "[분석] "])
+            return f"{prefix}{rng.choice(KO_SUBJECTS)} {rng.choice(KO_TOPICS)} {rng.choice(KO_PREDICATES)}"
+        return f"{rng.choice(EN_SUBJECTS)} {rng.choice(EN_PREDICATES)} around {rng.choice(EN_TOPICS)}"
+
+    def boards(self, start: int, count: int, offsets_seconds: np.ndarray):
+        """(AI_BOARD 행, AI_REPLY 행, shorts_queue 행) 한 덩어리"""
+        rng = self.rng
+        korean = rng.random(count) < 0.7
+        sentences = np.clip(rng.lognormal(2.4, 0.8, count).astype(int), 1, 150)  # 중앙값 ~11문장
+        reply_counts = rng.negative_binomial(0.6, 0.6 / (0.6 + self.replies_per_post), count)
+        hits = (rng.lognormal(3.5, 1.1, count) * (1 + reply_counts / 4)).astype(int)
+        status = rng.choice([-1, 0, 1, 2], size=count, p=[0.95, 0.01, 0.03, 0.01])
+        reposts = rng.random(count) < 0.02
+
+        board_rows, reply_rows, queue_rows = [], [], []
+        produced_keys = list(self.produced)
+        for i in range(count):
+            bno = start + i
+            regdate = self.now - timedelta(seconds=float(offsets_seconds[i]))
+            pool = self.pools[bool(korean[i])]
+            if reposts[i] and produced_keys:
+                # 제작본을 거의 그대로 다시 올린 글 (조회수는 바이럴이라 높게)
+                title, content = self.produced[produced_keys[rng.integers(len(produced_keys))]]
+                title, content, hit = title + "!!", content + " (재업)", int(hits[i]) * 3
+            else:
+                title = self._title(bool(korean[i]))
+                content = " ".join(pool[j] for j in rng.integers(len(pool), size=int(sentences[i])))
+                hit = int(hits[i])
+            board_rows.append((bno, title, content, "", hit, "default", f"user{rng.integers(5000)}", regdate))
+
+            if status[i] >= 0:
+                queue_rows.append((bno, int(status[i]), 0, 0.0, ""))
+                if status[i] == 1:
+                    self.produced[bno] = (title, content)
+
+            n = int(reply_counts[i])
+            if n:
+                delays = np.sort(rng.exponential(6 * 3600, n))
+                replies = EN_REPLIES if rng.random() < 0.4 else KO_REPLIES
+                for delay in delays:
+                    reply_rows.append((
+                        self.next_rno, bno, replies[rng.integers(len(replies))],
+                        min(regdate + timedelta(seconds=float(delay)), self.now)
+                    ))
+                    self.next_rno += 1
+        return board_rows, reply_rows, queue_rows
+
+    def chunks(self, chunk_size: int = 20000):
+        # 오래된 글부터 bno 부여
+        offsets = np.sort(self.rng.uniform(0, self.days * 86400, self.posts))[::-1]
+        for start in range(0, self.posts, chunk_size):
+            count = min(chunk_size, self.posts - start)
+            yield self.boards(start + 1, count, offsets[start: start + count])
+
+
+# ===============================
+# 벤치 DB
+# ===============================
+def bench_url(db_name: str) -> str:
+    """운영 DB 설정(계정/호스트)을 그대로 쓰고 DB 이름만 벤치용으로 교체"""
+    url = make_url(DB_CONNECTION_STRING)
+    if db_name == url.database:
+        raise SystemExit(f"❌ 벤치 DB가 운영 DB와 같음: {db_name} (--db로 별도 DB 지정)")
+    return url.set(database=db_name).render_as_string(hide_password=False)
+
+
+def ensure_database(url: str) -> None:
+    """벤치 DB가 없으면 생성"""
+    target = make_url(url)
+    admin = sqlalchemy.create_engine(target.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as conn:
+            exists = conn.execute(
+                sqlalchemy.text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": target.database}
+            ).scalar()
+            if not exists:
+                conn.exec_driver_sql(f'CREATE DATABASE "{target.database}"')
+                print(f"🆕 벤치 DB 생성: {target.database}")
+    finally:
+        admin.dispose()
+
+
+def _copy_rows(cursor, table: str, columns: str, rows: List[tuple]) -> None:
+    if not rows:
+        return
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def corpus_info(engine: Engine) -> Dict[str, Any]:
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(sqlalchemy.text(
+                "SELECT posts, replies, produced, seed, dirty FROM bench_corpus LIMIT 1"
+            )).mappings().first()
+            return dict(row) if row else {}
+    except Exception:
+        return {}
+
+
+def seed_corpus(engine: Engine, posts: int, replies_per_post: float, seed: int) -> Dict[str, Any]:
+    """테이블 재생성 → COPY 적재 → board_stats 전체 계산 (운영에선 루프가 유지하는 상태)"""
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for ddl in CORPUS_DDL:
+            conn.exec_driver_sql(ddl)
+
+    generator = CorpusGenerator(posts, replies_per_post, seed)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for board_rows, reply_rows, queue_rows in generator.chunks():
+            _copy_rows(cursor, "AI_BOARD", "bno, title, content, shorts_script, hit, p_id, writer, regdate", board_rows)
+            _copy_rows(cursor, "AI_REPLY", "rno, bno, content, regdate", reply_rows)
+            _copy_rows(cursor, "shorts_queue", "bno, status, priority, quality_score, video_path", queue_rows)
+            raw.commit()
+            print(f"   ... 게시글 {board_rows[-1][0]:,} / {posts:,}", end="\r", flush=True)
+        cursor.close()
+    finally:
+        raw.close()
+
+    from board_stats import BoardStats, add_source_columns, create_source_indexes
+    add_source_columns(engine)  # 운영 배포의 --create-indexes 단계
+    create_source_indexes(engine)
+    BoardStats(engine).sync(full_refresh=True)  # board_stats 인덱스 + ANALYZE 포함
+
+    info = {"posts": posts, "replies": generator.next_rno - 1, "produced": len(generator.produced), "seed": seed}
+    with engine.begin() as conn:
+        conn.execute(
+            sqlalchemy.text("INSERT INTO bench_corpus (posts, replies, produced, seed) "
+                            "VALUES (:posts, :replies, :produced, :seed)"),
+            info
+        )
+    info["seed_seconds"] = round(time.perf_counter() - started, 1)
+    print(f"🌱 코퍼스 생성: 게시글 {posts:,}, 댓글 {info['replies']:,}, 제작 이력 {info['produced']:,} "
+          f"({info['seed_seconds']}s)")
+    return info
+
+
+def inject_activity(engine: Engine, posts: int, replies: int, seed: int) -> None:
+    """회차 사이 새 글/댓글 (기존 글에 댓글 몰림 = 최근 글 위주)"""
+    rng = np.random.default_rng(seed)
+    now = datetime.now().replace(microsecond=0)
+    with engine.begin() as conn:
+        max_bno = conn.execute(sqlalchemy.text("SELECT COALESCE(MAX(bno), 0) FROM AI_BOARD")).scalar()
+        max_rno = conn.execute(sqlalchemy.text("SELECT COALESCE(MAX(rno), 0) FROM AI_REPLY")).scalar()
+        conn.execute(sqlalchemy.text("UPDATE bench_corpus SET dirty = TRUE"))
+
+    pool = _sentence_pool(rng, 200, True)
+    board_rows = [
+        (max_bno + i + 1, f"새 글 {KO_SUBJECTS[i % len(KO_SUBJECTS)]} {KO_TOPICS[i % len(KO_TOPICS)]}",
+         " ".join(pool[j] for j in rng.integers(len(pool), size=15)), "", int(rng.integers(60, 500)),
+         "default", "churn", now)
+        for i in range(posts)
+    ]
+    targets = max_bno + posts - rng.geometric(0.002, replies)
+    reply_rows = [(max_rno + i + 1, int(bno), KO_REPLIES[i % len(KO_REPLIES)], now)
+                  for i, bno in enumerate(np.clip(targets, 1, None))]
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        _copy_rows(cursor, "AI_BOARD", "bno, title, content, shorts_script, hit, p_id, writer, regdate", board_rows)
+        _copy_rows(cursor, "AI_REPLY", "rno, bno, content, regdate", reply_rows)
+        raw.commit()
+        cursor.close()
+    finally:
+        raw.close()
+
+
+# ===============================
+# 측정 (시나리오별 별도 프로세스)
+# ===============================
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0  # Linux: KB
+
+
+def _worker(scenario: str, url: str, runs: int, churn: int, seed: int, out: "mp.Queue") -> None:
+    """curate 1회 = 측정 1회, 카운터는 엔진 이벤트 + 인코더 래핑"""
+    try:
+        from sqlalchemy import event
+        from embedding_service import get_embedding_service
+
+        engine = sqlalchemy.create_engine(url)
+        counters = {"db_roundtrips": 0, "encoder_calls": 0, "encoded_texts": 0, "encode_seconds": 0.0}
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count(*_args):
+            counters["db_roundtrips"] += 1
+
+        service = get_embedding_service()
+        encode = service.encode
+
+        def counting_encode(texts):
+            counters["encoder_calls"] += 1
+            counters["encoded_texts"] += len(texts)
+            started = time.perf_counter()
+            try:
+                return encode(texts)
+            finally:
+                counters["encode_seconds"] += time.perf_counter() - started
+
+        service.encode = counting_encode
+
+        if scenario == "smart":
+            from smart_curator import SmartCurator
+            curator = SmartCurator(engine)
+
+            def run():
+                result = curator.curate_premium(agro_count=2, info_count=2)
+                return len(result["agro"]) + len(result["info"])
+        else:
+            from curator import TwoTrackCurator
+            curator = TwoTrackCurator(engine)
+
+            def run():
+                return len(curator.curate(count=2))
+
+        side_engine = sqlalchemy.create_engine(url)  # 주입은 카운트 밖에서
+        results = []
+        for run_idx in range(runs):
+            if run_idx and churn:
+                inject_activity(side_engine, max(1, churn // 10), churn, seed + run_idx)
+            for key in counters:
+                counters[key] = type(counters[key])(0)
+            rss_before = _rss_mb()
+            started = time.perf_counter()
+            selected = run()
+            results.append({
+                "run": "cold" if run_idx == 0 else f"warm{run_idx}",
+                "wall_seconds": round(time.perf_counter() - started, 3),
+                "selected": selected,
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in counters.items()},
+                "rss_mb": round(_rss_mb(), 1),
+                "rss_delta_mb": round(_rss_mb() - rss_before, 1),
+                "peak_rss_mb": round(_peak_rss_mb(), 1),
+            })
+        out.put((scenario, results))
+    except Exception as e:
+        out.put((scenario, {"error": repr(e)}))
+
+
+def run_scenario(scenario: str, url: str, runs: int, churn: int, seed: int, timeout: float) -> Any:
+    ctx = mp.get_context("spawn")  # 시나리오마다 깨끗한 프로세스 (모델/캐시/RSS 분리)
+    out = ctx.Queue()
+    proc = ctx.Process(target=_worker, args=(scenario, url, runs, churn, seed, out))
+    proc.start()
+    try:
+        _, result = out.get(timeout=timeout)
+    except Exception:
+        result = {"error": f"timeout ({timeout:.0f}s) 또는 비정상 종료 (exit {proc.exitcode})"}
+    proc.join(5)
+    if proc.is_alive():
+        proc.terminate()
+    return result
+
+
+# ===============================
+# 이력
+# ===============================
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def load_previous(path: Path, record: Dict[str, Any]) -> Dict[str, Any]:
+    """같은 조건(코퍼스 크기/시드, 회차/주입량, 백엔드)의 직전 기록"""
+    previous = {}
+    if not path.exists():
+        return previous
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                line_record = json.loads(line)
+            except ValueError:
+                continue
+            same_corpus = all(
+                line_record.get("corpus", {}).get(k) == record["corpus"].get(k) for k in ("posts", "seed", "replies")
+            )
+            if same_corpus and all(line_record.get(k) == record[k] for k in ("runs", "churn", "backend")):
+                previous = line_record
+    return previous
+
+
+def append_history(path: Path, record: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _delta(now: float, before: Any) -> str:
+    if not isinstance(before, (int, float)) or not before:
+        return ""
+    return f"{(now - before) / before:+.0%}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="큐레이션 end-to-end 벤치마크 (합성 코퍼스)")
+    parser.add_argument("--posts", type=int, default=10000, help="게시글 수 (1만 ~ 100만)")
+    parser.add_argument("--replies-per-post", type=float, default=8.0, help="게시글당 평균 댓글 수")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--db", default="naon_bench", help="벤치 DB 이름 (계정/호스트는 운영 설정 사용)")
+    parser.add_argument("--reseed", action="store_true", help="같은 코퍼스가 있어도 다시 생성")
+    parser.add_argument("--scenarios", default="smart,twotrack")
+    parser.add_argument("--runs", type=int, default=2, help="시나리오별 회차 (1회차 콜드)")
+    parser.add_argument("--churn", type=int, default=50, help="웜 회차 전 주입할 새 댓글 수 (새 글은 1/10)")
+    parser.add_argument("--timeout", type=float, default=3600)
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--label", default="")
+    args = parser.parse_args()
+
+    url = bench_url(args.db)
+    ensure_database(url)
+    engine = sqlalchemy.create_engine(url)
+
+    corpus = corpus_info(engine)
+    wanted = {"posts": args.posts, "seed": args.seed}
+    if args.reseed or corpus.get("dirty") or any(corpus.get(k) != v for k, v in wanted.items()):
+        corpus = seed_corpus(engine, args.posts, args.replies_per_post, args.seed)
+    else:
+        print(f"♻️ 기존 코퍼스 재사용: 게시글 {corpus['posts']:,}, 댓글 {corpus['replies']:,}")
+    engine.dispose()
+
+    # 벤치 전용 캐시 (운영 캐시 오염 방지, 매번 콜드 시작)
+    shutil.rmtree(BENCH_CACHE_DIR, ignore_errors=True)
+    os.environ["CURATION_CACHE_DIR"] = str(BENCH_CACHE_DIR / "curation")
+    os.environ["EMBEDDING_STORE_DIR"] = str(BENCH_CACHE_DIR / "embeddings")
+    os.environ["TREND_SNAPSHOT_DIR"] = str(BENCH_CACHE_DIR / "trends")
+
+    results = {}
+    for scenario in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+        print(f"⏱️ 시나리오 실행: {scenario}")
+        results[scenario] = run_scenario(scenario, url, args.runs, args.churn, args.seed, args.timeout)
+
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "label": args.label,
+        "backend": EMBEDDING_BACKEND,
+        "corpus": {k: corpus.get(k) for k in ("posts", "replies", "produced", "seed")},
+        "runs": args.runs,
+        "churn": args.churn,
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    previous = load_previous(args.history, record)
+    append_history(args.history, record)
+
+    print(f"\n{'=' * 96}")
+    print(f"큐레이션 벤치마크: 게시글 {record['corpus']['posts']:,}, 댓글 {record['corpus']['replies']:,}, "
+          f"제작 이력 {record['corpus']['produced']:,} (backend {EMBEDDING_BACKEND}, commit {record['commit']})")
+    if previous:
+        print(f"비교 기준: {previous['timestamp']} (commit {previous.get('commit', '')})")
+    print(f"{'=' * 96}")
+    print(f"{'scenario':<10} {'run':<6} {'wall s':>8} {'Δ':>6} {'db':>6} {'enc calls':>10} {'texts':>7} "
+          f"{'enc s':>7} {'rss MB':>8} {'peak MB':>8} {'picked':>7}")
+    for scenario, runs in results.items():
+        if isinstance(runs, dict):
+            print(f"{scenario:<10} ❌ {runs['error']}")
+            continue
+        before_runs = previous.get("results", {}).get(scenario)
+        before_runs = {r["run"]: r for r in before_runs} if isinstance(before_runs, list) else {}
+        for r in runs:
+            before = before_runs.get(r["run"], {})
+            print(f"{scenario:<10} {r['run']:<6} {r['wall_seconds']:>8.2f} {_delta(r['wall_seconds'], before.get('wall_seconds')):>6} "
+                  f"{r['db_roundtrips']:>6} {r['encoder_calls']:>10} {r['encoded_texts']:>7} "
+                  f"{r['encode_seconds']:>7.2f} {r['rss_mb']:>8.1f} {r['peak_rss_mb']:>8.1f} {r['selected']:>7}")
+    print(f"\n📝 이력 기록: {args.history}\n")
+
+
+if __name__ == "__main__":
+    main()
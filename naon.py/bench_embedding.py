@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+임베딩 백엔드 parity + 성능 벤치마크 (torch fp32 vs onnx-int8)
+- parity: 라벨링된 문장 쌍 표본으로
+  · 같은 문장의 torch/onnx 벡터 코사인 (최소/평균)
+  · 쌍 유사도 차이, SIMILARITY_THRESHOLD 중복 판정 일치율, 라벨 정확도
+- 성능: 백엔드별 별도 프로세스에서 로드 시간, sentences/s, 최대 RSS
+- parity 기준 미달이면 종료 코드 1
+
+Usage:
+    python bench_embedding.py [--pairs pairs.jsonl] [--sentences 2000] [--min-cos 0.99]
+    (pairs.jsonl 한 줄: {"a": "...", "b": "...", "label": 1})
+"""
+import argparse
+import json
+import multiprocessing as mp
+import resource
+import sys
+import time
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from config import EMBEDDING_BATCH_SIZE, SIMILARITY_THRESHOLD
+
+# 기본 라벨 표본 (1 = 같은 글로 봐야 하는 중복, 0 = 다른 글)
+DEFAULT_PAIRS: List[Tuple[str, str, int]] = [
+    ("OpenAI, GPT-5 공개… 추론 성능 대폭 향상", "OpenAI가 GPT-5를 공개했다. 추론 성능이 대폭 향상됐다", 1),
+    ("엔비디아 주가 사상 최고치 경신", "엔비디아 주가, 사상 최고치를 경신하다", 1),
+    ("구글 제미나이 2.0 출시 소식 정리", "구글 제미나이 2.0 출시 소식 정리!!", 1),
+    ("삼성전자 HBM4 양산 돌입", "삼성전자가 HBM4 양산에 들어갔다", 1),
+    ("애플 인텔리전스 한국어 지원 시작", "애플 인텔리전스, 한국어 지원을 시작합니다", 1),
+    ("메타 라마 4 오픈소스 공개", "메타, 라마 4를 오픈소스로 공개", 1),
+    ("AI 반도체 전력 소모 문제 심각", "AI 반도체의 전력 소모 문제가 심각하다", 1),
+    ("Anthropic releases a new Claude model", "Anthropic has released a new Claude model", 1),
+    ("Tesla FSD v13 rolls out to more drivers", "Tesla rolls out FSD v13 to more drivers", 1),
+    ("Microsoft Copilot gets a major update", "Microsoft Copilot receives a major update", 1),
+    ("OpenAI, GPT-5 공개… 추론 성능 대폭 향상", "엔비디아 주가 사상 최고치 경신", 0),
+    ("삼성전자 HBM4 양산 돌입", "SK하이닉스 1분기 실적 발표", 0),
+    ("구글 제미나이 2.0 출시 소식 정리", "구글 클라우드 요금 인상 예고", 0),
+    ("애플 인텔리전스 한국어 지원 시작", "애플 비전 프로 판매 부진", 0),
+    ("메타 라마 4 오픈소스 공개", "메타 스레드 월간 사용자 3억 돌파", 0),
+    ("AI 반도체 전력 소모 문제 심각", "데이터센터 냉각 기술 경쟁", 0),
+    ("Anthropic releases a new Claude model", "OpenAI announces a developer conference", 0),
+    ("Tesla FSD v13 rolls out to more drivers", "Waymo expands robotaxi service to Austin", 0),
+    ("Microsoft Copilot gets a major update", "Microsoft reports quarterly cloud revenue", 0),
+    ("국내 AI 스타트업 투자 혹한기", "국내 AI 스타트업 대규모 투자 유치", 0),
+    ("개발자 채용 시장 AI 영향 분석", "AI가 개발자 채용 시장에 미치는 영향 분석", 1),
+    ("ChatGPT 무료 사용자에게 음성 모드 제공", "ChatGPT 음성 모드, 무료 사용자에게도 제공", 1),
+]
+
+
+def load_pairs(path: str) -> List[Tuple[str, str, int]]:
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                pairs.append((row["a"], row["b"], int(row["label"])))
+    return pairs
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0  # Linux: KB
+
+
+def _worker(backend: str, texts: List[str], corpus: List[str], batch_size: int, out: "mp.Queue") -> None:
+    """백엔드 1개를 별도 프로세스에서 로드 → parity 벡터 + 처리량 + RSS"""
+    try:
+        from embedding_backends import load_backend
+
+        started = time.perf_counter()
+        model = load_backend(backend)
+        model.encode(["warmup"], batch_size)
+        load_seconds = time.perf_counter() - started
+
+        vectors = model.encode(texts, batch_size)
+
+        started = time.perf_counter()
+        model.encode(corpus, batch_size)
+        elapsed = time.perf_counter() - started
+
+        out.put({
+            "backend": backend,
+            "vectors": vectors,
+            "load_seconds": load_seconds,
+            "sentences_per_second": len(corpus) / elapsed,
+            "peak_rss_mb": _peak_rss_mb()
+        })
+    except Exception as e:
+        out.put({"backend": backend, "error": repr(e)})
+
+
+def run_backend(backend: str, texts: List[str], corpus: List[str], batch_size: int) -> Dict[str, Any]:
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    proc = ctx.Process(target=_worker, args=(backend, texts, corpus, batch_size, out))
+    proc.start()
+    result = out.get()
+    proc.join()
+    return result
+
+
+def parity_report(pairs: List[Tuple[str, str, int]], texts: List[str], ref: np.ndarray,
+                  cand: np.ndarray, threshold: float) -> Dict[str, Any]:
+    index = {t: i for i, t in enumerate(texts)}
+    self_cos = (ref * cand).sum(axis=1)
+
+    a = np.array([index[p[0]] for p in pairs])
+    b = np.array([index[p[1]] for p in pairs])
+    labels = np.array([p[2] for p in pairs], dtype=bool)
+    ref_scores = (ref[a] * ref[b]).sum(axis=1)
+    cand_scores = (cand[a] * cand[b]).sum(axis=1)
+
+    ref_dup = ref_scores > threshold
+    cand_dup = cand_scores > threshold
+    return {
+        "self_cos_min": float(self_cos.min()),
+        "self_cos_mean": float(self_cos.mean()),
+        "pair_score_max_diff": float(np.abs(ref_scores - cand_scores).max()),
+        "decision_agreement": float(np.mean(ref_dup == cand_dup)),
+        "ref_duplicates": int(ref_dup.sum()),
+        "ref_label_accuracy": float(np.mean(ref_dup == labels)),
+        "cand_label_accuracy": float(np.mean(cand_dup == labels)),
+        "near_threshold": int(np.sum(np.abs(ref_scores - threshold) < 0.02))
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="임베딩 백엔드 parity/성능 벤치마크")
+    parser.add_argument("--pairs", help="라벨 쌍 jsonl (없으면 내장 표본)")
+    parser.add_argument("--reference", default="torch")
+    parser.add_argument("--candidate", default="onnx-int8")
+    parser.add_argument("--sentences", type=int, default=2000, help="처리량 측정 문장 수")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--threshold", type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument("--min-cos", type=float, default=0.99, help="같은 문장 최소 코사인")
+    parser.add_argument("--min-agreement", type=float, default=1.0, help="중복 판정 최소 일치율")
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.pairs) if args.pairs else DEFAULT_PAIRS
+    texts = sorted({t for a, b, _ in pairs for t in (a, b)})
+    corpus = [f"{texts[i % len(texts)]} ({i})" for i in range(args.sentences)]
+
+    results = {}
+    for backend in (args.reference, args.candidate):
+        results[backend] = run_backend(backend, texts, corpus, args.batch_size)
+        if "error" in results[backend]:
+            print(f"❌ {backend} 실패: {results[backend]['error']}")
+            sys.exit(2)
+
+    ref, cand = results[args.reference], results[args.candidate]
+    parity = parity_report(pairs, texts, ref["vectors"], cand["vectors"], args.threshold)
+
+    print(f"\n{'=' * 64}")
+    print(f"임베딩 백엔드 비교 ({len(pairs)}쌍 / 문장 {len(texts)}개, 처리량 {args.sentences}문장)")
+    print(f"{'=' * 64}")
+    print(f"{'backend':<12} {'load s':>8} {'sent/s':>10} {'peak RSS MB':>12}")
+    for r in (ref, cand):
+        print(f"{r['backend']:<12} {r['load_seconds']:>8.1f} {r['sentences_per_second']:>10.1f} {r['peak_rss_mb']:>12.0f}")
+
+    print(f"\nparity ({args.candidate} vs {args.reference}, 임계값 {args.threshold:.2f})")
+    print(f"  같은 문장 코사인   min {parity['self_cos_min']:.4f} / mean {parity['self_cos_mean']:.4f}")
+    print(f"  쌍 유사도 최대 차이 {parity['pair_score_max_diff']:.4f}")
+    print(f"  중복 판정 일치율   {parity['decision_agreement']:.3f} "
+          f"(기준 중복 {parity['ref_duplicates']}쌍, 임계값 ±0.02 이내 {parity['near_threshold']}쌍)")
+    print(f"  라벨 정확도        {args.reference} {parity['ref_label_accuracy']:.3f} / "
+          f"{args.candidate} {parity['cand_label_accuracy']:.3f}\n")
+
+    passed = parity["self_cos_min"] >= args.min_cos and parity["decision_agreement"] >= args.min_agreement
+    print("✅ parity 통과" if passed else "❌ parity 미달")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
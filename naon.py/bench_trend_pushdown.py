@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+트렌드 집계 푸시다운 검증 (PostgreSQL 안에서 토큰화/집계 vs 파이썬 추출기)
+- bench_curation의 합성 코퍼스(벤치 DB)에 조사/중요 키워드 경계 사례 글을 더해 비교
+- sql: PUSHDOWN_TOTALS_QUERY (키워드별 합계 행만 전송)
+- scan: N일치 게시글 전체를 읽어 TrendAnalyzer.keyword_totals
+- 키워드별 (frequency, total_hit, total_reply)가 완전히 같은지 확인, 다르면 종료 코드 1
+- 전송 행 수/바이트(본문 vs 합계 행), 파이썬 메모리 피크(tracemalloc), 시간 비교
+
+Usage:
+    python bench_trend_pushdown.py [--db naon_bench] [--posts 10000] [--days 7,30] [--repeats 3]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+from bench_curation import bench_url, corpus_info, ensure_database, seed_corpus
+from trend_analyzer import TrendAnalyzer
+
+Totals = Dict[str, Tuple[int, int, int]]
+
+# 정규식/조사 규칙이 갈리기 쉬운 글 (제목, 본문)
+EDGE_POSTS: List[Tuple[str, str]] = [
+    ("OpenAI의 ChatGPT와 GPT-4", "AI반도체 API를 LLM으로 돌렸다. xAI APIs Gemini-Pro도 비교"),
+    ("전문가들은 투자를 늘렸다", "투자는 투자의 투자로 투자에서는 사람들이 선생님들과 개발자들"),
+    ("서울로 가는 길", "서울로는 물로 칼로 사과와 수박과 나라는 사람이라는 말, 인공지능은 인공지능을 모델들"),
+    ("본문 없는 글", None),
+    (None, "제목 없는 글의 본문 NVIDIA GPU와 반도체들 학습을 딥러닝으로"),
+    ("그리고 하지만 그래서", "정말 진짜 너무 이제 때문에 경우에도 관련해서 ABC Def-2 X"),
+]
+
+
+def add_edge_posts(engine: Engine, copies: int) -> int:
+    """경계 사례 글을 현재 시각으로 추가 (코퍼스는 dirty 표시 → 다음 벤치에서 재생성)"""
+    now = datetime.now().replace(microsecond=0)
+    with engine.begin() as conn:
+        max_bno = conn.execute(sqlalchemy.text("SELECT COALESCE(MAX(bno), 0) FROM AI_BOARD")).scalar()
+        rows = [
+            {"bno": max_bno + i + 1, "title": title, "content": content, "hit": 50 + i, "regdate": now}
+            for i, (title, content) in enumerate(EDGE_POSTS * copies)
+        ]
+        conn.execute(
+            sqlalchemy.text("INSERT INTO AI_BOARD (bno, title, content, shorts_script, hit, p_id, writer, regdate) "
+                            "VALUES (:bno, :title, :content, '', :hit, 'default', 'edge', :regdate)"),
+            rows
+        )
+        conn.execute(sqlalchemy.text("UPDATE bench_corpus SET dirty = TRUE"))
+    return len(rows)
+
+
+def as_totals(rows) -> Totals:
+    return {
+        row['keyword']: (int(row['frequency']), int(row['total_hit']), int(row['total_reply']))
+        for row in rows
+    }
+
+
+def payload(engine: Engine, days: int) -> Tuple[int, int]:
+    """전체 스캔이 받는 게시글 행 수 / 제목+본문 바이트"""
+    with engine.connect() as conn:
+        row = conn.execute(sqlalchemy.text(
+            "SELECT COUNT(*), COALESCE(SUM(COALESCE(octet_length(title), 0) + COALESCE(octet_length(content), 0)), 0) "
+            "FROM AI_BOARD WHERE regdate > NOW() - make_interval(days => :days)"
+        ), {"days": days}).first()
+    return int(row[0]), int(row[1])
+
+
+def _measure(fn, repeats: int):
+    """최소 시간 + 파이썬 메모리 피크 (피크는 별도 1회, tracemalloc 오버헤드를 시간에서 제외)"""
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="트렌드 집계: PostgreSQL 푸시다운 vs 파이썬 추출기")
+    parser.add_argument("--db", default="naon_bench", help="벤치 DB 이름 (계정/호스트는 운영 설정 사용)")
+    parser.add_argument("--posts", type=int, default=10000, help="코퍼스가 없을 때 생성할 게시글 수")
+    parser.add_argument("--replies-per-post", type=float, default=8.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--days", default="7,30", help="비교할 기간 목록")
+    parser.add_argument("--edge-copies", type=int, default=20, help="경계 사례 글 반복 수")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    url = bench_url(args.db)
+    ensure_database(url)
+    engine = sqlalchemy.create_engine(url)
+
+    corpus = corpus_info(engine)
+    if not corpus or corpus.get("dirty") or corpus.get("seed") != args.seed:
+        corpus = seed_corpus(engine, args.posts, args.replies_per_post, args.seed)
+    edge = add_edge_posts(engine, args.edge_copies)
+
+    analyzer = TrendAnalyzer(engine)
+    failed = False
+    print(f"\n{'=' * 80}")
+    print(f"트렌드 집계 푸시다운: 코퍼스 게시글 {corpus['posts']:,} + 경계 사례 {edge}")
+    print(f"{'=' * 80}")
+    print(f"{'days':>4} {'path':<6} {'seconds':>8} {'rows':>9} {'bytes':>12} {'py peak MB':>11} {'keywords':>9}")
+    for days in [int(d) for d in args.days.split(",") if d.strip()]:
+        scan_seconds, scan_peak, scan_rows = _measure(lambda: analyzer._scan_keyword_totals(days), args.repeats)
+        sql_seconds, sql_peak, sql_rows = _measure(lambda: analyzer._pushdown_keyword_totals(days), args.repeats)
+        expected, actual = as_totals(scan_rows), as_totals(sql_rows)
+        mismatched = sorted(k for k in set(expected) | set(actual) if expected.get(k) != actual.get(k))
+
+        posts, text_bytes = payload(engine, days)
+        # 합계 행: 키워드 UTF-8 + 정수 3개
+        sql_bytes = sum(len(k.encode("utf-8")) + 24 for k in actual)
+        print(f"{days:>4} {'scan':<6} {scan_seconds:>8.2f} {posts:>9,} {text_bytes:>12,} "
+              f"{scan_peak / 1e6:>11.1f} {len(expected):>9,}")
+        print(f"{days:>4} {'sql':<6} {sql_seconds:>8.2f} {len(actual):>9,} {sql_bytes:>12,} "
+              f"{sql_peak / 1e6:>11.1f} {len(actual):>9,}")
+        print(f"     불일치 키워드 {len(mismatched)}개")
+        for keyword in mismatched[:10]:
+            print(f"       {keyword!r}: scan={expected.get(keyword)} sql={actual.get(keyword)}")
+        failed = failed or bool(mismatched) or not expected
+    print()
+    engine.dispose()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
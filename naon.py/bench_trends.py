@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+트렌드 키워드 집계 벤치마크 (행 루프 vs 열 단위)
+- bench_curation의 합성 코퍼스 생성기로 게시글 N개 생성 (DB 불필요)
+- 기존 방식: iterrows + extract_keywords + dict 누적
+- 열 단위: TrendAnalyzer.keyword_totals (str.findall + explode + groupby)
+- 키워드별 (frequency, total_hit, total_reply)가 완전히 같은지 확인, 다르면 종료 코드 1
+
+Usage:
+    python bench_trends.py [--posts 100000] [--seed 7] [--repeats 3]
+"""
+import argparse
+import sys
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bench_curation import CorpusGenerator
+from keyword_index import post_text
+from trend_analyzer import TrendAnalyzer
+
+Totals = Dict[str, Tuple[int, int, int]]
+
+
+def make_posts(posts: int, seed: int) -> pd.DataFrame:
+    """합성 게시글 (title, content, hit, reply_count)"""
+    generator = CorpusGenerator(posts, replies_per_post=8.0, seed=seed)
+    frames = []
+    for board_rows, reply_rows, _ in generator.chunks():
+        frame = pd.DataFrame(
+            [(r[0], r[1], r[2], r[4]) for r in board_rows], columns=["bno", "title", "content", "hit"]
+        )
+        replies = pd.Series([r[1] for r in reply_rows], dtype="int64").value_counts()
+        frame["reply_count"] = frame["bno"].map(replies).fillna(0).astype(int)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def loop_totals(analyzer: TrendAnalyzer, df: pd.DataFrame) -> Totals:
+    """기존 analyze_recent_trends의 행 단위 누적"""
+    keyword_stats = {}
+    for _, row in df.iterrows():
+        text = post_text(row['title'], row['content'])
+        for keyword in analyzer.extract_keywords(text):
+            if keyword not in keyword_stats:
+                keyword_stats[keyword] = {'frequency': 0, 'total_hit': 0, 'total_reply': 0}
+            keyword_stats[keyword]['frequency'] += 1
+            keyword_stats[keyword]['total_hit'] += row['hit']
+            keyword_stats[keyword]['total_reply'] += row['reply_count']
+    return {k: (v['frequency'], int(v['total_hit']), int(v['total_reply'])) for k, v in keyword_stats.items()}
+
+
+def vectorized_totals(analyzer: TrendAnalyzer, df: pd.DataFrame) -> Totals:
+    totals = analyzer.keyword_totals(df)
+    return {
+        keyword: (int(f), int(h), int(r))
+        for keyword, f, h, r in totals[["keyword", "frequency", "total_hit", "total_reply"]].itertuples(index=False)
+    }
+
+
+def _time(fn, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="트렌드 키워드 집계: 행 루프 vs 열 단위")
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_posts(args.posts, args.seed)
+    # 실제 데이터처럼 본문 없는 글 / 중요 키워드 경계 사례 섞기
+    rng = np.random.default_rng(args.seed)
+    edge = rng.choice(len(df), size=min(len(df), 500), replace=False)
+    df.loc[edge[:100], "content"] = None
+    df.loc[edge[100:], "title"] = df.loc[edge[100:], "title"] + " OpenAI의 ChatGPT와 GPT-4, AI반도체 API를 LLM으로"
+
+    analyzer = TrendAnalyzer(None)  # 집계만 사용 (DB 미접속)
+    chars = int((df["title"].astype(str).str.len() + df["content"].astype(str).str.len()).sum())
+
+    loop_seconds, expected = _time(lambda: loop_totals(analyzer, df), 1)
+    vector_seconds, actual = _time(lambda: vectorized_totals(analyzer, df), args.repeats)
+
+    mismatched = [k for k in set(expected) | set(actual) if expected.get(k) != actual.get(k)]
+
+    print(f"\n{'=' * 64}")
+    print(f"트렌드 집계: 게시글 {len(df):,}개, {chars / 1e6:.1f}M자, 키워드 {len(expected):,}개")
+    print(f"{'=' * 64}")
+    print(f"{'path':<12} {'seconds':>9} {'posts/s':>10}")
+    print(f"{'loop':<12} {loop_seconds:>9.2f} {len(df) / loop_seconds:>10,.0f}")
+    print(f"{'vectorized':<12} {vector_seconds:>9.2f} {len(df) / vector_seconds:>10,.0f}")
+    print(f"speedup {loop_seconds / vector_seconds:.1f}x, 불일치 키워드 {len(mismatched)}개")
+    for keyword in mismatched[:5]:
+        print(f"  {keyword!r}: loop={expected.get(keyword)} vectorized={actual.get(keyword)}")
+    print()
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+TTS 꼬리 지연 벤치마크 (로컬 스탠드인 서버)
+- 지연 분포가 시드로 고정된 로컬 HTTP TTS 서버 2대(primary / fallback) 기동
+- 같은 요청 집합에 대해 직렬 폴백 vs hedged request의 p50/p95/p99 비교
+- 요청 텍스트별 지연/실패가 결정적이라 실행마다 같은 분포를 재현
+- 대기열 검사: synthesize_batch_async의 공용 세마포어에서 기다리는 정상 1순위가 hedge되지 않는지
+  (hedge가 1건이라도 나가면 종료 코드 1)
+
+Usage:
+    python bench_tts_latency.py [--requests 200] [--concurrency 8] [--seed 7]
+"""
+import argparse
+import asyncio
+import io
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from tts_providers import HedgedSynthesizer, HttpTtsProvider, LocalToneProvider, render_local_tone, write_wav
+from tts_service import synthesize_batch_async
+
+
+# ===============================
+# 스탠드인 서버
+# ===============================
+class LatencyProfile:
+    """요청 텍스트 → (지연 초, 실패 여부) 결정적 매핑"""
+
+    def __init__(self, seed: int, base: float, jitter: float, tail_prob: float,
+                 tail_latency: float, fail_prob: float):
+        self.seed = seed
+        self.base = base
+        self.jitter = jitter
+        self.tail_prob = tail_prob
+        self.tail_latency = tail_latency
+        self.fail_prob = fail_prob
+
+    def sample(self, text: str) -> Tuple[float, bool]:
+        rng = random.Random(f"{self.seed}:{text}")
+        latency = self.base + rng.random() * self.jitter
+        if rng.random() < self.tail_prob:
+            latency = self.tail_latency
+        return latency, rng.random() < self.fail_prob
+
+
+def start_standin_server(profile: LatencyProfile) -> Tuple[ThreadingHTTPServer, str]:
+    """127.0.0.1 임의 포트에 스탠드인 TTS 서버 기동 → (server, url)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            latency, failed = profile.sample(body["text"])
+            time.sleep(latency)
+
+            if failed:
+                self.send_response(503)
+                self.end_headers()
+                return
+
+            buf = io.BytesIO()
+            write_wav(buf, render_local_tone(body["text"], float(body.get("rate", 1.0))))
+            payload = buf.getvalue()
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/wav")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # hedge로 취소된 요청
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/synthesize"
+
+
+# ===============================
+# 벤치마크
+# ===============================
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _run(synth: HedgedSynthesizer, texts: List[str], out_dir: Path,
+               concurrency: int) -> List[float]:
+    # 동시 요청 수는 바깥에서 제한하고, 지연은 요청 단위로 측정 (대기열 시간 제외)
+    inflight = asyncio.Semaphore(concurrency)
+    provider_slots = asyncio.Semaphore(concurrency * len(synth.providers))
+
+    async def one(idx: int, text: str) -> float:
+        job = {"text": text, "voice": "bench", "speed": 1.0, "output_path": out_dir / f"b_{idx}.wav"}
+        async with inflight:
+            started = time.monotonic()
+            await synth.synthesize(job, provider_slots)
+            return time.monotonic() - started
+
+    return list(await asyncio.gather(*(one(i, t) for i, t in enumerate(texts))))
+
+
+def run_benchmark(requests: int, concurrency: int, seed: int) -> Dict[str, Any]:
+    primary, primary_url = start_standin_server(
+        LatencyProfile(seed, base=0.05, jitter=0.05, tail_prob=0.04, tail_latency=1.5, fail_prob=0.02)
+    )
+    fallback, fallback_url = start_standin_server(
+        LatencyProfile(seed + 1, base=0.15, jitter=0.05, tail_prob=0.0, tail_latency=0.0, fail_prob=0.0)
+    )
+
+    warmup = [f"워밍업 문장 {i}" for i in range(40)]
+    texts = [f"벤치마크 문장 {i} 오늘의 AI 뉴스 요약" for i in range(requests)]
+    report: Dict[str, Any] = {"requests": requests, "concurrency": concurrency, "seed": seed}
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp)
+            for mode, hedge in (("serial", False), ("hedged", True)):
+                synth = HedgedSynthesizer(
+                    [HttpTtsProvider(primary_url, "primary"), HttpTtsProvider(fallback_url, "fallback")],
+                    hedge=hedge, max_retries=1, base_delay=0.0
+                )
+                # p95 추정에 필요한 지연 표본 확보
+                asyncio.run(_run(synth, warmup, out_dir, concurrency))
+
+                started = time.monotonic()
+                latencies = asyncio.run(_run(synth, texts, out_dir, concurrency))
+                report[mode] = {
+                    "wall": time.monotonic() - started,
+                    "p50": _percentile(latencies, 0.50),
+                    "p95": _percentile(latencies, 0.95),
+                    "p99": _percentile(latencies, 0.99),
+                    "max": max(latencies),
+                    "hedge_delay": synth.latency["primary"].hedge_delay()
+                }
+    finally:
+        primary.shutdown()
+        fallback.shutdown()
+
+    return report
+
+
+def check_queued_primary(parts: int = 12, concurrency: int = 4, latency: float = 0.6,
+                         p95: float = 1.0) -> Dict[str, Any]:
+    """
+    대기열에 밀린 정상 1순위는 hedge하지 않아야 함
+
+    1순위 지연 latency < p95지만 parts/concurrency 라운드만큼 세마포어를 기다림
+    (대기열 시간까지 hedge 시계에 넣으면 뒤쪽 파트가 전부 2순위로 새어 나감)
+    """
+    primary = LocalToneProvider(latency=latency)
+    primary.name = "primary"
+    fallback = LocalToneProvider()
+    fallback.name = "fallback"
+    synth = HedgedSynthesizer([primary, fallback], hedge=True, max_retries=1, base_delay=0.0)
+    for _ in range(synth.latency["primary"].min_samples):
+        synth.latency["primary"].record(p95)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = [
+            {"text": f"대기열 문장 {i}", "voice": "bench", "speed": 1.0, "output_path": Path(tmp) / f"q_{i}.wav"}
+            for i in range(parts)
+        ]
+        results = asyncio.run(synthesize_batch_async(jobs, concurrency=concurrency, synthesizer=synth))
+
+    return {
+        "parts": parts,
+        "hedges": synth.hedges,
+        "providers": sorted({r["provider"] for r in results}),
+        "failed": sum(1 for r in results if not r["success"])
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TTS hedged request 꼬리 지연 벤치마크")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    report = run_benchmark(args.requests, args.concurrency, args.seed)
+
+    print(f"\n{'=' * 60}")
+    print(f"TTS 꼬리 지연 (요청 {report['requests']}건, 동시 {report['concurrency']})")
+    print(f"{'=' * 60}")
+    print(f"{'mode':<8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'wall':>8}")
+    for mode in ("serial", "hedged"):
+        r = report[mode]
+        print(f"{mode:<8} {r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f} {r['max']:>8.3f} {r['wall']:>8.2f}")
+    print(f"hedge 지연(primary p95): {report['hedged']['hedge_delay']:.3f}s")
+
+    queued = check_queued_primary()
+    print(f"대기열 검사: 파트 {queued['parts']}개, hedge {queued['hedges']}건, "
+          f"프로바이더 {queued['providers']}, 실패 {queued['failed']}\n")
+    sys.exit(1 if queued["hedges"] or queued["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,561 @@
+"""
+게시글 통계 테이블 (board_stats)
+- 게시글별 reply_count, content_length, last_reply_at, 댓글 감성 집계를 미리 계산해 보관
+- 후보/트렌드 쿼리의 (SELECT COUNT(*) FROM AI_REPLY ...) 상관 서브쿼리와
+  LENGTH(b.content) 정렬을 board_stats 인덱스 범위 스캔으로 대체
+- AI_BOARD / AI_REPLY는 Java 소유라 트리거 대신 동기화 잡으로 유지:
+  bno / rno 워터마크 SYNC_OVERLAP_IDS개 앞부터 다시 확인 (늦게 커밋된 행 보정),
+  댓글이 달린 게시글은 댓글 수를 다시 세서 덮어씀 (멱등), 감성은 새로 분석된 게시글만 재집계
+- 수정·삭제된 글/댓글은 BOARD_STATS_FULL_REFRESH_HOURS마다 전체 재계산 (--full로 즉시)
+- 런타임 DDL은 앱 소유 테이블만, 원본 테이블(AI_BOARD/AI_REPLY/reply_sentiment 등) 컬럼·인덱스는
+  --create-indexes 단계에서 (인덱스는 CREATE INDEX CONCURRENTLY, 쓰기 잠금 없음)
+- EXPLAIN (ANALYZE) 비교 도구: 기존 쿼리 vs board_stats 쿼리 시간을 jsonl로 기록
+
+Usage:
+    python board_stats.py [--full] [--explain before|after] [--loop]
+    python board_stats.py --create-indexes
+"""
+import argparse
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import sqlalchemy
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from config import (
+    DB_CONNECTION_STRING,
+    BOARD_STATS_EXPLAIN_LOG,
+    BOARD_STATS_FULL_REFRESH_HOURS,
+    BOARD_STATS_SYNC_INTERVAL,
+    SYNC_OVERLAP_IDS,
+    LOG_FORMAT, LOG_LEVEL
+)
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "board_stats"
+
+# 동기화 잡 공용 워터마크 (이름별 1행: board_stats, keyword_rollups 등)
+WATERMARK_DDL = """
+    CREATE TABLE IF NOT EXISTS sync_watermarks (
+        name VARCHAR(50) PRIMARY KEY,
+        last_bno BIGINT NOT NULL DEFAULT 0,
+        last_rno BIGINT NOT NULL DEFAULT 0,
+        last_sentiment_at TIMESTAMP NOT NULL DEFAULT TIMESTAMP '1970-01-01',
+        last_full_at TIMESTAMP,
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+"""
+
+# 앱 소유 테이블/인덱스 (모두 IF NOT EXISTS, 권한 없는 문장은 경고만)
+SCHEMA_DDL: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS board_stats (
+        bno BIGINT PRIMARY KEY,
+        reply_count INTEGER NOT NULL DEFAULT 0,
+        content_length INTEGER NOT NULL DEFAULT 0,
+        last_reply_at TIMESTAMP,
+        sentiment_count INTEGER NOT NULL DEFAULT 0,
+        sentiment_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        positive_count INTEGER NOT NULL DEFAULT 0,
+        negative_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+    """,
+    WATERMARK_DDL,
+    "ALTER TABLE sync_watermarks ADD COLUMN IF NOT EXISTS last_full_at TIMESTAMP",
+    # INFO 후보: 본문 길이 범위 + 정렬을 인덱스 순서로 처리
+    "CREATE INDEX IF NOT EXISTS idx_board_stats_length ON board_stats (content_length DESC, reply_count DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_board_stats_reply ON board_stats (reply_count DESC)",
+]
+
+# 원본 테이블 인덱스 (이름 → 대상): 운영 중 테이블이라 런타임에 만들지 않고 --create-indexes로 1회
+# AGRO 후보 / 최근 N일 트렌드 / 댓글 집계·재계산 / 제작 이력 / 감성 증분
+SOURCE_INDEXES: Dict[str, str] = {
+    "idx_ai_board_hit": "AI_BOARD (hit DESC)",
+    "idx_ai_board_regdate": "AI_BOARD (regdate)",
+    "idx_ai_reply_bno": "AI_REPLY (bno)",
+    "idx_shorts_queue_bno_status": "shorts_queue (bno, status)",
+    "idx_reply_sentiment_analyzed": "reply_sentiment (analyzed_date)",
+}
+
+# 원본 테이블 컬럼 (테이블, 컬럼 → 타입): ADD COLUMN은 컬럼이 있어도 ACCESS EXCLUSIVE 잠금이라
+# 런타임에는 information_schema로 존재 여부만 보고, 추가는 --create-indexes 단계에서 없을 때만
+SOURCE_COLUMNS: Dict[Tuple[str, str], str] = {
+    ("reply_sentiment", "content_hash"): "CHAR(32)",  # 분석 후 수정된 댓글 감지 (본문 md5)
+}
+
+# 감성 재집계 시 analyzed_date 겹침 구간 (늦게 커밋된 분석 결과 보정, 재집계는 멱등)
+SENTIMENT_OVERLAP = "5 minutes"
+
+_SENTIMENT_AGG = """
+    SELECT r.bno,
+           COUNT(*) AS cnt,
+           SUM(rs.score) AS total,
+           COUNT(*) FILTER (WHERE rs.sentiment = 'positive') AS pos,
+           COUNT(*) FILTER (WHERE rs.sentiment = 'negative') AS neg
+    FROM reply_sentiment rs
+             JOIN AI_REPLY r ON r.rno = rs.rno
+"""
+
+# EXPLAIN 비교용 board_stats 도입 전 쿼리
+LEGACY_QUERIES: Dict[str, str] = {
+    "smart_curator.AGRO": """
+        SELECT
+            b.bno, b.title, b.content, b.shorts_script,
+            b.hit, b.p_id, b.writer,
+            (SELECT COUNT(*) FROM AI_REPLY r WHERE r.bno = b.bno) as reply_count
+        FROM AI_BOARD b
+        WHERE LENGTH(b.content) >= 300
+          AND b.hit > 50
+          AND NOT EXISTS (
+            SELECT 1 FROM shorts_queue sq
+            WHERE sq.bno = b.bno AND sq.status IN (0, 1)
+        )
+        AND b.hit > :hit_threshold
+        ORDER BY b.hit DESC, reply_count DESC
+        FETCH FIRST :limit ROWS ONLY
+    """,
+    "smart_curator.INFO": """
+        SELECT
+            b.bno, b.title, b.content, b.shorts_script,
+            b.hit, b.p_id, b.writer,
+            (SELECT COUNT(*) FROM AI_REPLY r WHERE r.bno = b.bno) as reply_count
+        FROM AI_BOARD b
+        WHERE LENGTH(b.content) >= 300
+          AND b.hit > 50
+          AND NOT EXISTS (
+            SELECT 1 FROM shorts_queue sq
+            WHERE sq.bno = b.bno AND sq.status IN (0, 1)
+        )
+        AND LENGTH(b.content) > :depth_threshold
+        ORDER BY LENGTH(b.content) DESC, reply_count DESC
+        FETCH FIRST :limit ROWS ONLY
+    """,
+    "trend_analyzer.recent": """
+        SELECT b.title, b.content, b.hit,
+               (SELECT COUNT(*) FROM AI_REPLY r WHERE r.bno = b.bno) as reply_count
+        FROM AI_BOARD b
+        WHERE b.regdate > NOW() - INTERVAL ':days days'
+        ORDER BY b.regdate DESC
+    """,
+}
+
+
+class BoardStats:
+    """board_stats 동기화기"""
+
+    def __init__(self, db_engine: Engine, name: str = WATERMARK_NAME):
+        self.engine = db_engine
+        self.name = name
+        self._schema_ready = False
+
+    # ===============================
+    # 스키마
+    # ===============================
+    def ensure_schema(self) -> bool:
+        """테이블/인덱스 생성 (문장별 실패는 경고 후 계속), 통계 테이블 준비 여부 반환"""
+        if self._schema_ready:
+            return True
+
+        ready = True
+        for ddl in SCHEMA_DDL:
+            try:
+                with self.engine.connect() as conn:
+                    with conn.begin():
+                        conn.execute(text(ddl))
+            except Exception as e:
+                logger.warning(f"⚠️ board_stats DDL 실패: {' '.join(ddl.split())[:80]} ({e.__class__.__name__})")
+                if "CREATE TABLE" in ddl:
+                    ready = False
+
+        self._schema_ready = ready
+        return ready
+
+    def _lock_watermark(self, conn) -> Optional[Dict[str, Any]]:
+        """워터마크 행 잠금 조회 (처음이면 None → 전체 계산)"""
+        conn.execute(
+            text("INSERT INTO sync_watermarks (name) VALUES (:name) ON CONFLICT (name) DO NOTHING"),
+            {"name": self.name}
+        )
+        row = conn.execute(
+            text("""
+                SELECT last_bno, last_rno, last_sentiment_at, last_full_at
+                FROM sync_watermarks
+                WHERE name = :name
+                FOR UPDATE
+            """),
+            {"name": self.name}
+        ).fetchone()
+        if row[0] == 0 and row[1] == 0:
+            return None
+        return {"last_bno": row[0], "last_rno": row[1], "last_sentiment_at": row[2], "last_full_at": row[3]}
+
+    def _current_marks(self, conn) -> Dict[str, Any]:
+        """이번 동기화 상한 (이후에 들어온 행은 다음 동기화에서 반영)"""
+        return {
+            "max_bno": conn.execute(text("SELECT COALESCE(MAX(bno), 0) FROM AI_BOARD")).scalar(),
+            "max_rno": conn.execute(text("SELECT COALESCE(MAX(rno), 0) FROM AI_REPLY")).scalar(),
+            "sentiment_at": conn.execute(
+                text("SELECT COALESCE(MAX(analyzed_date), TIMESTAMP '1970-01-01') FROM reply_sentiment")
+            ).scalar()
+        }
+
+    def _save_watermark(self, conn, marks: Dict[str, Any], full: bool = False) -> None:
+        conn.execute(
+            text(f"""
+                UPDATE sync_watermarks
+                SET last_bno = :max_bno, last_rno = :max_rno,
+                    last_sentiment_at = :sentiment_at, updated_at = NOW()
+                    {", last_full_at = NOW()" if full else ""}
+                WHERE name = :name
+            """),
+            {**marks, "name": self.name}
+        )
+
+    @staticmethod
+    def _full_refresh_due(watermark: Dict[str, Any]) -> bool:
+        """마지막 전체 재계산 후 BOARD_STATS_FULL_REFRESH_HOURS 경과 여부 (0 이하면 주기 재계산 끔)"""
+        if BOARD_STATS_FULL_REFRESH_HOURS <= 0:
+            return False
+        last_full = watermark.get("last_full_at")
+        return last_full is None or (datetime.now() - last_full).total_seconds() >= BOARD_STATS_FULL_REFRESH_HOURS * 3600
+
+    # ===============================
+    # 동기화
+    # ===============================
+    def sync(self, full_refresh: bool = False) -> Dict[str, Any]:
+        """
+        워터마크 이후 게시글/댓글/감성만 반영 (첫 실행, full_refresh, 주기 도래 시 전체 재계산)
+
+        Returns:
+            {'mode': 'incremental', 'boards': 3, 'replies': 12, 'sentiment_boards': 2, 'seconds': 0.05}
+        """
+        report = {"mode": "skipped", "boards": 0, "replies": 0, "sentiment_boards": 0, "seconds": 0.0}
+        if not self.ensure_schema():
+            return report
+
+        started = time.time()
+        try:
+            with self.engine.connect() as conn:
+                with conn.begin():
+                    watermark = self._lock_watermark(conn)
+                    marks = self._current_marks(conn)
+                    full = watermark is None or full_refresh or self._full_refresh_due(watermark)
+                    if full:
+                        report.update(self._full_refresh(conn))
+                    else:
+                        report.update(self._incremental(conn, watermark, marks))
+                    self._save_watermark(conn, marks, full=full)
+        except Exception as e:
+            logger.error(f"❌ board_stats 동기화 실패: {e}", exc_info=True)
+            return report
+
+        report["seconds"] = round(time.time() - started, 3)
+        logger.info(
+            f"📊 board_stats 동기화 ({report['mode']}): 게시글 {report['boards']}, "
+            f"댓글 {report['replies']}, 감성 재집계 {report['sentiment_boards']} ({report['seconds']}s)"
+        )
+        return report
+
+    def _incremental(self, conn, watermark: Dict[str, Any], marks: Dict[str, Any]) -> Dict[str, Any]:
+        params = {**watermark, **marks, "overlap": SYNC_OVERLAP_IDS}
+
+        # 새 게시글 + 겹침 구간 (댓글 집계는 유지하고 본문 길이만 기록, 다시 써도 같은 값)
+        boards = conn.execute(text("""
+            INSERT INTO board_stats (bno, content_length, updated_at)
+            SELECT b.bno, COALESCE(LENGTH(b.content), 0), NOW()
+            FROM AI_BOARD b
+            WHERE b.bno > :last_bno - :overlap AND b.bno <= :max_bno
+            ON CONFLICT (bno) DO UPDATE SET
+                content_length = EXCLUDED.content_length,
+                updated_at = NOW()
+            WHERE board_stats.content_length IS DISTINCT FROM EXCLUDED.content_length
+        """), params).rowcount
+
+        # 새 댓글 + 겹침 구간이 달린 게시글: 증분 합산 대신 댓글 수를 다시 셈
+        # (겹쳐 읽어도 이중 집계 없음, 그 게시글의 삭제된 댓글도 함께 반영)
+        replies = conn.execute(text("""
+            SELECT COUNT(*) FROM AI_REPLY r WHERE r.rno > :last_rno AND r.rno <= :max_rno
+        """), params).scalar()
+        conn.execute(text("""
+            INSERT INTO board_stats (bno, content_length, reply_count, last_reply_at, updated_at)
+            SELECT t.bno, COALESCE(LENGTH(b.content), 0), rc.cnt, rc.last_at, NOW()
+            FROM (
+                SELECT DISTINCT r.bno
+                FROM AI_REPLY r
+                WHERE r.rno > :last_rno - :overlap AND r.rno <= :max_rno
+            ) t
+            JOIN AI_BOARD b ON b.bno = t.bno
+            CROSS JOIN LATERAL (
+                SELECT COUNT(*) AS cnt, MAX(r.regdate) AS last_at
+                FROM AI_REPLY r
+                WHERE r.bno = t.bno
+            ) rc
+            ON CONFLICT (bno) DO UPDATE SET
+                reply_count = EXCLUDED.reply_count,
+                last_reply_at = EXCLUDED.last_reply_at,
+                updated_at = NOW()
+        """), params)
+
+        # 새로 분석된 감성이 있는 게시글만 재집계
+        sentiment_boards = conn.execute(text(f"""
+            UPDATE board_stats s SET
+                sentiment_count = a.cnt,
+                sentiment_sum = a.total,
+                positive_count = a.pos,
+                negative_count = a.neg,
+                updated_at = NOW()
+            FROM (
+                {_SENTIMENT_AGG}
+                WHERE r.bno IN (
+                    SELECT r2.bno
+                    FROM reply_sentiment rs2
+                             JOIN AI_REPLY r2 ON r2.rno = rs2.rno
+                    WHERE rs2.analyzed_date > CAST(:last_sentiment_at AS TIMESTAMP) - INTERVAL '{SENTIMENT_OVERLAP}'
+                )
+                GROUP BY r.bno
+            ) a
+            WHERE s.bno = a.bno
+        """), params).rowcount
+
+        return {"mode": "incremental", "boards": boards, "replies": replies, "sentiment_boards": sentiment_boards}
+
+    def _full_refresh(self, conn) -> Dict[str, Any]:
+        """전체 재계산 (수정/삭제 반영)"""
+        boards = conn.execute(text(f"""
+            INSERT INTO board_stats (
+                bno, reply_count, content_length, last_reply_at,
+                sentiment_count, sentiment_sum, positive_count, negative_count, updated_at
+            )
+            SELECT b.bno,
+                   COALESCE(rc.cnt, 0),
+                   COALESCE(LENGTH(b.content), 0),
+                   rc.last_at,
+                   COALESCE(sa.cnt, 0),
+                   COALESCE(sa.total, 0),
+                   COALESCE(sa.pos, 0),
+                   COALESCE(sa.neg, 0),
+                   NOW()
+            FROM AI_BOARD b
+                     LEFT JOIN (
+                SELECT r.bno, COUNT(*) AS cnt, MAX(r.regdate) AS last_at
+                FROM AI_REPLY r
+                GROUP BY r.bno
+            ) rc ON rc.bno = b.bno
+                     LEFT JOIN (
+                {_SENTIMENT_AGG}
+                GROUP BY r.bno
+            ) sa ON sa.bno = b.bno
+            ON CONFLICT (bno) DO UPDATE SET
+                reply_count = EXCLUDED.reply_count,
+                content_length = EXCLUDED.content_length,
+                last_reply_at = EXCLUDED.last_reply_at,
+                sentiment_count = EXCLUDED.sentiment_count,
+                sentiment_sum = EXCLUDED.sentiment_sum,
+                positive_count = EXCLUDED.positive_count,
+                negative_count = EXCLUDED.negative_count,
+                updated_at = NOW()
+        """)).rowcount
+
+        conn.execute(text("""
+            DELETE FROM board_stats s
+            WHERE NOT EXISTS (SELECT 1 FROM AI_BOARD b WHERE b.bno = s.bno)
+        """))
+        replies = conn.execute(text("SELECT COALESCE(SUM(reply_count), 0) FROM board_stats")).scalar()
+        conn.execute(text("ANALYZE board_stats"))
+
+        return {"mode": "full", "boards": boards, "replies": int(replies), "sentiment_boards": boards}
+
+
+# ===============================
+# 원본 테이블 인덱스
+# ===============================
+def column_exists(conn, table: str, column: str) -> bool:
+    """information_schema로 컬럼 존재 확인 (ADD COLUMN IF NOT EXISTS와 달리 테이블 잠금 없음)"""
+    return conn.execute(text("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = ANY(current_schemas(false))
+          AND table_name = :table AND column_name = :column
+    """), {"table": table.lower(), "column": column.lower()}).first() is not None
+
+
+def add_source_columns(engine: Engine) -> Dict[str, str]:
+    """
+    SOURCE_COLUMNS 중 없는 것만 ADD COLUMN (잠금 대기가 길면 lock_timeout으로 포기)
+
+    Returns:
+        {'reply_sentiment.content_hash': 'added' | 'exists' | 'failed: ...', ...}
+    """
+    results = {}
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SET lock_timeout = '5s'"))
+        for (table, column), column_type in SOURCE_COLUMNS.items():
+            name = f"{table}.{column}"
+            try:
+                if column_exists(conn, table, column):
+                    results[name] = "exists"
+                    continue
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}"))
+                results[name] = "added"
+                logger.info(f"🧱 컬럼 추가: {name} {column_type}")
+            except Exception as e:
+                results[name] = f"failed: {e.__class__.__name__}"
+                logger.warning(f"⚠️ 컬럼 추가 실패: {name} ({e.__class__.__name__})")
+    return results
+
+
+def create_source_indexes(engine: Engine) -> Dict[str, str]:
+    """
+    SOURCE_INDEXES를 CREATE INDEX CONCURRENTLY로 생성 (트랜잭션 밖 autocommit, 테이블 쓰기 잠금 없음)
+
+    중단된 CONCURRENTLY 빌드가 남긴 INVALID 인덱스는 지우고 다시 만듦
+
+    Returns:
+        {'idx_ai_reply_bno': 'created' | 'exists' | 'rebuilt' | 'failed: ...', ...}
+    """
+    results = {}
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name, target in SOURCE_INDEXES.items():
+            try:
+                valid = conn.execute(text("""
+                    SELECT i.indisvalid
+                    FROM pg_class c
+                             JOIN pg_index i ON i.indexrelid = c.oid
+                    WHERE c.relname = :name
+                """), {"name": name}).scalar()
+                if valid:
+                    results[name] = "exists"
+                    continue
+                if valid is not None:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}"))
+                results[name] = "created" if valid is None else "rebuilt"
+                logger.info(f"🧱 인덱스 {results[name]}: {name} ON {target}")
+            except Exception as e:
+                results[name] = f"failed: {e.__class__.__name__}"
+                logger.warning(f"⚠️ 인덱스 생성 실패: {name} ON {target} ({e.__class__.__name__})")
+    return results
+
+
+# ===============================
+# EXPLAIN 비교
+# ===============================
+def current_queries() -> Dict[str, str]:
+    """board_stats를 쓰는 현재 쿼리 (LEGACY_QUERIES와 같은 이름)"""
+    from smart_curator import build_candidate_query
+    from keyword_rollup import TREND_ROLLUP_QUERY
+
+    return {
+        "smart_curator.AGRO": build_candidate_query("AGRO"),
+        "smart_curator.INFO": build_candidate_query("INFO"),
+        "trend_analyzer.recent": TREND_ROLLUP_QUERY,
+    }
+
+
+def _plan_nodes(plan: Dict[str, Any]) -> List[str]:
+    """플랜 트리 노드 (노드 종류 + 인덱스 이름)"""
+    node = plan["Node Type"]
+    if plan.get("Index Name"):
+        node += f"({plan['Index Name']})"
+    nodes = [node]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+def explain_queries(
+        engine: Engine,
+        label: str,
+        queries: Dict[str, str],
+        log_path: Path = BOARD_STATS_EXPLAIN_LOG,
+        repeats: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    EXPLAIN (ANALYZE, BUFFERS) 실행 시간 측정 후 jsonl 기록
+
+    쿼리별로 repeats회 실행해 최소 실행 시간 사용 (캐시 워밍 영향 완화)
+    """
+    from config import AGRO_HIT_THRESHOLD, INFO_DEPTH_THRESHOLD
+
+    params = {"hit_threshold": AGRO_HIT_THRESHOLD, "depth_threshold": INFO_DEPTH_THRESHOLD, "limit": 30, "days": 7}
+    records = []
+    with engine.connect() as conn:
+        for name, query in queries.items():
+            runs = []
+            for _ in range(repeats):
+                result = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), params).scalar()
+                runs.append(result[0] if isinstance(result, list) else json.loads(result)[0])
+
+            best = min(runs, key=lambda r: r["Execution Time"])
+            nodes = _plan_nodes(best["Plan"])
+            records.append({
+                "ts": datetime.now().isoformat(timespec="seconds"),
+                "label": label,
+                "query": name,
+                "planning_ms": round(best["Planning Time"], 3),
+                "execution_ms": round(best["Execution Time"], 3),
+                "shared_hit_blocks": best["Plan"].get("Shared Hit Blocks", 0),
+                "shared_read_blocks": best["Plan"].get("Shared Read Blocks", 0),
+                "seq_scans": sum(1 for n in nodes if n == "Seq Scan"),
+                "nodes": nodes
+            })
+
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with log_path.open("a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="board_stats 동기화 / EXPLAIN 기록")
+    parser.add_argument("--full", action="store_true", help="전체 재계산")
+    parser.add_argument("--create-indexes", action="store_true",
+                        help="원본 테이블 컬럼/인덱스 생성 (인덱스는 CONCURRENTLY, 배포 시 1회)")
+    parser.add_argument("--loop", action="store_true", help=f"{BOARD_STATS_SYNC_INTERVAL}초 간격으로 반복")
+    parser.add_argument("--explain", choices=["before", "after", "both"], help="쿼리 EXPLAIN 시간 기록")
+    parser.add_argument("--log", default=str(BOARD_STATS_EXPLAIN_LOG))
+    args = parser.parse_args()
+
+    engine = sqlalchemy.create_engine(DB_CONNECTION_STRING, pool_pre_ping=True)
+
+    if args.create_indexes:
+        migrated = {**add_source_columns(engine), **create_source_indexes(engine)}
+        for name, status in migrated.items():
+            print(f"{name:<32} {status}")
+        return
+
+    if args.explain:
+        variants = {"before": LEGACY_QUERIES}
+        if args.explain in ("after", "both"):
+            BoardStats(engine).sync()
+            variants = {"after": current_queries()} if args.explain == "after" else {
+                "before": LEGACY_QUERIES, "after": current_queries()
+            }
+
+        print(f"{'label':<7} {'query':<24} {'plan ms':>8} {'exec ms':>9} {'seq':>4}  nodes")
+        for label, queries in variants.items():
+            for r in explain_queries(engine, label, queries, Path(args.log)):
+                print(f"{label:<7} {r['query']:<24} {r['planning_ms']:>8.2f} {r['execution_ms']:>9.2f} "
+                      f"{r['seq_scans']:>4}  {' > '.join(r['nodes'][:6])}")
+        print(f"\n기록: {args.log}")
+        return
+
+    stats = BoardStats(engine)
+    while True:
+        stats.sync(full_refresh=args.full)
+        if not args.loop:
+            break
+        time.sleep(BOARD_STATS_SYNC_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
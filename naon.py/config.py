@@ -48,6 +48,9 @@ DB_CONNECTION_STRING: str = (
 
 print(f"✅ DB 연결: {_db_user}@{_db_host}:{_db_port}/{_db_name}")
 
+# 일괄 upsert 배치 크기 (db_utils.bulk_upsert, 문장 1개 = 왕복 1회에 담을 행 수)
+DB_UPSERT_BATCH_SIZE: int = int(os.environ.get("DB_UPSERT_BATCH_SIZE", "1000"))
+
 # ===============================
 # API 설정
 # ===============================
@@ -97,6 +100,39 @@ EDGE_TTS_VOICES: Dict[str, str] = {
 # 기본 음성
 DEFAULT_VOICE: str = "ko-KR-InJoonNeural"
 
+# ===============================
+# TTS 배치 합성 설정
+# ===============================
+# 하나의 이벤트 루프에서 동시에 합성할 최대 파트 수
+TTS_CONCURRENCY: int = int(os.environ.get("TTS_CONCURRENCY", "4"))
+TTS_MAX_RETRIES: int = int(os.environ.get("TTS_MAX_RETRIES", "3"))
+TTS_RETRY_BASE_DELAY: float = float(os.environ.get("TTS_RETRY_BASE_DELAY", "1.0"))
+
+# 프로바이더 체인 (앞에서부터 우선순위, 쉼표 구분: edge-tts, gtts, local)
+TTS_PROVIDERS: List[str] = os.environ.get("TTS_PROVIDERS", "edge-tts,gtts").split(",")
+# Hedged request: 1순위가 p95 지연을 넘기면 다음 프로바이더 동시 요청
+TTS_HEDGE_ENABLED: bool = os.environ.get("TTS_HEDGE_ENABLED", "1") == "1"
+TTS_HEDGE_DEFAULT_DELAY: float = float(os.environ.get("TTS_HEDGE_DEFAULT_DELAY", "4.0"))  # 표본 부족 시
+TTS_HEDGE_MIN_DELAY: float = 0.5
+# 서킷 브레이커: 연속 실패 N회 → open, 일정 시간 후 half-open
+TTS_BREAKER_FAILURES: int = int(os.environ.get("TTS_BREAKER_FAILURES", "5"))
+TTS_BREAKER_RESET_SECONDS: float = float(os.environ.get("TTS_BREAKER_RESET_SECONDS", "60"))
+
+# 속도 모델: 최종 배속 = 페르소나 rate(+35% → 1.35) × TTS_TEMPO_FACTOR
+# edge-tts에는 EDGE_TTS_MAX_RATE까지 직접 요청하고, 남는 배속만 PCM에서 처리
+TTS_TEMPO_FACTOR: float = float(os.environ.get("TTS_TEMPO_FACTOR", "1.35"))
+EDGE_TTS_MAX_RATE: float = 2.0  # edge-tts prosody rate 상한 (+100%)
+TTS_PAD_SECONDS: float = 0.2    # 파트 사이 무음 (타임라인에서 처리)
+
+# TTS 오디오 캐시 (최종 속도 조정본, LRU 용량 제한)
+TTS_CACHE_DIR: Path = Path(os.environ.get("TTS_CACHE_DIR", str(BASE_DIR / "cache" / "tts")))
+TTS_CACHE_MAX_BYTES: int = int(os.environ.get("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# TTS 선합성 (status=0 대기열을 우선순위 순으로 미리 합성해 캐시에 적재)
+TTS_PREFETCH_MAX_ITEMS: int = int(os.environ.get("TTS_PREFETCH_MAX_ITEMS", "5"))
+TTS_PREFETCH_MAX_BYTES: int = int(os.environ.get("TTS_PREFETCH_MAX_MB", "128")) * 1024 * 1024
+TTS_PREFETCH_INTERVAL: int = int(os.environ.get("TTS_PREFETCH_INTERVAL", "60"))
+
 # ===============================
 # SNS API (선택)
 # ===============================
@@ -141,6 +177,69 @@ SIMILARITY_THRESHOLD: float = 0.90
 AGRO_HIT_THRESHOLD: int = 80
 INFO_DEPTH_THRESHOLD: int = 500
 
+# 중복 검사용 임베딩 (제작 완료본 벡터를 디스크에 보관, 증분 갱신)
+EMBEDDING_MODEL_NAME: str = os.environ.get("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+EMBEDDING_BACKEND: str = os.environ.get("EMBEDDING_BACKEND", "torch")  # torch | onnx-int8
+EMBEDDING_ONNX_DIR: Path = Path(os.environ.get("EMBEDDING_ONNX_DIR", str(BASE_DIR / "cache" / "onnx")))
+EMBEDDING_ONNX_THREADS: int = int(os.environ.get("EMBEDDING_ONNX_THREADS", "2"))
+EMBEDDING_STORE_DIR: Path = Path(os.environ.get("EMBEDDING_STORE_DIR", str(BASE_DIR / "cache" / "embeddings")))
+EMBEDDING_BATCH_SIZE: int = int(os.environ.get("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_BATCH_WAIT_MS: float = float(os.environ.get("EMBEDDING_BATCH_WAIT_MS", "5"))  # 마이크로 배칭 대기
+EMBEDDING_SIDECAR_SOCKET: str = os.environ.get("EMBEDDING_SIDECAR_SOCKET", "")  # 비우면 인프로세스
+EMBEDDING_SIDECAR_RETRY: float = float(os.environ.get("EMBEDDING_SIDECAR_RETRY", "30"))  # 사이드카 실패 후 재시도 간격 (초, 연속 실패 시 2배씩 최대 16배)
+
+# 근사 최근접 탐색 (제작본이 ANN_MIN_SIZE 이상일 때만 사용, 그 아래는 전수 비교)
+ANN_BACKEND: str = os.environ.get("ANN_BACKEND", "ivf")  # ivf | hnsw | exact
+ANN_MIN_SIZE: int = int(os.environ.get("ANN_MIN_SIZE", "20000"))
+ANN_NPROBE: int = int(os.environ.get("ANN_NPROBE", "8"))
+ANN_RETRAIN_FACTOR: float = float(os.environ.get("ANN_RETRAIN_FACTOR", "4"))  # IVF: 학습 시점 대비 N배로 늘면 중심점 재학습
+
+# MinHash/LSH 어휘 사전필터 (추정 Jaccard가 임계값 이상이면 임베딩 없이 중복 판정)
+MINHASH_NUM_PERM: int = int(os.environ.get("MINHASH_NUM_PERM", "128"))
+MINHASH_BANDS: int = int(os.environ.get("MINHASH_BANDS", "16"))  # 16밴드 × 8행 → Jaccard ~0.7부터 후보
+MINHASH_SHINGLE: int = int(os.environ.get("MINHASH_SHINGLE", "5"))  # 문자 5-gram
+MINHASH_DUP_THRESHOLD: float = float(os.environ.get("MINHASH_DUP_THRESHOLD", "0.85"))
+
+# 증분 큐레이션 캐시 (bno별 감성 점수/임베딩 + bno/rno 워터마크)
+CURATION_CACHE_DIR: Path = Path(os.environ.get("CURATION_CACHE_DIR", str(BASE_DIR / "cache" / "curation")))
+CURATION_CACHE_TTL: float = float(os.environ.get("CURATION_CACHE_TTL_DAYS", "7")) * 86400
+
+# 게시글 통계 테이블 (board_stats, rno/bno 워터마크 증분 동기화)
+BOARD_STATS_SYNC_INTERVAL: int = int(os.environ.get("BOARD_STATS_SYNC_INTERVAL", "300"))
+# 증분 동기화가 못 잡는 수정/삭제(게시글 본문, 지운 댓글/게시글) 보정용 전체 재계산 주기
+BOARD_STATS_FULL_REFRESH_HOURS: float = float(os.environ.get("BOARD_STATS_FULL_REFRESH_HOURS", "24"))
+BOARD_STATS_EXPLAIN_LOG: Path = Path(
+    os.environ.get("BOARD_STATS_EXPLAIN_LOG", str(BASE_DIR / "cache" / "explain_history.jsonl"))
+)
+# 워터마크 동기화 겹침 구간: 마지막 bno/rno보다 N개 앞부터 다시 확인
+# (시퀀스 발급 순서와 커밋 순서가 달라 워터마크 뒤에 늦게 보이는 행 보정, 이미 반영한 행은 건너뜀)
+SYNC_OVERLAP_IDS: int = int(os.environ.get("SYNC_OVERLAP_IDS", "1000"))
+
+# 키워드 일별 롤업 (트렌드는 롤업 합산, 게시글은 bno 워터마크 이후만 토큰화)
+TREND_ROLLUP_RETENTION_DAYS: int = int(os.environ.get("TREND_ROLLUP_RETENTION_DAYS", "30"))
+TREND_ROLLUP_BATCH: int = int(os.environ.get("TREND_ROLLUP_BATCH", "2000"))
+# 트렌드 집계 경로: rollup(일별 롤업 합산) | sql(PostgreSQL 안에서 토큰화/집계) | scan(게시글 전체를 pandas로)
+# 앞 경로를 못 쓰면 rollup → sql → scan 순으로 폴백
+TREND_SOURCE: str = os.environ.get("TREND_SOURCE", "rollup")
+
+# 게시글 키워드 색인 (board_keywords, 글마다 1번만 토큰화)
+KEYWORD_INDEX_BATCH: int = int(os.environ.get("KEYWORD_INDEX_BATCH", "2000"))
+
+# 트렌드 스냅샷 (API/큐레이터/메인 루프 공유, TTL 안에서는 재계산 없음)
+TREND_SNAPSHOT_TTL: float = float(os.environ.get("TREND_SNAPSHOT_TTL", "600"))
+TREND_SNAPSHOT_DIR: Path = Path(os.environ.get("TREND_SNAPSHOT_DIR", str(BASE_DIR / "cache" / "trends")))
+
+# 실시간 트렌드 스트림 (지수 감쇠 카운터 + Space-Saving top-k, 메모리는 카운터 CAPACITY개로 고정)
+TREND_STREAM_CAPACITY: int = int(os.environ.get("TREND_STREAM_CAPACITY", "2000"))
+TREND_STREAM_HALF_LIFE: float = float(os.environ.get("TREND_STREAM_HALF_LIFE_HOURS", "6")) * 3600
+TREND_STREAM_REPLY_WEIGHT: float = float(os.environ.get("TREND_STREAM_REPLY_WEIGHT", "0.2"))  # 댓글 1개 = 글 0.2개
+TREND_STREAM_REPLY_KEYWORDS: int = int(os.environ.get("TREND_STREAM_REPLY_KEYWORDS", "10"))  # 댓글은 글 상위 키워드에만
+TREND_STREAM_SAVE_INTERVAL: int = int(os.environ.get("TREND_STREAM_SAVE_INTERVAL", "60"))
+
+# 댓글 감성 백필 (rno 키셋 페이지로 청크 조회 → 프로세스 풀 채점 → 청크마다 upsert + 체크포인트)
+SENTIMENT_BACKFILL_CHUNK: int = int(os.environ.get("SENTIMENT_BACKFILL_CHUNK", "2000"))
+SENTIMENT_BACKFILL_WORKERS: int = int(os.environ.get("SENTIMENT_BACKFILL_WORKERS", str(os.cpu_count() or 1)))
+
 # ===============================
 # 로깅 설정
 # ===============================
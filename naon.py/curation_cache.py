@@ -0,0 +1,197 @@
+"""
+증분 큐레이션 캐시
+- 후보 임베딩을 bno 단위로 디스크에 보관
+- 댓글 감성은 캐시하지 않음: SentimentAnalyzer가 결과 없음/본문 해시가 바뀐 댓글만 채점하고
+  게시글 통계는 집계 쿼리 1회라, 캐시 키를 만드는 비용이 재계산과 같음
+- 워터마크(max bno / max rno)는 사이클 사이 새 댓글 수 로그용
+- 임베딩은 (제목 + 본문 앞부분) 해시가 바뀐 게시글만 다시 인코딩
+- 조회수/트렌드/댓글 수 점수는 매번 벡터 연산으로 계산 (DB 왕복 없음)
+- 일정 기간 후보에 오르지 않은 bno는 정리, full_refresh 시 전부 비움
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+import numpy as np
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+from config import (
+    CURATION_CACHE_DIR,
+    CURATION_CACHE_TTL,
+    LOG_FORMAT, LOG_LEVEL
+)
+from embedding_store import EMBEDDING_MODEL_ID, normalize_rows
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+class CurationCache:
+    """bno → 임베딩 캐시 + 워터마크"""
+
+    def __init__(
+            self,
+            db_engine: Engine,
+            name: str = "smart_curator",
+            cache_dir: Path = CURATION_CACHE_DIR,
+            ttl: float = CURATION_CACHE_TTL,
+            model_name: str = EMBEDDING_MODEL_ID
+    ):
+        self.engine = db_engine
+        self.name = name
+        self.ttl = ttl
+        self.model_name = model_name
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.meta_path = self.cache_dir / f"{name}.json"
+        self.vectors_path = self.cache_dir / f"{name}.npz"
+
+        self._lock = threading.Lock()
+        self.marks: Dict[str, int] = {"max_bno": 0, "max_rno": 0}
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.vectors: Dict[int, np.ndarray] = {}
+        self.stats = {"vector_hits": 0, "vector_misses": 0}
+        self.load()
+
+    # ===============================
+    # 저장 / 로드
+    # ===============================
+    def load(self) -> bool:
+        try:
+            with self.meta_path.open(encoding="utf-8") as f:
+                meta = json.load(f)
+            entries = {int(bno): entry for bno, entry in meta.get("entries", {}).items()}
+            vectors: Dict[int, np.ndarray] = {}
+            if meta.get("model") == self.model_name and self.vectors_path.exists():
+                with np.load(self.vectors_path) as data:
+                    vectors = {int(bno): vec for bno, vec in zip(data["ids"], data["vectors"])}
+        except (OSError, ValueError, KeyError):
+            return False
+
+        with self._lock:
+            self.marks = {k: int(v) for k, v in meta.get("marks", self.marks).items()}
+            self.entries = entries
+            self.vectors = vectors
+        return True
+
+    def save(self) -> None:
+        """임베딩 → 메타 순서로 원자적 rename"""
+        with self._lock:
+            meta = {
+                "model": self.model_name,
+                "marks": dict(self.marks),
+                "entries": {str(bno): entry for bno, entry in self.entries.items()},
+                "updated_at": time.time()
+            }
+            ids = np.fromiter(self.vectors.keys(), dtype=np.int64, count=len(self.vectors))
+            matrix = np.stack(list(self.vectors.values())) if self.vectors else np.zeros((0, 0), dtype=np.float32)
+
+        try:
+            fd, tmp_vectors = tempfile.mkstemp(dir=self.cache_dir, suffix=".npz.part")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, ids=ids, vectors=matrix)
+            os.replace(tmp_vectors, self.vectors_path)
+
+            fd, tmp_meta = tempfile.mkstemp(dir=self.cache_dir, suffix=".json.part")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_meta, self.meta_path)
+        except OSError as e:
+            logger.warning(f"⚠️ 큐레이션 캐시 저장 실패: {e}")
+
+    def reset(self) -> None:
+        """전체 재평가 (full refresh)"""
+        with self._lock:
+            self.marks = {"max_bno": 0, "max_rno": 0}
+            self.entries = {}
+            self.vectors = {}
+        logger.info(f"♻️ 큐레이션 캐시 초기화: {self.name}")
+
+    # ===============================
+    # 워터마크
+    # ===============================
+    def advance(self) -> Dict[str, int]:
+        """
+        워터마크 전진 + 오래된 항목 정리
+
+        Returns:
+            {'new_replies': 12}
+        """
+        report = {"new_replies": 0}
+        try:
+            with self.engine.connect() as conn:
+                max_bno = conn.execute(sqlalchemy.text("SELECT COALESCE(MAX(bno), 0) FROM AI_BOARD")).scalar()
+                max_rno = conn.execute(sqlalchemy.text("SELECT COALESCE(MAX(rno), 0) FROM AI_REPLY")).scalar()
+                last_bno, last_rno = self.marks["max_bno"], self.marks["max_rno"]
+                if last_rno and max_rno > last_rno:
+                    report["new_replies"] = int(conn.execute(
+                        sqlalchemy.text("SELECT COUNT(*) FROM AI_REPLY WHERE rno > :last_rno AND rno <= :max_rno"),
+                        {"last_rno": last_rno, "max_rno": max_rno}
+                    ).scalar())
+        except Exception as e:
+            logger.error(f"❌ 큐레이션 워터마크 조회 실패: {e}")
+            return report
+
+        with self._lock:
+            self.marks = {"max_bno": int(max_bno), "max_rno": int(max_rno)}
+            self._prune()
+
+        logger.info(
+            f"🔖 큐레이션 워터마크: bno {last_bno}→{max_bno}, rno {last_rno}→{max_rno} "
+            f"(새 댓글 {report['new_replies']}개)"
+        )
+        return report
+
+    def _prune(self) -> None:
+        """TTL 동안 후보에 오르지 않은 bno 정리 (lock 보유 상태에서 호출)"""
+        cutoff = time.time() - self.ttl
+        stale = [bno for bno, entry in self.entries.items() if entry.get("seen_at", 0) < cutoff]
+        for bno in stale:
+            self.entries.pop(bno, None)
+            self.vectors.pop(bno, None)
+
+    # ===============================
+    # 조회 (없으면 계산 후 저장)
+    # ===============================
+    def embeddings(
+            self,
+            bnos: List[int],
+            texts: List[str],
+            encode: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """bno별 정규화 임베딩, 텍스트가 바뀌었거나 없는 bno만 encode로 일괄 인코딩"""
+        hashes = [text_hash(text) for text in texts]
+        with self._lock:
+            missing = [
+                idx for idx, (bno, h) in enumerate(zip(bnos, hashes))
+                if bno not in self.vectors or self.entries.get(bno, {}).get("text_hash") != h
+            ]
+
+        fresh = normalize_rows(encode([texts[idx] for idx in missing])) if missing else None
+        now = time.time()
+        with self._lock:
+            for pos, idx in enumerate(missing):
+                bno = bnos[idx]
+                self.vectors[bno] = fresh[pos]
+                self.entries.setdefault(bno, {})["text_hash"] = hashes[idx]
+            for bno in bnos:
+                self.entries.setdefault(bno, {})["seen_at"] = now
+            vectors = np.stack([self.vectors[bno] for bno in bnos]).astype(np.float32)
+
+        self.stats["vector_hits"] += len(bnos) - len(missing)
+        self.stats["vector_misses"] += len(missing)
+        return vectors
+
+    def __len__(self) -> int:
+        return len(self.entries)
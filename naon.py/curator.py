@@ -3,14 +3,17 @@ AI 기반 콘텐츠 큐레이터 (SBERT 중복 방지 강화 버전)
 """
 import logging
 import sqlalchemy
+import numpy as np
 import pandas as pd
-import torch
 from typing import List, Dict, Any, Tuple
-from sentence_transformers import SentenceTransformer, util
 from sqlalchemy.engine import Engine
 
 # 형의 프로젝트 공통 설정 로드
 import config
+from board_stats import BoardStats
+from embedding_service import encode_texts
+from embedding_store import EmbeddingStore, greedy_select
+from minhash_lsh import AcceptedJaccard, minhasher
 
 # ===============================
 # 로깅 설정
@@ -25,11 +28,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# 🔥 [안정성] 모델 로드 (최초 1회만 실행)
-logger.info("🤖 Sentence-BERT 모델 로딩 중 (중복 90% 컷 준비)...")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-logger.info("✅ 모델 로드 완료")
-
 
 class TwoTrackCurator:
     """이원화 전략 큐레이터 (유사도 기반 중복 제거)"""
@@ -40,36 +38,21 @@ class TwoTrackCurator:
         self.similarity_threshold = getattr(config, 'SIMILARITY_THRESHOLD', 0.7)
         self.agro_hit_threshold = getattr(config, 'AGRO_HIT_THRESHOLD', 50)
         self.info_depth_threshold = getattr(config, 'INFO_DEPTH_THRESHOLD', 300)
-
-    def fetch_existing_contents(self) -> List[str]:
-        """이미 제작 완료된 쇼츠들의 제목+본문 텍스트 긁어오기"""
-        query = """
-                SELECT b.title || ' ' || SUBSTR(b.content, 1, 150) as full_text
-                FROM AI_BOARD b
-                         JOIN shorts_queue sq ON b.bno = sq.bno
-                WHERE sq.status = 1 \
-                """
-        try:
-            with self.engine.connect() as conn:
-                df = pd.read_sql(sqlalchemy.text(query), conn)
-                return df['full_text'].tolist() if not df.empty else []
-        except Exception as e:
-            logger.error(f"❌ 기존 기록 조회 실패: {e}")
-            return []
+        # 제작 완료본 임베딩은 디스크에 보관하고 새로 제작된 것만 인코딩
+        self.embedding_store = EmbeddingStore(db_engine, encode=encode_texts, text_length=150)
+        # 본문 길이는 board_stats.content_length (인덱스 범위 스캔)
+        self.board_stats = BoardStats(db_engine)
+        self.prefilter_stats = {"candidates": 0, "lexical_rejects": 0}
 
     def is_duplicate(self, new_text: str, existing_texts: List[str]) -> Tuple[bool, float]:
-        """SBERT 문맥 분석으로 90% 중복 컷 (코사인 유사도 분석)"""
+        """SBERT 문맥 분석으로 90% 중복 컷 (코사인 유사도 분석, 하위 호환용: 선정은 curate의 greedy_select)"""
         if not existing_texts:
             return False, 0.0
 
         try:
-            # 텍스트 임베딩 수치화
-            new_embedding = model.encode(new_text, convert_to_tensor=True)
-            existing_embeddings = model.encode(existing_texts, convert_to_tensor=True)
-
-            # 유사도 계산
-            cosine_scores = util.cos_sim(new_embedding, existing_embeddings)
-            max_score = float(torch.max(cosine_scores).item())
+            # 텍스트 임베딩 수치화 (정규화 벡터라 내적 = 코사인 유사도)
+            vectors = encode_texts([new_text] + list(existing_texts))
+            max_score = float(np.max(vectors[1:] @ vectors[0]))
 
             # 설정한 임계값보다 높으면 중복으로 간주
             return (max_score > self.similarity_threshold), max_score
@@ -83,12 +66,13 @@ class TwoTrackCurator:
             condition = f"b.hit > {self.agro_hit_threshold}"
             order = "b.hit DESC"
         else:
-            condition = f"LENGTH(b.content) > {self.info_depth_threshold}"
-            order = "LENGTH(b.content) DESC"
+            condition = f"s.content_length > {self.info_depth_threshold}"
+            order = "s.content_length DESC"
 
         query = f"""
             SELECT b.bno, b.title, b.content, b.shorts_script, b.hit, b.p_id
-            FROM AI_BOARD b
+            FROM board_stats s
+            JOIN AI_BOARD b ON b.bno = s.bno
             WHERE {condition}
               AND NOT EXISTS (
                   SELECT 1 FROM shorts_queue sq 
@@ -108,26 +92,76 @@ class TwoTrackCurator:
         """최종 선정 로직 (중복 제거 포함)"""
         logger.info("🎯 큐레이션 가동: 중복 필터링 시작")
 
-        existing_texts = self.fetch_existing_contents()
+        self.board_stats.sync()
+        self.embedding_store.sync()
         selected = []
+        accepted_vectors = []
+        self.prefilter_stats = {"candidates": 0, "lexical_rejects": 0}  # 이번 실행분만 보고
 
-        # 어그로형, 정보형 순서대로 훑기
+        # 어그로형, 정보형 순서대로 훑기 (트랙별 후보는 한 번에 인코딩)
         for track in ["AGRO", "INFO"]:
+            remaining = count * 2 - len(selected)  # 원하는 개수 차면 종료
             candidates = self.fetch_candidates(track)
-            for _, row in candidates.iterrows():
-                if len(selected) >= count * 2: # 원하는 개수 차면 종료
+            if remaining <= 0 or candidates.empty:
+                continue
+
+            rows = candidates.to_dict('records')
+            texts = [f"{row['title']} {row['content'][:150]}" for row in rows]
+
+            # 1단계: 제작본 재게시글(MinHash 추정 Jaccard)은 임베딩 없이 컷
+            signatures = minhasher.signatures(texts)
+            lexical_dup, lexical_scores = self.embedding_store.lexical_duplicates(texts, signatures=signatures)
+            keep = np.flatnonzero(~lexical_dup)
+            lexical_cut = {int(idx): float(lexical_scores[idx]) for idx in np.flatnonzero(lexical_dup)}
+
+            try:
+                vectors = encode_texts([texts[idx] for idx in keep]) if len(keep) else None
+                scores = np.full(len(rows), np.nan, dtype=np.float32)
+                picked = []
+                if vectors is not None:
+                    history_scores = self.embedding_store.max_similarity(vectors)
+                    accepted = np.stack(accepted_vectors) if accepted_vectors else None
+                    # 2단계: 먼저 선정된 후보의 재게시글은 greedy 선정 중에 MinHash로 컷
+                    lexical = AcceptedJaccard(signatures[keep])
+                    picked_keep, keep_scores = greedy_select(
+                        vectors, history_scores, self.similarity_threshold, remaining, accepted, lexical
+                    )
+                    picked = [int(keep[idx]) for idx in picked_keep]
+                    scores[keep] = keep_scores
+                    lexical_cut.update({int(keep[idx]): score for idx, score in lexical.rejected.items()})
+            except Exception as e:
+                # 유사도 체크 실패 시 기존처럼 중복 아님으로 처리
+                logger.error(f"❌ 유사도 체크 오류: {e}")
+                vectors = None
+                picked = [int(idx) for idx in keep[:remaining]]
+                scores = np.full(len(rows), np.nan, dtype=np.float32)
+                scores[picked] = 0.0
+                lexical_cut = {int(idx): float(lexical_scores[idx]) for idx in np.flatnonzero(lexical_dup)}
+
+            self.prefilter_stats["candidates"] += len(rows)
+            self.prefilter_stats["lexical_rejects"] += len(lexical_cut)
+            picked_set = set(picked)
+            vector_pos = {int(idx): pos for pos, idx in enumerate(keep)}
+            for idx, row in enumerate(rows):
+                if idx in lexical_cut:
+                    logger.warning(f"🚫 어휘 중복 컷: {row['title']} (Jaccard {lexical_cut[idx]:.2f})")
+                    continue
+                if np.isnan(scores[idx]):
                     break
-
-                full_text = f"{row['title']} {row['content'][:150]}"
-                is_dup, score = self.is_duplicate(full_text, existing_texts)
-
-                if not is_dup:
-                    selected.append(row.to_dict())
-                    existing_texts.append(full_text) # 이번 사이클 중복 방지용 추가
-                    logger.info(f"✅ 선정 완료: {row['title']} (유사도 {score:.2f})")
+                if idx in picked_set:
+                    selected.append(row)
+                    if vectors is not None:
+                        accepted_vectors.append(vectors[vector_pos[idx]]) # 이번 사이클 중복 방지용 추가
+                    logger.info(f"✅ 선정 완료: {row['title']} (유사도 {scores[idx]:.2f})")
                 else:
-                    logger.warning(f"🚫 중복 컷: {row['title']} (유사도 {score:.2f})")
-
+                    logger.warning(f"🚫 중복 컷: {row['title']} (유사도 {scores[idx]:.2f})")
+
+        prefilter = self.prefilter_stats
+        if prefilter["candidates"]:
+            logger.info(
+                f"🔎 어휘 사전필터: 후보 {prefilter['candidates']}개 중 {prefilter['lexical_rejects']}개 "
+                f"({prefilter['lexical_rejects'] / prefilter['candidates']:.0%}) MinHash로 중복 판정"
+            )
         return selected
 
 def filter_and_queue(engine: Engine) -> List[Dict[str, Any]]:
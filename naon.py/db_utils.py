@@ -0,0 +1,96 @@
+"""
+DB 공용 유틸
+- bulk_upsert: 여러 행을 INSERT ... VALUES (...), (...) ... ON CONFLICT 한 문장으로 배치 전송
+  (execute_values 방식, 배치당 왕복 1회, 전체는 트랜잭션 1개)
+- SQLAlchemy exec_driver_sql로 실행 → 엔진 이벤트/로깅/풀 설정을 그대로 따름
+"""
+import logging
+from typing import Any, Dict, Optional, Sequence, Union
+
+from sqlalchemy.engine import Connection, Engine
+
+from config import DB_UPSERT_BATCH_SIZE, LOG_FORMAT, LOG_LEVEL
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+
+def _batch_statement(
+        table: str,
+        columns: Sequence[str],
+        sql_values: Dict[str, str],
+        rows: int,
+        conflict: Sequence[str],
+        update: Dict[str, str]
+) -> str:
+    """배치 크기만큼 VALUES 행을 펼친 upsert 문 (파라미터는 %(p{행}_{열})s)"""
+    all_columns = list(columns) + list(sql_values)
+    value_rows = [
+        "(" + ", ".join([f"%(p{i}_{j})s" for j in range(len(columns))] + list(sql_values.values())) + ")"
+        for i in range(rows)
+    ]
+    statement = f"INSERT INTO {table} ({', '.join(all_columns)}) VALUES {', '.join(value_rows)}"
+    statement += f" ON CONFLICT ({', '.join(conflict)}) "
+    if update:
+        statement += "DO UPDATE SET " + ", ".join(f"{column} = {expr}" for column, expr in update.items())
+    else:
+        statement += "DO NOTHING"
+    return statement
+
+
+def bulk_upsert(
+        bind: Union[Engine, Connection],
+        table: str,
+        rows: Sequence[Dict[str, Any]],
+        conflict: Sequence[str],
+        update: Optional[Dict[str, str]] = None,
+        sql_values: Optional[Dict[str, str]] = None,
+        batch_size: int = DB_UPSERT_BATCH_SIZE
+) -> int:
+    """
+    행 목록 일괄 upsert (배치당 1문장)
+
+    Args:
+        bind: Engine이면 트랜잭션 1개를 열어 전체 처리, Connection이면 호출자 트랜잭션 안에서 실행
+        table: 대상 테이블
+        rows: 같은 키를 가진 dict 목록 (키 = 컬럼), 충돌 키가 같은 행이 여러 개면 마지막 행만 반영
+              (행 단위 실행 순서와 같은 결과, 누적식 update라면 호출자가 미리 합산)
+        conflict: ON CONFLICT 대상 컬럼 (PK/유니크)
+        update: 충돌 시 SET 식 {컬럼: SQL 식}, None이면 충돌 컬럼 외 전부 EXCLUDED 값으로,
+                {}이면 DO NOTHING (식 안의 %는 %%로)
+        sql_values: 모든 행에 같은 SQL 식으로 넣을 컬럼 (예: {"analyzed_date": "NOW()"})
+        batch_size: 문장 1개에 담을 행 수
+
+    Returns:
+        영향 받은 행 수 (rowcount 합)
+    """
+    if not rows:
+        return 0
+
+    sql_values = sql_values or {}
+    columns = list(rows[0].keys())
+    # 한 문장 안에서 같은 키를 두 번 갱신할 수 없음 (PostgreSQL 제약) → 마지막 행 유지
+    rows = list({tuple(row[column] for column in conflict): row for row in rows}.values())
+    if update is None:
+        update = {
+            column: f"EXCLUDED.{column}"
+            for column in columns + list(sql_values) if column not in conflict
+        }
+
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return bulk_upsert(conn, table, rows, conflict, update, sql_values, batch_size)
+
+    affected = 0
+    statements: Dict[int, str] = {}
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start: start + batch_size]
+        if len(batch) not in statements:
+            statements[len(batch)] = _batch_statement(table, columns, sql_values, len(batch), conflict, update)
+        params = {
+            f"p{i}_{j}": row[column]
+            for i, row in enumerate(batch)
+            for j, column in enumerate(columns)
+        }
+        affected += bind.exec_driver_sql(statements[len(batch)], params).rowcount
+    return affected
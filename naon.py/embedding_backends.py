@@ -0,0 +1,192 @@
+"""
+임베딩 추론 백엔드
+- torch: SentenceTransformer fp32 (기본)
+- onnx-int8: ONNX export + int8 동적 양자화, onnxruntime + tokenizers CPU 추론 (torch 미사용)
+  (첫 사용 시 1회 export, 이후 EMBEDDING_ONNX_DIR의 양자화 모델 재사용)
+- 공통: encode(texts, batch_size) → L2 정규화 float32 (n, dim)
+"""
+import inspect
+import json
+import logging
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from config import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_THREADS,
+    LOG_FORMAT, LOG_LEVEL
+)
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class TorchBackend:
+    """SentenceTransformer (torch fp32)"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+
+def export_onnx_int8(model_name: str = EMBEDDING_MODEL_NAME, out_dir: Path = EMBEDDING_ONNX_DIR) -> Path:
+    """
+    SentenceTransformer의 트랜스포머 본체를 ONNX로 export 후 int8 동적 양자화
+
+    출력: out_dir/model.onnx (fp32), out_dir/model.int8.onnx, tokenizer.json, meta.json
+    (pooling/정규화는 onnx 밖에서 SentenceTransformer와 같은 mean pooling으로 처리)
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    out_dir = Path(out_dir) / model_name.replace("/", "__")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started = time.time()
+
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+    max_seq_length = int(st.max_seq_length)
+    if not tokenizer.is_fast:
+        raise ValueError(f"fast 토크나이저가 필요함 (tokenizer.json): {model_name}")
+
+    sample = tokenizer(["export sample", "샘플 문장"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "seq"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+
+    # torch 2.5+ 기본 dynamo exporter는 onnxscript가 필요 → TorchScript exporter 고정
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False
+
+    class _Encoder(torch.nn.Module):
+        """위치 인자 → 키워드 인자 (transformers 버전별 forward 시그니처 차이 흡수)"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    fp32_path = out_dir / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(transformer),
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **export_kwargs
+        )
+
+    int8_path = out_dir / "model.int8.onnx"
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+    tokenizer.backend_tokenizer.save(str(out_dir / "tokenizer.json"))
+    with (out_dir / "meta.json").open("w", encoding="utf-8") as f:
+        json.dump({
+            "model": model_name,
+            "max_seq_length": max_seq_length,
+            "inputs": input_names,
+            "pad_token": tokenizer.pad_token,
+            "pad_id": tokenizer.pad_token_id
+        }, f)
+
+    logger.info(f"✅ ONNX int8 export 완료: {int8_path} ({time.time() - started:.1f}s)")
+    return out_dir
+
+
+class OnnxInt8Backend:
+    """onnxruntime int8 추론 + mean pooling (SentenceTransformer 파이프라인과 동일)"""
+
+    name = "onnx-int8"
+
+    def __init__(
+            self,
+            model_name: str = EMBEDDING_MODEL_NAME,
+            model_dir: Path = EMBEDDING_ONNX_DIR,
+            threads: int = EMBEDDING_ONNX_THREADS
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        export_dir = Path(model_dir) / model_name.replace("/", "__")
+        if not (export_dir / "model.int8.onnx").exists():
+            logger.info(f"🔧 ONNX int8 모델 없음 → export: {model_name}")
+            export_onnx_int8(model_name, model_dir)
+
+        with (export_dir / "meta.json").open(encoding="utf-8") as f:
+            meta = json.load(f)
+        self.max_seq_length = int(meta["max_seq_length"])
+        self.input_names = list(meta["inputs"])
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads  # libx264와 코어 경쟁 제한
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            str(export_dir / "model.int8.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = Tokenizer.from_file(str(export_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=meta["pad_id"], pad_token=meta["pad_token"])
+
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        outputs = []
+        # 길이순으로 묶어 패딩 낭비를 줄이고 원래 순서로 복원
+        order = np.argsort([len(t) for t in texts])
+        for start in range(0, len(texts), batch_size):
+            batch = [texts[i] for i in order[start: start + batch_size]]
+            encodings = self.tokenizer.encode_batch(batch)
+            enc = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)
+            }
+            hidden = self.session.run(None, {name: enc[name] for name in self.input_names})[0]
+
+            mask = enc["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            outputs.append(pooled)
+
+        vectors = np.empty((len(texts), outputs[0].shape[1]), dtype=np.float32)
+        vectors[order] = np.vstack(outputs)
+        return _l2_normalize(vectors)
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    OnnxInt8Backend.name: OnnxInt8Backend,
+}
+
+
+def load_backend(name: str, model_name: str = EMBEDDING_MODEL_NAME):
+    """설정 이름 → 백엔드 인스턴스"""
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 임베딩 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+    return BACKENDS[name](model_name)
@@ -0,0 +1,339 @@
+"""
+공용 임베딩 서비스 (SBERT)
+- 추론 백엔드는 EMBEDDING_BACKEND로 선택 (torch | onnx-int8, embedding_backends)
+- 모델은 첫 encode/warmup 시점에 1회만 로드 (import 시 torch/모델 로드 없음)
+- 프로세스당 1개 싱글톤, 스레드 안전
+- 동시 요청 마이크로 배칭: 짧은 대기 동안 들어온 요청을 모아 model.encode 1회로 처리
+- 선택: 로컬 사이드카 (Unix 소켓) → 여러 프로세스가 모델 1벌 공유
+  사이드카가 죽으면 백오프 동안만 인프로세스 모델로 대체, 재연결되면 인프로세스 모델 해제
+
+Usage (사이드카):
+    python embedding_service.py --serve [--socket /tmp/naon-embedding.sock]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_WAIT_MS,
+    EMBEDDING_SIDECAR_SOCKET,
+    EMBEDDING_SIDECAR_RETRY,
+    LOG_FORMAT, LOG_LEVEL
+)
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    """지연 로드 + 마이크로 배칭 인프로세스 임베더"""
+
+    def __init__(
+            self,
+            model_name: str = EMBEDDING_MODEL_NAME,
+            batch_size: int = EMBEDDING_BATCH_SIZE,
+            batch_wait: float = EMBEDDING_BATCH_WAIT_MS / 1000.0,
+            backend: str = EMBEDDING_BACKEND
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._requests: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+
+    # ===============================
+    # 모델
+    # ===============================
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def _get_model(self):
+        """첫 호출 시 1회 로드 (double-checked locking)"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    started = time.time()
+                    logger.info(f"🤖 임베딩 모델 로딩: {self.model_name} ({self.backend})")
+                    from embedding_backends import load_backend
+                    self._model = load_backend(self.backend, self.model_name)
+                    logger.info(f"✅ 임베딩 모델 로드 완료 ({time.time() - started:.1f}s)")
+        return self._model
+
+    def unload(self) -> None:
+        """모델 해제 (다음 encode 때 다시 로드)"""
+        with self._model_lock:
+            self._model = None
+
+    def _encode_now(self, texts: List[str]) -> np.ndarray:
+        return self._get_model().encode(texts, self.batch_size)
+
+    def warmup(self, background: bool = False) -> None:
+        """모델 로드 + 더미 인코딩 1회 (background=True면 데몬 스레드에서)"""
+        if background:
+            threading.Thread(target=self.warmup, name="embedding-warmup", daemon=True).start()
+            return
+        try:
+            self.encode(["warmup"])
+        except Exception as e:
+            logger.warning(f"⚠️ 임베딩 워밍업 실패: {e}")
+
+    # ===============================
+    # 마이크로 배칭
+    # ===============================
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._requests.get()]
+            total = len(batch[0][0])
+            deadline = time.monotonic() + self.batch_wait
+
+            # 대기 시간 안에 들어온 요청을 배치 크기까지 모음
+            while total < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                total += len(item[0])
+
+            texts = [text for req_texts, _ in batch for text in req_texts]
+            try:
+                vectors = self._encode_now(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            offset = 0
+            for req_texts, future in batch:
+                future.set_result(vectors[offset: offset + len(req_texts)])
+                offset += len(req_texts)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """텍스트 → 정규화 임베딩 (n, dim), 여러 스레드에서 동시 호출 가능"""
+        texts = [str(t) for t in texts]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # 요청 하나가 이미 배치 크기 이상이면 바로 처리
+        if len(texts) >= self.batch_size:
+            return self._encode_now(texts)
+
+        self._ensure_worker()
+        future: Future = Future()
+        self._requests.put((texts, future))
+        return future.result()
+
+
+# ===============================
+# Unix 소켓 사이드카
+# ===============================
+def _send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(struct.pack(">I", len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("사이드카 연결 종료")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = struct.unpack(">I", _recv_exact(sock, 4))
+    return _recv_exact(sock, size)
+
+
+class EmbeddingClient:
+    """사이드카 클라이언트 (EmbeddingService와 같은 encode/warmup 인터페이스)"""
+
+    def __init__(
+            self,
+            socket_path: str = EMBEDDING_SIDECAR_SOCKET,
+            timeout: float = 60.0,
+            retry_interval: float = EMBEDDING_SIDECAR_RETRY
+    ):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self._fallback: Optional[EmbeddingService] = None
+        self._degraded = False  # 사이드카 장애 중 (인프로세스 모델 사용)
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        사이드카 우선, 연결 실패 시 인프로세스 서비스로 대체
+
+        장애 중에는 백오프(retry_interval부터 2배씩, 최대 16배)가 지날 때마다 사이드카 재시도,
+        다시 붙으면 인프로세스 모델을 해제하고 사이드카로 복귀
+        """
+        if not self._degraded or time.monotonic() >= self._retry_at:
+            try:
+                vectors = self._request(texts)
+            except OSError as e:
+                self._mark_failed(e)
+            else:
+                self._mark_recovered()
+                return vectors
+        return self._fallback.encode(texts)
+
+    def _mark_failed(self, error: OSError) -> None:
+        with self._lock:
+            if self._degraded:
+                self._backoff = min(self._backoff * 2, self.retry_interval * 16)
+                logger.warning(f"⚠️ 임베딩 사이드카 재연결 실패 ({self._backoff:.0f}s 후 재시도): {error}")
+            else:
+                self._backoff = self.retry_interval
+                logger.warning(f"⚠️ 임베딩 사이드카 연결 실패 → 인프로세스 로드 ({self._backoff:.0f}s 후 재시도): {error}")
+            if self._fallback is None:
+                self._fallback = EmbeddingService()
+            self._degraded = True
+            self._retry_at = time.monotonic() + self._backoff
+
+    def _mark_recovered(self) -> None:
+        if not self._degraded:
+            return
+        with self._lock:
+            if self._degraded:
+                self._degraded = False
+                self._fallback.unload()
+                logger.info("🔌 임베딩 사이드카 복구 → 인프로세스 모델 해제")
+
+    def _request(self, texts: List[str]) -> np.ndarray:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            _send_frame(sock, json.dumps({"texts": [str(t) for t in texts]}).encode("utf-8"))
+            payload = _recv_frame(sock)
+
+        if payload[:1] == b"{":
+            raise RuntimeError(json.loads(payload).get("error", "사이드카 오류"))
+        return np.load(io.BytesIO(payload), allow_pickle=False)
+
+    def warmup(self, background: bool = False) -> None:
+        """사이드카가 이미 모델을 들고 있으므로 불필요"""
+
+
+def serve(socket_path: str = EMBEDDING_SIDECAR_SOCKET, service: Optional[EmbeddingService] = None) -> None:
+    """사이드카 실행 (연결별 스레드 → 같은 배처로 합쳐서 인코딩)"""
+    service = service or EmbeddingService()
+    service.warmup()
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            try:
+                texts = json.loads(_recv_frame(self.request)).get("texts", [])
+                buf = io.BytesIO()
+                np.save(buf, service.encode(texts))
+                _send_frame(self.request, buf.getvalue())
+            except Exception as e:
+                logger.error(f"❌ 사이드카 요청 실패: {e}")
+                try:
+                    _send_frame(self.request, json.dumps({"error": str(e)}).encode("utf-8"))
+                except OSError:
+                    pass
+
+    Path(socket_path).unlink(missing_ok=True)
+    with socketserver.ThreadingUnixStreamServer(socket_path, Handler) as server:
+        server.daemon_threads = True
+        os.chmod(socket_path, 0o660)
+        logger.info(f"🧩 임베딩 사이드카 대기: {socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            Path(socket_path).unlink(missing_ok=True)
+
+
+# ===============================
+# 싱글톤
+# ===============================
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service():
+    """
+    프로세스 공용 임베더
+
+    EMBEDDING_SIDECAR_SOCKET 소켓이 떠 있으면 사이드카 클라이언트,
+    아니면 인프로세스 서비스 (모델은 첫 encode 때 로드)
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                if EMBEDDING_SIDECAR_SOCKET and Path(EMBEDDING_SIDECAR_SOCKET).exists():
+                    logger.info(f"🧩 임베딩 사이드카 사용: {EMBEDDING_SIDECAR_SOCKET}")
+                    _service = EmbeddingClient(EMBEDDING_SIDECAR_SOCKET)
+                else:
+                    _service = EmbeddingService()
+    return _service
+
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """텍스트 → 정규화 임베딩 (n, dim)"""
+    return get_embedding_service().encode(texts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="임베딩 사이드카")
+    parser.add_argument("--serve", action="store_true", help="Unix 소켓 사이드카 실행")
+    parser.add_argument("--socket", default=EMBEDDING_SIDECAR_SOCKET or "/tmp/naon-embedding.sock")
+    parser.add_argument("--export-onnx", action="store_true", help="ONNX int8 모델 미리 export")
+    args = parser.parse_args()
+
+    if args.export_onnx:
+        from embedding_backends import export_onnx_int8
+        print(export_onnx_int8(EMBEDDING_MODEL_NAME))
+    elif args.serve:
+        serve(args.socket)
+    else:
+        service = EmbeddingService()
+        started = time.time()
+        service.warmup()
+        print(f"[{service.backend}] warmup {time.time() - started:.1f}s, dim={service.encode(['test']).shape[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+제작 완료본 임베딩 저장소 (중복 검사용)
+- status=1 제작본의 (제목 + 본문 앞부분) 벡터를 한 번만 인코딩해 디스크에 보관
+- 저장 형식: 정규화 float32 행렬(.npy, memmap 로드) + bno 목록(.json)
+- sync() 시 새로 status=1이 된 bno만 인코딩, 빠진 bno는 제거
+- 중복 검사는 행렬-벡터 곱 1회 (코사인 = 내적)
+- 제작본이 ANN_MIN_SIZE 이상이면 ANN 인덱스(ann_index)로 탐색, 인덱스도 디스크에 보관
+- 제작본마다 MinHash 서명 + LSH 버킷(minhash_lsh)도 함께 보관 → 재게시글은 임베딩 없이 판정
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+from ann_index import build_index
+from minhash_lsh import AcceptedJaccard, LshIndex, minhasher
+from config import (
+    ANN_BACKEND,
+    ANN_MIN_SIZE,
+    EMBEDDING_BACKEND,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_STORE_DIR,
+    MINHASH_DUP_THRESHOLD,
+    LOG_FORMAT, LOG_LEVEL
+)
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+# 저장 벡터를 만든 모델 식별자 (백엔드가 바뀌면 저장소 재생성)
+EMBEDDING_MODEL_ID: str = (
+    EMBEDDING_MODEL_NAME if EMBEDDING_BACKEND == "torch" else f"{EMBEDDING_MODEL_NAME}@{EMBEDDING_BACKEND}"
+)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (float32)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def greedy_select(
+        vectors: np.ndarray,
+        base_scores: np.ndarray,
+        threshold: float,
+        max_selected: int,
+        accepted: Optional[np.ndarray] = None,
+        lexical: Optional[AcceptedJaccard] = None
+) -> Tuple[List[int], np.ndarray]:
+    """
+    후보를 순서대로 훑으며 (이력 + 먼저 선정된 후보) 최대 유사도가 임계값 이하면 선정
+
+    vectors: 정규화 후보 임베딩 (n, dim), base_scores: 후보별 이력 최대 유사도 (n,)
+    accepted: 이전 트랙 등에서 이미 선정된 벡터 (m, dim)
+    lexical: 같은 행 순서의 AcceptedJaccard, 먼저 선정된 후보의 재게시글이면 컷 (lexical.rejected에 기록)
+
+    Returns:
+        (선정 인덱스 목록, 판정 시점 유사도 (n,), 판정 전에 끝난 후보는 NaN)
+    """
+    running = np.asarray(base_scores, dtype=np.float32).copy()
+    if accepted is not None and len(accepted):
+        running = np.maximum(running, (vectors @ np.asarray(accepted).T).max(axis=1))
+
+    decision = np.full(len(vectors), np.nan, dtype=np.float32)
+    selected: List[int] = []
+    for idx in range(len(vectors)):
+        if len(selected) >= max_selected:
+            break
+        decision[idx] = running[idx]
+        if running[idx] > threshold:
+            continue
+        if lexical is not None and lexical.is_duplicate(idx):
+            continue
+        selected.append(idx)
+        # 방금 선정한 후보와의 유사도로 남은 후보의 최대값 갱신 (배치 내 중복 방지)
+        running = np.maximum(running, vectors @ vectors[idx])
+        if lexical is not None:
+            lexical.accept(idx)
+
+    return selected, decision
+
+
+class EmbeddingStore:
+    """bno → 정규화 임베딩 저장소"""
+
+    def __init__(
+            self,
+            db_engine: Engine,
+            encode: EncodeFn,
+            text_length: int = 200,
+            name: Optional[str] = None,
+            store_dir: Path = EMBEDDING_STORE_DIR,
+            model_name: str = EMBEDDING_MODEL_ID,
+            ann_backend: str = ANN_BACKEND,
+            ann_min_size: int = ANN_MIN_SIZE
+    ):
+        self.engine = db_engine
+        self.encode = encode
+        self.text_length = text_length
+        self.model_name = model_name
+        self.name = name or f"produced_{text_length}"
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.store_dir / f"{self.name}.npy"
+        self.meta_path = self.store_dir / f"{self.name}.json"
+        self.ann_backend = ann_backend
+        self.ann_min_size = ann_min_size
+        self.index_path = self.store_dir / f"{self.name}.{ann_backend}.idx"
+        self.index = None
+        self.lexical = LshIndex(minhasher.num_perm)
+        self.lexical_path = self.store_dir / f"{self.name}.minhash.npz"
+
+        self._lock = threading.Lock()
+        self.ids: List[int] = []
+        self.vectors: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self.load()
+
+    # ===============================
+    # 저장 / 로드
+    # ===============================
+    def load(self) -> bool:
+        """디스크에서 로드 (모델/길이 불일치나 손상 시 빈 저장소로 시작)"""
+        try:
+            with self.meta_path.open(encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("model") != self.model_name or meta.get("text_length") != self.text_length:
+                logger.info(f"♻️ 임베딩 저장소 재생성: {self.name} (모델/길이 변경)")
+                return False
+
+            vectors = np.load(self.vectors_path, mmap_mode="r")
+            ids = [int(bno) for bno in meta.get("ids", [])]
+            if len(ids) != vectors.shape[0]:
+                logger.warning(f"⚠️ 임베딩 저장소 불일치: {self.name} (ids {len(ids)} / 벡터 {vectors.shape[0]})")
+                return False
+        except (OSError, ValueError):
+            return False
+
+        with self._lock:
+            self.ids = ids
+            self.vectors = vectors
+        logger.info(f"📦 임베딩 저장소 로드: {self.name} ({len(ids)}개)")
+        self._load_index()
+        try:
+            self.lexical.load(self.lexical_path)
+        except (OSError, ValueError, KeyError):
+            self.lexical = LshIndex(minhasher.num_perm)  # 다음 sync에서 채움
+        return True
+
+    # ===============================
+    # ANN 인덱스
+    # ===============================
+    def _use_index(self) -> bool:
+        return self.ann_backend != "exact" and len(self.ids) >= self.ann_min_size
+
+    def _load_index(self) -> None:
+        """저장된 인덱스 로드, 없거나 개수가 맞지 않으면 재구축"""
+        if not self._use_index():
+            self.index = None
+            return
+
+        index = build_index(self.vectors.shape[1], self.ann_backend)
+        try:
+            index.load(self.index_path)
+            if len(index) == len(self.ids):
+                self.index = index
+                return
+        except (OSError, ValueError, RuntimeError):
+            pass
+        self.rebuild_index()
+
+    def rebuild_index(self) -> None:
+        """저장소 전체 벡터로 인덱스 재구축 후 저장"""
+        if not self._use_index():
+            self.index = None
+            return
+
+        started = time.time()
+        index = build_index(self.vectors.shape[1], self.ann_backend)
+        index.add(np.asarray(self.ids, dtype=np.int64), np.asarray(self.vectors, dtype=np.float32))
+        self.index = index
+        self._save_index()
+        logger.info(f"🧭 ANN 인덱스 구축: {self.name} ({index.backend}, {len(index)}개, {time.time() - started:.1f}s)")
+
+    def _save_index(self) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".idx.part")
+        os.close(fd)
+        try:
+            self.index.save(Path(tmp_path))
+            os.replace(tmp_path, self.index_path)
+        except (OSError, RuntimeError) as e:
+            Path(tmp_path).unlink(missing_ok=True)
+            logger.warning(f"⚠️ ANN 인덱스 저장 실패: {e}")
+
+    def _update_index(self, added_ids: List[int], added_vectors: Optional[np.ndarray],
+                      removed_ids: List[int]) -> None:
+        """sync 결과를 인덱스에 증분 반영 (임계 크기를 처음 넘으면 전체 구축)"""
+        if not self._use_index():
+            self.index = None
+            return
+        if self.index is None:
+            self.rebuild_index()
+            return
+
+        if removed_ids:
+            self.index.remove(np.asarray(removed_ids, dtype=np.int64))
+        if added_ids:
+            self.index.add(np.asarray(added_ids, dtype=np.int64), added_vectors)
+        self._save_index()
+
+    def save(self) -> None:
+        """벡터 → 메타 순서로 원자적 rename (메타가 기준이라 중간 상태는 load에서 걸러짐)"""
+        with self._lock:
+            ids = list(self.ids)
+            vectors = np.ascontiguousarray(self.vectors, dtype=np.float32)
+
+        fd, tmp_vectors = tempfile.mkstemp(dir=self.store_dir, suffix=".npy.part")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, vectors)
+        os.replace(tmp_vectors, self.vectors_path)
+
+        meta = {
+            "model": self.model_name,
+            "text_length": self.text_length,
+            "dim": int(vectors.shape[1]) if vectors.size else 0,
+            "ids": ids,
+            "updated_at": time.time()
+        }
+        fd, tmp_meta = tempfile.mkstemp(dir=self.store_dir, suffix=".json.part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, self.meta_path)
+
+    # ===============================
+    # 증분 동기화
+    # ===============================
+    def fetch_produced(self) -> Optional[pd.DataFrame]:
+        """status=1 제작본 (bno, full_text), 조회 실패 시 None"""
+        query = """
+                SELECT b.bno, b.title || ' ' || SUBSTR(b.content, 1, :text_length) as full_text
+                FROM AI_BOARD b
+                         JOIN shorts_queue sq ON b.bno = sq.bno
+                WHERE sq.status = 1 \
+                """
+        try:
+            with self.engine.connect() as conn:
+                return pd.read_sql(sqlalchemy.text(query), conn, params={"text_length": self.text_length})
+        except Exception as e:
+            logger.error(f"❌ 제작본 조회 실패: {e}")
+            return None
+
+    def sync(self) -> Dict[str, int]:
+        """새 제작본만 인코딩해 추가, 제작본에서 빠진 bno 제거"""
+        df = self.fetch_produced()
+        if df is None:
+            return {"added": 0, "removed": 0, "total": len(self.ids)}
+
+        produced: Dict[int, str] = {}
+        for bno, full_text in zip(df["bno"], df["full_text"]):
+            produced.setdefault(int(bno), str(full_text or ""))
+
+        self._sync_lexical(produced)
+
+        with self._lock:
+            ids = list(self.ids)
+            vectors = self.vectors
+
+        keep = [idx for idx, bno in enumerate(ids) if bno in produced]
+        known = set(ids)
+        new_ids = [bno for bno in produced if bno not in known]
+        removed = len(ids) - len(keep)
+
+        if not new_ids and not removed:
+            return {"added": 0, "removed": 0, "total": len(ids)}
+
+        kept_vectors = np.asarray(vectors[keep], dtype=np.float32) if keep else None
+        parts = [kept_vectors] if kept_vectors is not None else []
+        new_vectors = None
+        if new_ids:
+            new_vectors = normalize_rows(self.encode([produced[bno] for bno in new_ids]))
+            parts.append(new_vectors)
+
+        with self._lock:
+            self.ids = [ids[idx] for idx in keep] + new_ids
+            self.vectors = np.vstack(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+
+        self.save()
+        self._update_index(new_ids, new_vectors, [bno for bno in ids if bno not in produced])
+        logger.info(f"📦 임베딩 저장소 동기화: {self.name} +{len(new_ids)} -{removed} (총 {len(self.ids)}개)")
+        return {"added": len(new_ids), "removed": removed, "total": len(self.ids)}
+
+    def _sync_lexical(self, produced: Dict[int, str]) -> None:
+        """MinHash 서명: 빠진 bno 제거, 서명 없는 제작본만 해싱 (인코딩보다 훨씬 저렴)"""
+        stale = [bno for bno in self.lexical.signatures if bno not in produced]
+        missing = [bno for bno in produced if bno not in self.lexical]
+        if not stale and not missing:
+            return
+
+        self.lexical.remove(stale)
+        if missing:
+            self.lexical.add(np.asarray(missing, dtype=np.int64),
+                             minhasher.signatures([produced[bno] for bno in missing]))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".npz.part")
+            os.close(fd)
+            self.lexical.save(Path(tmp_path))
+            os.replace(tmp_path, self.lexical_path)
+        except OSError as e:
+            logger.warning(f"⚠️ MinHash 서명 저장 실패: {e}")
+
+    # ===============================
+    # 유사도
+    # ===============================
+    def lexical_duplicates(
+            self,
+            texts: List[str],
+            threshold: float = MINHASH_DUP_THRESHOLD,
+            signatures: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        어휘 사전필터: 제작본(LSH 후보만)과의 최대 추정 Jaccard
+        (배치 안 재게시글은 선정 순서에 달려 있으므로 greedy_select의 lexical로 판정)
+
+        Returns:
+            (threshold 이상이라 임베딩 없이 중복 확정인지 (n,), 최대 추정 Jaccard (n,))
+        """
+        if signatures is None:
+            signatures = minhasher.signatures(texts)
+        scores, _ = self.lexical.max_jaccard(signatures)
+        return scores >= threshold, scores
+
+    def max_similarity(self, queries: np.ndarray) -> np.ndarray:
+        """질의 벡터(들)별 저장소 최대 코사인 유사도 (저장소가 비면 0)"""
+        queries = normalize_rows(queries)
+        with self._lock:
+            vectors = self.vectors
+            index = self.index
+
+        if index is not None:
+            return index.max_similarity(queries)
+
+        if vectors.shape[0] == 0:
+            return np.zeros(queries.shape[0], dtype=np.float32)
+        return (queries @ np.asarray(vectors).T).max(axis=1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
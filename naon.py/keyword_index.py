@@ -0,0 +1,613 @@
+"""
+게시글 키워드 색인 (board_keywords)
+- 게시글마다 한 번만 토큰화해서 (bno, keyword, count, position) 행으로 보관
+  → 트렌드 롤업 / 큐레이션 트렌드 매칭 / 배경 이미지 키워드가 정규식 대신 조회로 처리
+- 한글 토큰은 조사를 떼고 저장 (투자를/투자는/투자의 → 투자)
+  받침 유무로 붙을 수 있는 조사만 떼서 체언 끝 글자 오탐을 줄임 (전문가 ≠ 전문 + 가)
+- 새 글은 처음 조회될 때(트렌드 롤업 등) 색인, 옛 글은 bno 워터마크 백필 작업으로 색인
+- 색인한 글은 키워드가 없어도 board_keywords_indexed에 표시 → "행 없음 = 키워드 없는 글"을 워터마크로 추정하지 않음
+  (워터마크 아래로 늦게 커밋된 글도 조회 시/다음 동기화 겹침 구간에서 색인)
+- 표시에는 색인한 텍스트의 md5를 함께 저장, 조회 시 현재 제목/본문과 다르면 다시 색인 (수정된 글)
+  이미 롤업에 들어간 글의 키워드 합계는 바뀌지 않음 (롤업은 keyword_rollup --full)
+- position = post_text(title, content) 안의 첫 등장 위치 (position < len(title)이면 제목에 있는 키워드)
+- 토크나이저 규칙이 바뀌면 TOKENIZER_VERSION을 올림 → 색인/롤업을 새 워터마크로 다시 적재
+
+Usage:
+    python keyword_index.py [--full]
+"""
+import argparse
+import hashlib
+import logging
+import re
+import time
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from board_stats import WATERMARK_DDL, column_exists
+from config import DB_CONNECTION_STRING, KEYWORD_INDEX_BATCH, SYNC_OVERLAP_IDS, LOG_FORMAT, LOG_LEVEL
+from keyword_matcher import get_matcher
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+# 2: 색인 완료 표시(board_keywords_indexed) 도입 → 표시 없는 v1 색인은 다시 적재
+TOKENIZER_VERSION = 2
+
+# 일반 토큰: 한글 2자 이상 | 대문자로 시작하는 영문 3자 이상 (GPT-4 등)
+# 두 문자 집합이 겹치지 않아 alternation 1개로 한 번에 스캔
+TOKEN_PATTERN = re.compile(r'[가-힣]{2,}|[A-Z][A-Za-z0-9\-]{2,}')
+
+# AI/기술 관련 중요 키워드 (수동 정의, 부분 문자열로도 매칭)
+IMPORTANT_KEYWORDS = frozenset({
+    'GPT', 'Claude', 'Gemini', 'LLM', 'AI', '인공지능',
+    'ChatGPT', 'OpenAI', 'Anthropic', 'Google',
+    '딥러닝', '머신러닝', '트랜스포머', 'NVIDIA',
+    'GPU', '반도체', '오픈소스', 'API', '모델', '학습'
+})
+
+# 조사 (앞 글자 조건): final = 받침 뒤에만, vowel = 받침 없는 글자 뒤에만, rieul = ㄹ 받침 뒤에만
+_JOSA_RULES: List[Tuple[str, str]] = sorted([
+    ('으로는', 'final'), ('으로', 'final'), ('이라는', 'final'), ('이라고', 'final'),
+    ('이나', 'final'), ('이랑', 'final'), ('은', 'final'), ('을', 'final'), ('이', 'final'), ('과', 'final'),
+    ('라는', 'vowel'), ('라고', 'vowel'), ('랑', 'vowel'), ('는', 'vowel'), ('를', 'vowel'),
+    ('가', 'vowel'), ('와', 'vowel'),
+    ('로는', 'rieul'), ('로', 'rieul'),
+    ('에서는', 'any'), ('에서도', 'any'), ('에게서', 'any'), ('까지는', 'any'), ('부터는', 'any'),
+    ('에서', 'any'), ('에게', 'any'), ('한테', 'any'), ('까지', 'any'), ('부터', 'any'), ('보다', 'any'),
+    ('처럼', 'any'), ('마다', 'any'), ('조차', 'any'), ('에는', 'any'), ('에도', 'any'),
+    ('의', 'any'), ('에', 'any'), ('만', 'any'),
+], key=lambda rule: -len(rule[0]))
+_JOSA_WORDS = frozenset(josa for josa, _ in _JOSA_RULES)  # 영문 뒤에 떨어져 나온 조사 (LLM으로 → 으로)
+
+# 조사를 뗀 뒤에도 키워드로 의미 없는 말
+STOPWORDS = frozenset({
+    '그리고', '하지만', '그래서', '그런데', '그러나', '또한', '이번', '정말', '진짜', '너무', '이제',
+    '지금', '오늘', '우리', '저희', '이것', '그것', '여기', '거기', '때문', '정도', '경우', '관련',
+    '통해', '대한', '위해', '있는', '없는', '하는', '이런', '그런', '어떤', '모든', '같은', '다른', '많은',
+})
+
+_HANGUL_BASE = 0xAC00
+_WORD_KEYWORD = re.compile(r'[A-Za-z0-9]+')
+_ALNUM = re.compile(r'[A-Za-z0-9]')
+
+
+def _final(ch: str) -> int:
+    """한글 음절 받침 번호 (0 = 받침 없음, 8 = ㄹ)"""
+    code = ord(ch) - _HANGUL_BASE
+    return code % 28 if 0 <= code < 11172 else 0
+
+
+def strip_josa(token: str) -> str:
+    """한글 토큰 끝의 조사 1개 + 복수 접미사 '들' 제거 (어간은 2글자 이상 유지)"""
+    for josa, rule in _JOSA_RULES:
+        if len(token) - len(josa) < 2 or not token.endswith(josa):
+            continue
+        final = _final(token[-len(josa) - 1])
+        if (rule == 'final' and not final) or (rule == 'vowel' and final) or (rule == 'rieul' and final != 8):
+            continue
+        token = token[:-len(josa)]
+        break
+    if len(token) >= 3 and token.endswith('들'):
+        token = token[:-1]
+    return token
+
+
+def post_text(title: Any, content: Any) -> str:
+    """색인 대상 문자열 (제목 + 공백 + 본문, 비어 있으면 빈 문자열)"""
+    return f"{title if isinstance(title, str) else ''} {content if isinstance(content, str) else ''}"
+
+
+# ===============================
+# 토크나이저
+# ===============================
+class KeywordTokenizer:
+    """
+    게시글 텍스트 → 키워드
+
+    규칙:
+    - 중요 키워드: 오토마톤 1회 스캔 (영문은 단어 경계 기준, 한글은 조사가 붙어도 매칭)
+    - 한글 2글자 이상 토큰: 조사 제거 후 2글자 이상, 불용어/중요 키워드 제외
+    - 영문 3글자 이상 (대문자 시작, GPT-4 등 숫자/하이픈 포함), 중요 키워드 제외
+    """
+
+    def __init__(self, important_keywords: Iterable[str] = IMPORTANT_KEYWORDS):
+        self.important_keywords = frozenset(important_keywords)
+        self.important_matcher = get_matcher(tuple(sorted(self.important_keywords)))
+        self.important_pattern = self.important_matcher.regex(word_boundary=True)
+        self._normalized: Dict[str, Optional[str]] = {}
+
+    def normalize(self, token: str) -> Optional[str]:
+        """일반 토큰 → 색인 키워드 (버릴 토큰이면 None)"""
+        if token in self._normalized:
+            return self._normalized[token]
+        keyword: Optional[str] = token
+        if '가' <= token[0] <= '힣':
+            keyword = strip_josa(token)
+            if len(keyword) < 2 or keyword in STOPWORDS or keyword in _JOSA_WORDS:
+                keyword = None
+        if keyword in self.important_keywords:
+            keyword = None  # 중요 키워드 매칭에서 이미 셈
+        if len(self._normalized) < 200000:
+            self._normalized[token] = keyword
+        return keyword
+
+    def extract(self, text: str) -> List[str]:
+        """등장마다 1개씩 (중요 키워드 → 일반 토큰 순)"""
+        keywords = [k for _, _, k in self.important_matcher.find_all(text, longest=True, word_boundary=True)]
+        for token in TOKEN_PATTERN.findall(text):
+            keyword = self.normalize(token)
+            if keyword:
+                keywords.append(keyword)
+        return keywords
+
+    def tokenize(self, text: str) -> List[Tuple[str, int, int]]:
+        """(키워드, 등장 횟수, 첫 위치) 목록, 첫 위치 순"""
+        found: Dict[str, List[int]] = {}
+        hits = [(start, k) for start, _, k in self.important_matcher.find_all(text, longest=True, word_boundary=True)]
+        for match in TOKEN_PATTERN.finditer(text):
+            keyword = self.normalize(match.group())
+            if keyword:
+                hits.append((match.start(), keyword))
+        for start, keyword in hits:
+            keyword = keyword[:100]
+            if keyword in found:
+                found[keyword][0] += 1
+                found[keyword][1] = min(found[keyword][1], start)
+            else:
+                found[keyword] = [1, start]
+        return sorted(((k, c, p) for k, (c, p) in found.items()), key=lambda row: row[2])
+
+    def occurrences(self, posts: pd.DataFrame) -> pd.Series:
+        """
+        게시글 프레임(title, content) → 키워드 등장 (extract와 같은 규칙, 열 단위 정규식 스캔)
+
+        Returns:
+            index = 원래 행 라벨, 값 = 키워드 (등장마다 1행)
+        """
+        texts = pd.Series(
+            [post_text(title, content) for title, content in zip(posts['title'], posts['content'])],
+            index=posts.index,
+            dtype=object
+        )
+        important = texts.str.findall(self.important_pattern).explode()
+        tokens = texts.str.findall(TOKEN_PATTERN).explode().dropna()
+        tokens = tokens.map({token: self.normalize(token) for token in tokens.unique()})
+        return pd.concat([important, tokens]).dropna()
+
+    def pushdown_params(self) -> Dict[str, Any]:
+        """PUSHDOWN_TOTALS_QUERY 바인딩 (같은 정규식/조사 규칙/불용어를 SQL로 넘김)"""
+        important_pattern, word_pattern = self.important_pattern.pattern, None
+        # 영숫자로만 된 키워드와 영숫자가 없는 키워드는 매치가 겹칠 수 없음 → 두 정규식으로 나눠도 같은 결과
+        # (PostgreSQL ARE는 분기마다 lookaround가 붙은 긴 alternation이 느림, 경계 검사를 한 번으로)
+        words = [k for k in self.important_keywords if _WORD_KEYWORD.fullmatch(k)]
+        others = [k for k in self.important_keywords if not _ALNUM.search(k)]
+        if words and len(words) + len(others) == len(self.important_keywords):
+            word_pattern = (
+                "(?<![A-Za-z0-9])(?:"
+                + "|".join(re.escape(k) for k in sorted(words, key=len, reverse=True))
+                + ")(?![A-Za-z0-9])"
+            )
+            important_pattern = get_matcher(tuple(sorted(others))).regex().pattern if others else None
+        return {
+            "important_pattern": important_pattern,
+            "important_word_pattern": word_pattern,
+            "token_pattern": TOKEN_PATTERN.pattern,
+            "josa": [josa for josa, _ in _JOSA_RULES],
+            "josa_rule": [rule for _, rule in _JOSA_RULES],
+            "stopwords": sorted(STOPWORDS),
+            "important": sorted(self.important_keywords),
+        }
+
+
+# ===============================
+# PostgreSQL 푸시다운 (토큰화 + 집계를 DB 안에서, 키워드별 합계 행만 전송)
+# ===============================
+# KeywordTokenizer.occurrences + TrendAnalyzer.keyword_totals와 같은 규칙
+# - 중요 키워드/일반 토큰: 같은 정규식을 regexp_matches로 (PostgreSQL ARE도 lookaround 지원, 최장 일치)
+# - 원본 토큰별로 먼저 합산 → 고유 토큰만 조사 제거(가장 긴 조사, 받침 번호 = (코드 - 0xAC00) % 28)
+#   → 키워드별 재합산 (합계는 더하기만 하므로 등장마다 집계한 것과 같음)
+# - 전송량/파이썬 메모리는 본문 길이와 무관 (키워드 수에만 비례)
+PUSHDOWN_TOTALS_QUERY = """
+    WITH posts AS (
+        SELECT COALESCE(b.title, '') || ' ' || COALESCE(b.content, '') AS body,
+               COALESCE(b.hit, 0) AS hit,
+               COALESCE(s.reply_count, 0) AS reply_count
+        FROM AI_BOARD b
+                 LEFT JOIN board_stats s ON s.bno = b.bno
+        WHERE b.regdate > NOW() - make_interval(days => :days)
+    ),
+    important AS (
+        SELECT m[1] AS keyword, p.hit, p.reply_count
+        FROM posts p, regexp_matches(p.body, :important_pattern, 'g') AS m
+        UNION ALL
+        SELECT m[1] AS keyword, p.hit, p.reply_count
+        FROM posts p, regexp_matches(p.body, :important_word_pattern, 'g') AS m
+    ),
+    token_totals AS (
+        SELECT m[1] AS token,
+               COUNT(*) AS frequency,
+               SUM(p.hit) AS total_hit,
+               SUM(p.reply_count) AS total_reply
+        FROM posts p, regexp_matches(p.body, :token_pattern, 'g') AS m
+        GROUP BY m[1]
+    ),
+    stripped AS (
+        SELECT t.token,
+               CASE WHEN j.josa IS NULL THEN t.token
+                    ELSE left(t.token, char_length(t.token) - char_length(j.josa)) END AS stem
+        FROM token_totals t
+                 LEFT JOIN LATERAL (
+            SELECT r.josa
+            FROM unnest(CAST(:josa AS TEXT[]), CAST(:josa_rule AS TEXT[])) AS r(josa, rule)
+            WHERE t.token ~ '^[가-힣]'
+              AND char_length(t.token) - char_length(r.josa) >= 2
+              AND right(t.token, char_length(r.josa)) = r.josa
+              AND CASE r.rule
+                      WHEN 'final' THEN (ascii(substr(t.token, char_length(t.token) - char_length(r.josa), 1)) - 44032) % 28 <> 0
+                      WHEN 'vowel' THEN (ascii(substr(t.token, char_length(t.token) - char_length(r.josa), 1)) - 44032) % 28 = 0
+                      WHEN 'rieul' THEN (ascii(substr(t.token, char_length(t.token) - char_length(r.josa), 1)) - 44032) % 28 = 8
+                      ELSE TRUE END
+            ORDER BY char_length(r.josa) DESC
+            LIMIT 1
+            ) j ON TRUE
+    ),
+    normalized AS (
+        SELECT token,
+               CASE WHEN token ~ '^[가-힣]' AND char_length(stem) >= 3 AND right(stem, 1) = '들'
+                        THEN left(stem, -1)
+                    ELSE stem END AS keyword,
+               token ~ '^[가-힣]' AS hangul
+        FROM stripped
+    ),
+    keywords AS (
+        SELECT token, keyword
+        FROM normalized
+        WHERE keyword <> ALL (CAST(:important AS TEXT[]))
+          AND NOT (hangul AND (char_length(keyword) < 2
+                               OR keyword = ANY (CAST(:stopwords AS TEXT[]))
+                               OR keyword = ANY (CAST(:josa AS TEXT[]))))
+    ),
+    totals AS (
+        SELECT keyword, COUNT(*) AS frequency, SUM(hit) AS total_hit, SUM(reply_count) AS total_reply
+        FROM important
+        GROUP BY keyword
+        UNION ALL
+        SELECT k.keyword, t.frequency, t.total_hit, t.total_reply
+        FROM token_totals t
+                 JOIN keywords k ON k.token = t.token
+    )
+    SELECT keyword,
+           SUM(frequency) AS frequency,
+           SUM(total_hit) AS total_hit,
+           SUM(total_reply) AS total_reply
+    FROM totals
+    GROUP BY keyword
+    HAVING SUM(frequency) >= :min_frequency
+"""
+
+
+# ===============================
+# 색인 테이블
+# ===============================
+SCHEMA_DDL: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS board_keywords (
+        bno BIGINT NOT NULL,
+        keyword VARCHAR(100) NOT NULL,
+        count INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        PRIMARY KEY (bno, keyword)
+    )
+    """,
+    # 색인 완료 게시글 (키워드 0개인 글 포함) + 색인한 텍스트 해시 (수정된 글 재색인)
+    """
+    CREATE TABLE IF NOT EXISTS board_keywords_indexed (
+        bno BIGINT PRIMARY KEY,
+        text_hash CHAR(32)
+    )
+    """,
+    WATERMARK_DDL,
+    # 키워드 → 게시글 조회
+    "CREATE INDEX IF NOT EXISTS idx_board_keywords_keyword ON board_keywords (keyword, bno)",
+]
+
+# 워터마크(겹침 구간 포함) 이후 아직 색인되지 않은 게시글 (처음 조회될 때 이미 색인된 글은 건너뜀)
+_NEW_POSTS_QUERY = """
+    SELECT b.bno, b.title, b.content
+    FROM AI_BOARD b
+    WHERE b.bno > :last_bno - :overlap AND b.bno <= :max_bno
+      AND NOT EXISTS (SELECT 1 FROM board_keywords_indexed i WHERE i.bno = b.bno)
+    ORDER BY b.bno
+    FETCH FIRST :batch ROWS ONLY
+"""
+
+_KEYWORDS_QUERY = """
+    SELECT bno, keyword, count, position
+    FROM board_keywords
+    WHERE bno = ANY(:bnos)
+"""
+
+# 색인 후 제목/본문이 바뀌지 않은 글 (post_text와 같은 문자열의 md5)
+_INDEXED_QUERY = """
+    SELECT i.bno
+    FROM board_keywords_indexed i
+             JOIN AI_BOARD b ON b.bno = i.bno
+    WHERE i.bno = ANY(:bnos)
+      AND i.text_hash = md5(COALESCE(b.title, '') || ' ' || COALESCE(b.content, ''))
+"""
+
+KEYWORD_COLUMNS = ["bno", "keyword", "count", "position"]
+
+# 글 하나에 키워드 수십 개 → 행마다 파라미터 4개 대신 열 배열 4개로 전송 (배치당 1문장)
+_INSERT_KEYWORDS = """
+    INSERT INTO board_keywords (bno, keyword, count, position)
+    SELECT * FROM unnest(
+        CAST(:bno AS BIGINT[]), CAST(:keyword AS TEXT[]),
+        CAST(:count AS INTEGER[]), CAST(:position AS INTEGER[])
+    )
+    ON CONFLICT (bno, keyword) DO NOTHING
+"""
+
+_MARK_INDEXED = """
+    INSERT INTO board_keywords_indexed (bno, text_hash)
+    SELECT * FROM unnest(CAST(:bnos AS BIGINT[]), CAST(:hashes AS TEXT[]))
+    ON CONFLICT (bno) DO UPDATE SET text_hash = EXCLUDED.text_hash
+"""
+
+# 다시 색인하는 글의 옛 키워드 (본문에서 빠진 키워드가 남지 않도록)
+_DELETE_KEYWORDS = """
+    DELETE FROM board_keywords WHERE bno = ANY(:bnos)
+"""
+
+
+class KeywordIndex:
+    """board_keywords 색인 (첫 조회 시 색인 + 워터마크 백필) 및 조회"""
+
+    def __init__(
+            self,
+            db_engine: Engine,
+            tokenizer: Optional[KeywordTokenizer] = None,
+            batch_size: int = KEYWORD_INDEX_BATCH,
+            overlap: int = SYNC_OVERLAP_IDS
+    ):
+        self.engine = db_engine
+        self.tokenizer = tokenizer or KeywordTokenizer()
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.name = f"board_keywords_v{TOKENIZER_VERSION}"
+        self._schema_ready = False
+
+    # ===============================
+    # 스키마 / 워터마크
+    # ===============================
+    def ensure_schema(self) -> bool:
+        """테이블 생성 (문장별 실패는 경고 후 계속), 색인 사용 가능 여부 반환"""
+        if self._schema_ready:
+            return True
+
+        ready = True
+        for ddl in SCHEMA_DDL:
+            try:
+                with self.engine.connect() as conn:
+                    with conn.begin():
+                        conn.execute(text(ddl))
+            except Exception as e:
+                logger.warning(f"⚠️ board_keywords DDL 실패: {' '.join(ddl.split())[:80]} ({e.__class__.__name__})")
+                if "CREATE TABLE" in ddl:
+                    ready = False
+
+        if ready:
+            # text_hash 이전에 만든 표시 테이블 (컬럼이 없을 때만 ALTER, 있으면 잠금 없이 통과)
+            try:
+                with self.engine.begin() as conn:
+                    if not column_exists(conn, "board_keywords_indexed", "text_hash"):
+                        conn.execute(text("ALTER TABLE board_keywords_indexed ADD COLUMN IF NOT EXISTS text_hash CHAR(32)"))
+            except Exception as e:
+                logger.warning(f"⚠️ board_keywords_indexed 컬럼 추가 실패: {e.__class__.__name__}")
+                ready = False
+
+        if ready:
+            # 이 토크나이저 버전으로 처음 쓰면 옛 색인을 비우고 시작 (조회가 옛 키워드를 읽지 않도록)
+            try:
+                with self.engine.begin() as conn:
+                    self._lock_watermark(conn)
+            except Exception as e:
+                logger.warning(f"⚠️ board_keywords 워터마크 초기화 실패: {e}")
+                ready = False
+
+        self._schema_ready = ready
+        return ready
+
+    def _lock_watermark(self, conn) -> int:
+        """워터마크 잠금, 이 토크나이저 버전의 워터마크가 처음 생기면 옛 색인 비움"""
+        created = conn.execute(
+            text("INSERT INTO sync_watermarks (name) VALUES (:name) ON CONFLICT (name) DO NOTHING"),
+            {"name": self.name}
+        ).rowcount
+        if created:
+            conn.execute(text("TRUNCATE board_keywords, board_keywords_indexed"))
+        return conn.execute(
+            text("SELECT last_bno FROM sync_watermarks WHERE name = :name FOR UPDATE"),
+            {"name": self.name}
+        ).scalar()
+
+    def _save_watermark(self, conn, last_bno: int) -> None:
+        conn.execute(
+            text("UPDATE sync_watermarks SET last_bno = :last_bno, updated_at = NOW() WHERE name = :name"),
+            {"last_bno": last_bno, "name": self.name}
+        )
+
+    # ===============================
+    # 색인
+    # ===============================
+    def sync(self, full_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        워터마크 이후 게시글 색인 (백필 겸용, 배치마다 커밋 → 중단돼도 이어서 진행)
+
+        Returns:
+            {'posts': 2000, 'keywords': 51234, 'seconds': 1.2}, 실패 시 None
+        """
+        if not self.ensure_schema():
+            return None
+
+        started = time.time()
+        report = {"posts": 0, "keywords": 0, "seconds": 0.0}
+        try:
+            if full_refresh:
+                with self.engine.begin() as conn:
+                    self._lock_watermark(conn)
+                    conn.execute(text("TRUNCATE board_keywords, board_keywords_indexed"))
+                    self._save_watermark(conn, 0)
+
+            with self.engine.connect() as conn:
+                max_bno = conn.execute(text("SELECT COALESCE(MAX(bno), 0) FROM AI_BOARD")).scalar()
+
+            # 새 글이 없어도 겹침 구간은 한 번 확인
+            while True:
+                with self.engine.begin() as conn:
+                    last_bno = self._lock_watermark(conn)
+                    rows = conn.execute(
+                        text(_NEW_POSTS_QUERY),
+                        {"last_bno": last_bno, "max_bno": max_bno, "overlap": self.overlap, "batch": self.batch_size}
+                    ).fetchall()
+                    keywords = self._index_posts(conn, [(row[0], post_text(row[1], row[2])) for row in rows])
+                    # 겹침 구간 글이 앞에 오므로 워터마크가 뒤로 가지 않게
+                    next_bno = rows[-1][0] if len(rows) == self.batch_size else max_bno
+                    self._save_watermark(conn, max(last_bno, next_bno))
+                report["posts"] += len(rows)
+                report["keywords"] += len(keywords)
+                if next_bno >= max_bno:
+                    break
+                logger.info(f"🏷️ 키워드 색인 진행: bno {next_bno:,} / {max_bno:,}")
+        except Exception as e:
+            logger.error(f"❌ 키워드 색인 동기화 실패: {e}", exc_info=True)
+            return None
+
+        report["seconds"] = round(time.time() - started, 3)
+        if report["posts"]:
+            logger.info(
+                f"🏷️ 키워드 색인: 게시글 {report['posts']}개, 키워드 {report['keywords']}행 ({report['seconds']}s)"
+            )
+        return report
+
+    def _index_posts(self, conn, posts: Sequence[Tuple[int, str]]) -> List[Tuple[int, str, int, int]]:
+        """(bno, 텍스트) → board_keywords 행 교체 + 색인 완료 표시 (텍스트 해시 포함)"""
+        if posts:
+            conn.execute(text(_DELETE_KEYWORDS), {"bnos": [int(bno) for bno, _ in posts]})
+        rows = [
+            (int(bno), keyword, count, position)
+            for bno, post in posts
+            for keyword, count, position in self.tokenizer.tokenize(post)
+        ]
+        if rows:
+            columns = list(zip(*rows))
+            conn.execute(text(_INSERT_KEYWORDS), dict(zip(KEYWORD_COLUMNS, map(list, columns))))
+        if posts:
+            conn.execute(text(_MARK_INDEXED), {
+                "bnos": [int(bno) for bno, _ in posts],
+                "hashes": [hashlib.md5(post.encode("utf-8")).hexdigest() for _, post in posts]
+            })
+        return rows
+
+    # ===============================
+    # 조회
+    # ===============================
+    def keyword_frame(self, bnos: Iterable[int], posts: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+        """
+        게시글들의 색인 행 (bno, keyword, count, position)
+
+        아직 색인되지 않았거나 색인 후 제목/본문이 바뀐 글(text_hash 불일치)은 이 자리에서 색인,
+        posts 프레임(bno, title, content)을 주면 본문을 다시 읽지 않음.
+        색인을 못 쓰면 None (호출자가 텍스트 스캔으로 대체)
+        """
+        bnos = sorted({int(bno) for bno in bnos})
+        if not bnos:
+            return pd.DataFrame(columns=KEYWORD_COLUMNS)
+        if not self.ensure_schema():
+            return None
+
+        try:
+            with self.engine.connect() as conn:
+                found = pd.DataFrame(
+                    conn.execute(text(_KEYWORDS_QUERY), {"bnos": bnos}).fetchall(),
+                    columns=KEYWORD_COLUMNS
+                )
+                indexed = {row[0] for row in conn.execute(text(_INDEXED_QUERY), {"bnos": bnos})}
+
+            # 해시가 맞는 색인 표시가 있는데 행이 없으면 키워드 없는 글 (다시 토큰화하지 않음)
+            missing = [bno for bno in bnos if bno not in indexed]
+            if not missing:
+                return found
+
+            if posts is not None:
+                texts = posts[posts['bno'].isin(missing)]
+                texts = list(zip(texts['bno'], map(post_text, texts['title'], texts['content'])))
+            else:
+                with self.engine.connect() as conn:
+                    texts = [
+                        (row[0], post_text(row[1], row[2]))
+                        for row in conn.execute(
+                            text("SELECT bno, title, content FROM AI_BOARD WHERE bno = ANY(:bnos)"),
+                            {"bnos": missing}
+                        )
+                    ]
+            with self.engine.begin() as conn:
+                added = self._index_posts(conn, texts)
+            found = found[~found['bno'].isin(missing)]  # 방금 토큰화한 결과로 대체
+            return pd.concat([found, pd.DataFrame(added, columns=KEYWORD_COLUMNS)], ignore_index=True)
+        except Exception as e:
+            logger.warning(f"⚠️ 키워드 색인 조회 실패: {e}")
+            return None
+
+    def post_keywords(self, bno: int, limit: Optional[int] = None, within: Optional[int] = None) -> List[str]:
+        """
+        게시글 키워드 (많이 나온 순, 같으면 먼저 나온 순)
+
+        within: 첫 위치가 이 값보다 앞인 키워드만 (len(title)이면 제목 키워드)
+        """
+        frame = self.keyword_frame([bno])
+        if frame is None or frame.empty:
+            return []
+        if within is not None:
+            frame = frame[frame['position'] < within]
+        frame = frame.sort_values(['count', 'position'], ascending=[False, True])
+        keywords = frame['keyword'].tolist()
+        return keywords if limit is None else keywords[:limit]
+
+    def occurrences(self, posts: pd.DataFrame) -> pd.Series:
+        """
+        게시글 프레임(bno, title, content) → 키워드 등장 Series (KeywordTokenizer.occurrences와 같은 결과)
+
+        색인 조회로 처리, 색인을 못 쓰면 텍스트 스캔
+        """
+        frame = self.keyword_frame(posts['bno'], posts=posts)
+        if frame is None:
+            return self.tokenizer.occurrences(posts)
+
+        labels = pd.Series(posts.index, index=posts['bno'].astype('int64').to_numpy())
+        labels = labels[~labels.index.duplicated()]
+        frame = frame[frame['bno'].isin(labels.index)]
+        counts = frame['count'].to_numpy(dtype='int64')
+        return pd.Series(
+            np.repeat(frame['keyword'].to_numpy(dtype=object), counts),
+            index=np.repeat(labels.loc[frame['bno'].to_numpy()].to_numpy(), counts),
+            dtype=object
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="게시글 키워드 색인 백필")
+    parser.add_argument("--full", action="store_true", help="색인 비우고 전체 게시글 다시 색인")
+    args = parser.parse_args()
+
+    engine = sqlalchemy.create_engine(DB_CONNECTION_STRING, pool_pre_ping=True)
+    KeywordIndex(engine).sync(full_refresh=args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+다중 키워드 매처 (Aho-Corasick)
+- 키워드 집합을 오토마톤 1개로 컴파일 → 텍스트를 한 번만 훑어 모든 키워드 위치 반환
+- 키워드 수(트렌드 수백 개)나 텍스트 길이(본문 전체)에 비례해 스캔 횟수가 늘지 않음
+- 트렌드 스냅샷(키워드 튜플)마다 1번만 빌드해 큐레이터/썸네일/트렌드 분석이 공유
+- pyahocorasick 설치 시 네이티브 오토마톤 사용 (선택), 없으면 순수 파이썬 구현
+"""
+import logging
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # 선택 의존성
+    ahocorasick = None
+
+from config import LOG_FORMAT, LOG_LEVEL
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+Match = Tuple[int, int, str]  # (시작, 끝(미포함), 키워드)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class KeywordMatcher:
+    """키워드 집합 → Aho-Corasick 오토마톤 (대소문자 구분, 부분 문자열 매칭)"""
+
+    def __init__(self, keywords: Iterable[str]):
+        # 순서 유지 중복 제거 (순서 = 우선순위, matched()의 정렬 기준)
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(k for k in keywords if k))
+        self._rank = {keyword: idx for idx, keyword in enumerate(self.keywords)}
+
+        if ahocorasick is not None:
+            self.backend = "pyahocorasick"
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            self.backend = "python"
+            self._build()
+
+    # ===============================
+    # 순수 파이썬 오토마톤
+    # ===============================
+    def _build(self) -> None:
+        """goto 트라이 + 실패 링크 (BFS), 출력은 실패 링크 출력까지 합쳐 둠"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(keyword)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state:
+                    fail = self._fail[state]
+                    while fail and ch not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _iter_python(self, text: str) -> Iterable[Tuple[int, str]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword in out[state]:
+                yield end, keyword
+
+    # ===============================
+    # 매칭
+    # ===============================
+    def find_all(self, text: str, longest: bool = False, word_boundary: bool = False) -> List[Match]:
+        """
+        텍스트 1회 스캔으로 키워드 위치 반환 (시작 위치순)
+
+        longest: 겹치면 가장 왼쪽·가장 긴 매치만 (ChatGPT 안의 GPT 제외)
+        word_boundary: 영숫자로 시작/끝나는 키워드는 앞뒤가 영숫자가 아닐 때만
+                       (OpenAI 안의 AI 제외, 한글 조사는 허용)
+        """
+        if not text or not self.keywords:
+            return []
+
+        if self.backend == "pyahocorasick":
+            hits = self._automaton.iter(text)
+        else:
+            hits = self._iter_python(text)
+        matches = [(end - len(keyword) + 1, end + 1, keyword) for end, keyword in hits]
+
+        if word_boundary:
+            matches = [
+                m for m in matches
+                if not (_is_word_char(m[2][0]) and m[0] > 0 and _is_word_char(text[m[0] - 1]))
+                and not (_is_word_char(m[2][-1]) and m[1] < len(text) and _is_word_char(text[m[1]]))
+            ]
+
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        if longest:
+            selected, last_end = [], 0
+            for match in matches:
+                if match[0] >= last_end:
+                    selected.append(match)
+                    last_end = match[1]
+            matches = selected
+        return matches
+
+    def matched(self, text: str, **kwargs) -> List[str]:
+        """텍스트에 있는 키워드 (중복 없이, 키워드 우선순위 순)"""
+        found = {keyword for _, _, keyword in self.find_all(text, **kwargs)}
+        return sorted(found, key=self._rank.__getitem__)
+
+    def count(self, text: str, **kwargs) -> int:
+        """텍스트에 있는 서로 다른 키워드 수 (sum(k in text for k in keywords)와 같음)"""
+        return len({keyword for _, _, keyword in self.find_all(text, **kwargs)})
+
+    def regex(self, word_boundary: bool = False) -> "re.Pattern":
+        """
+        find_all(text, longest=True, word_boundary=...)와 같은 매치를 내는 정규식
+        (pandas str.findall 등 열 단위 추출용)
+
+        긴 키워드부터 나열한 alternation → 같은 시작 위치에서 가장 긴 매치,
+        finditer는 매치 끝부터 다시 찾으므로 겹치는 매치는 건너뜀.
+        앞 경계 검사는 첫 글자 뒤에 둠 (모든 분기가 리터럴로 시작해야
+        re가 첫 글자 집합으로 후보 위치를 건너뛰어 10배 이상 빠름)
+        """
+        if not self.keywords:
+            return re.compile(r"(?!)")
+
+        alternatives = []
+        for keyword in sorted(self.keywords, key=len, reverse=True):
+            pattern = re.escape(keyword[0])
+            if word_boundary and _is_word_char(keyword[0]):
+                pattern += r"(?<![A-Za-z0-9].)"
+            pattern += re.escape(keyword[1:])
+            if word_boundary and _is_word_char(keyword[-1]):
+                pattern += r"(?![A-Za-z0-9])"
+            alternatives.append(pattern)
+        return re.compile("|".join(alternatives))
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+
+@lru_cache(maxsize=16)
+def get_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """키워드 튜플(트렌드 스냅샷)별 공유 매처, 같은 스냅샷이면 다시 빌드하지 않음"""
+    matcher = KeywordMatcher(keywords)
+    logger.debug(f"🔤 키워드 매처 빌드: {len(matcher)}개 ({matcher.backend})")
+    return matcher
@@ -0,0 +1,334 @@
+"""
+키워드 일별 롤업 (keyword_rollups)
+- 게시글이 들어올 때 한 번만 키워드를 추출해 (날짜, 키워드)별
+  빈도 / 조회수 합 / 댓글 수 합으로 누적 → N일 트렌드는 최대 N × K행 합산
+- bno 워터마크 이후 게시글만 키워드 색인(board_keywords)에서 조회 (본문 재스캔 없음)
+  워터마크 SYNC_OVERLAP_IDS개 앞부터 다시 보되 keyword_rollup_posts에 있는 글은 제외 (늦게 커밋된 글 보정)
+- 게시글별 키워드 배열(keyword_rollup_posts)을 함께 보관해서
+  조회수/댓글 수가 바뀐 게시글은 텍스트 없이 SQL로 차이만 롤업에 반영 (워터마크 잠금 안에서, 동시 동기화 이중 반영 방지)
+- 보존 기간(TREND_ROLLUP_RETENTION_DAYS)이 지난 버킷은 정리
+- 날짜 버킷 단위라 N일 창은 "오늘 포함 최근 N개 날짜" (기존 NOW() - N일 롤링 창과 경계만 다름)
+
+Usage:
+    python keyword_rollup.py [--full]
+"""
+import argparse
+import logging
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+import pandas as pd
+import sqlalchemy
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from board_stats import WATERMARK_DDL
+from db_utils import bulk_upsert
+from config import (
+    DB_CONNECTION_STRING,
+    SYNC_OVERLAP_IDS,
+    TREND_ROLLUP_BATCH,
+    TREND_ROLLUP_RETENTION_DAYS,
+    LOG_FORMAT, LOG_LEVEL
+)
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "keyword_rollups"
+
+# 게시글 프레임(bno, title, content) → 키워드 등장 Series (index = 행 라벨, KeywordIndex.occurrences)
+OccurrenceFn = Callable[[pd.DataFrame], pd.Series]
+
+SCHEMA_DDL: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS keyword_rollups (
+        bucket DATE NOT NULL,
+        keyword VARCHAR(100) NOT NULL,
+        frequency BIGINT NOT NULL DEFAULT 0,
+        total_hit BIGINT NOT NULL DEFAULT 0,
+        total_reply BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (bucket, keyword)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS keyword_rollup_posts (
+        bno BIGINT PRIMARY KEY,
+        bucket DATE NOT NULL,
+        hit INTEGER NOT NULL DEFAULT 0,
+        reply_count INTEGER NOT NULL DEFAULT 0,
+        keywords TEXT[] NOT NULL,
+        counts INTEGER[] NOT NULL
+    )
+    """,
+    WATERMARK_DDL,
+    "CREATE INDEX IF NOT EXISTS idx_keyword_rollup_posts_bucket ON keyword_rollup_posts (bucket)",
+]
+
+# N일 트렌드 = 롤업 행 합산 (빈도 2회 미만 제외는 기존 분석과 동일)
+TREND_ROLLUP_QUERY = """
+        SELECT keyword,
+               SUM(frequency) AS frequency,
+               SUM(total_hit) AS total_hit,
+               SUM(total_reply) AS total_reply
+        FROM keyword_rollups
+        WHERE bucket > CURRENT_DATE - CAST(:days AS INTEGER)
+        GROUP BY keyword
+        HAVING SUM(frequency) >= 2
+        """
+
+_NEW_POSTS_QUERY = """
+    SELECT b.bno, b.title, b.content, COALESCE(b.hit, 0) AS hit,
+           COALESCE(s.reply_count, 0) AS reply_count,
+           CAST(b.regdate AS DATE) AS bucket
+    FROM AI_BOARD b
+             LEFT JOIN board_stats s ON s.bno = b.bno
+    WHERE b.bno > :last_bno - :overlap AND b.bno <= :max_bno
+      AND b.regdate > CURRENT_DATE - CAST(:retention AS INTEGER)
+      AND NOT EXISTS (SELECT 1 FROM keyword_rollup_posts p WHERE p.bno = b.bno)
+    ORDER BY b.bno
+    FETCH FIRST :batch ROWS ONLY
+"""
+
+# 같은 (날짜, 키워드)에 누적
+_ROLLUP_ACCUMULATE = {
+    column: f"keyword_rollups.{column} + EXCLUDED.{column}"
+    for column in ("frequency", "total_hit", "total_reply")
+}
+
+# 조회수/댓글 수가 바뀐 게시글: 키워드별 (등장 횟수 × 변화량)만 롤업에 더함
+_ENGAGEMENT_REFRESH = """
+    WITH changed AS (
+        SELECT p.bno, p.bucket, p.keywords, p.counts,
+               COALESCE(b.hit, 0) AS hit,
+               COALESCE(s.reply_count, 0) AS reply_count,
+               COALESCE(b.hit, 0) - p.hit AS d_hit,
+               COALESCE(s.reply_count, 0) - p.reply_count AS d_reply
+        FROM keyword_rollup_posts p
+                 JOIN AI_BOARD b ON b.bno = p.bno
+                 LEFT JOIN board_stats s ON s.bno = p.bno
+        WHERE p.bucket > CURRENT_DATE - CAST(:retention AS INTEGER)
+          AND (COALESCE(b.hit, 0) <> p.hit OR COALESCE(s.reply_count, 0) <> p.reply_count)
+    ),
+    deltas AS (
+        SELECT c.bucket, k.keyword,
+               SUM(k.cnt * c.d_hit) AS d_hit,
+               SUM(k.cnt * c.d_reply) AS d_reply
+        FROM changed c,
+             unnest(c.keywords, c.counts) AS k(keyword, cnt)
+        GROUP BY c.bucket, k.keyword
+    ),
+    rollups AS (
+        UPDATE keyword_rollups r SET
+            total_hit = r.total_hit + d.d_hit,
+            total_reply = r.total_reply + d.d_reply
+        FROM deltas d
+        WHERE r.bucket = d.bucket AND r.keyword = d.keyword
+    )
+    UPDATE keyword_rollup_posts p SET
+        hit = c.hit,
+        reply_count = c.reply_count
+    FROM changed c
+    WHERE p.bno = c.bno
+"""
+
+
+class KeywordRollup:
+    """keyword_rollups 증분 동기화 + N일 트렌드 합산"""
+
+    def __init__(
+            self,
+            db_engine: Engine,
+            occurrences: OccurrenceFn,
+            name: str = WATERMARK_NAME,
+            retention_days: int = TREND_ROLLUP_RETENTION_DAYS,
+            batch_size: int = TREND_ROLLUP_BATCH,
+            overlap: int = SYNC_OVERLAP_IDS
+    ):
+        self.engine = db_engine
+        self.occurrences = occurrences
+        self.name = name
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self._schema_ready = False
+
+    # ===============================
+    # 스키마 / 워터마크
+    # ===============================
+    def ensure_schema(self) -> bool:
+        """테이블 생성 (문장별 실패는 경고 후 계속), 롤업 사용 가능 여부 반환"""
+        if self._schema_ready:
+            return True
+
+        ready = True
+        for ddl in SCHEMA_DDL:
+            try:
+                with self.engine.connect() as conn:
+                    with conn.begin():
+                        conn.execute(text(ddl))
+            except Exception as e:
+                logger.warning(f"⚠️ keyword_rollups DDL 실패: {' '.join(ddl.split())[:80]} ({e.__class__.__name__})")
+                if "CREATE TABLE" in ddl:
+                    ready = False
+
+        self._schema_ready = ready
+        return ready
+
+    def _lock_watermark(self, conn) -> int:
+        """워터마크 잠금, 이 이름의 워터마크가 처음 생기면 (키워드 규칙 변경 등) 롤업 비우고 다시 적재"""
+        created = conn.execute(
+            text("INSERT INTO sync_watermarks (name) VALUES (:name) ON CONFLICT (name) DO NOTHING"),
+            {"name": self.name}
+        ).rowcount
+        if created:
+            conn.execute(text("TRUNCATE keyword_rollups, keyword_rollup_posts"))
+        return conn.execute(
+            text("SELECT last_bno FROM sync_watermarks WHERE name = :name FOR UPDATE"),
+            {"name": self.name}
+        ).scalar()
+
+    def _save_watermark(self, conn, last_bno: int) -> None:
+        conn.execute(
+            text("UPDATE sync_watermarks SET last_bno = :last_bno, updated_at = NOW() WHERE name = :name"),
+            {"last_bno": last_bno, "name": self.name}
+        )
+
+    # ===============================
+    # 동기화
+    # ===============================
+    def sync(self, full_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        새 게시글 토큰화 → 롤업 누적, 조회수/댓글 변화 반영, 오래된 버킷 정리
+
+        Returns:
+            {'posts': 12, 'keywords': 85, 'refreshed': 40, 'seconds': 0.08}, 실패 시 None
+        """
+        if not self.ensure_schema():
+            return None
+
+        started = time.time()
+        report = {"posts": 0, "keywords": 0, "refreshed": 0, "seconds": 0.0}
+        try:
+            if full_refresh:
+                with self.engine.begin() as conn:
+                    self._lock_watermark(conn)
+                    conn.execute(text("TRUNCATE keyword_rollups, keyword_rollup_posts"))
+                    self._save_watermark(conn, 0)
+
+            with self.engine.connect() as conn:
+                max_bno = conn.execute(text("SELECT COALESCE(MAX(bno), 0) FROM AI_BOARD")).scalar()
+
+            # 배치마다 커밋 + 워터마크 전진 (첫 백필이 길어도 중단 지점부터 재개)
+            # 새 글이 없어도 겹침 구간은 한 번 확인
+            while True:
+                with self.engine.begin() as conn:
+                    last_bno = self._lock_watermark(conn)
+                    posts, keywords, next_bno = self._ingest_batch(conn, last_bno, max_bno)
+                    self._save_watermark(conn, max(last_bno, next_bno))
+                report["posts"] += posts
+                report["keywords"] += keywords
+                if next_bno >= max_bno:
+                    break
+
+            # 조회수/댓글 차이 반영은 워터마크 잠금 안에서 (동시 실행 시 같은 차이를 두 번 더하지 않도록)
+            with self.engine.begin() as conn:
+                self._lock_watermark(conn)
+                report["refreshed"] = conn.execute(
+                    text(_ENGAGEMENT_REFRESH), {"retention": self.retention_days}
+                ).rowcount
+                for table in ("keyword_rollups", "keyword_rollup_posts"):
+                    conn.execute(
+                        text(f"DELETE FROM {table} WHERE bucket <= CURRENT_DATE - CAST(:retention AS INTEGER)"),
+                        {"retention": self.retention_days}
+                    )
+        except Exception as e:
+            logger.error(f"❌ 키워드 롤업 동기화 실패: {e}", exc_info=True)
+            return None
+
+        report["seconds"] = round(time.time() - started, 3)
+        if report["posts"] or report["refreshed"]:
+            logger.info(
+                f"🗂️ 키워드 롤업: 새 게시글 {report['posts']}개 (키워드 {report['keywords']}), "
+                f"조회수/댓글 갱신 {report['refreshed']}개 ({report['seconds']}s)"
+            )
+        return report
+
+    def _ingest_batch(self, conn, last_bno: int, max_bno: int):
+        """워터마크 이후 게시글 batch_size개 → (게시글 수, 롤업 행 수, 다음 워터마크)"""
+        rows = conn.execute(
+            text(_NEW_POSTS_QUERY),
+            {"last_bno": last_bno, "max_bno": max_bno, "overlap": self.overlap,
+             "retention": self.retention_days, "batch": self.batch_size}
+        ).mappings().fetchall()
+        if not rows:
+            # 남은 구간은 보존 기간 밖의 옛 글뿐
+            return 0, 0, max_bno
+
+        posts = pd.DataFrame([dict(row) for row in rows])
+        occurrences = self.occurrences(posts).str.slice(0, 100)
+
+        # (게시글, 키워드)별 등장 횟수
+        counts = pd.DataFrame({'row': occurrences.index.to_numpy(), 'keyword': occurrences.to_numpy()})
+        counts = counts.groupby(['row', 'keyword'], sort=False).size().rename('frequency').reset_index()
+
+        per_post = counts.groupby('row').agg(
+            keywords=('keyword', lambda k: k.tolist()),
+            counts=('frequency', lambda c: c.tolist())
+        )
+        post_rows = [
+            {
+                "bno": int(post.bno), "bucket": post.bucket, "hit": int(post.hit), "reply_count": int(post.reply_count),
+                "keywords": per_post.at[idx, 'keywords'] if idx in per_post.index else [],
+                "counts": per_post.at[idx, 'counts'] if idx in per_post.index else []
+            }
+            for idx, post in enumerate(posts.itertuples(index=False))
+        ]
+
+        # 기존 분석과 같은 가중: 키워드 등장마다 해당 글의 조회수/댓글 수를 더함
+        rows_idx = counts['row'].to_numpy()
+        counts['bucket'] = posts['bucket'].to_numpy()[rows_idx]
+        counts['total_hit'] = counts['frequency'] * posts['hit'].to_numpy()[rows_idx]
+        counts['total_reply'] = counts['frequency'] * posts['reply_count'].to_numpy()[rows_idx]
+        rollups = counts.groupby(['bucket', 'keyword'], sort=False)[
+            ['frequency', 'total_hit', 'total_reply']
+        ].sum().reset_index()
+
+        bulk_upsert(conn, "keyword_rollup_posts", post_rows, conflict=["bno"], update={})
+        bulk_upsert(conn, "keyword_rollups", rollups.to_dict('records'), conflict=["bucket", "keyword"],
+                    update=_ROLLUP_ACCUMULATE)
+
+        # 겹침 구간 글이 앞에 오므로 워터마크가 뒤로 가지 않게
+        next_bno = max(last_bno, rows[-1]["bno"]) if len(rows) == self.batch_size else max_bno
+        return len(rows), len(rollups), next_bno
+
+    # ===============================
+    # 조회
+    # ===============================
+    def window_totals(self, days: int = 7) -> List[Dict[str, Any]]:
+        """
+        최근 N개 날짜 버킷 키워드 합계 (빈도 2회 이상)
+
+        Returns:
+            [{'keyword': 'GPT', 'frequency': 15, 'total_hit': 1800, 'total_reply': 120}, ...]
+        """
+        if days > self.retention_days:
+            logger.warning(f"⚠️ 트렌드 기간 {days}일 > 롤업 보존 {self.retention_days}일 (보존 기간까지만 집계)")
+        with self.engine.connect() as conn:
+            result = conn.execute(text(TREND_ROLLUP_QUERY), {"days": days})
+            return [dict(row) for row in result.mappings()]
+
+
+def main() -> None:
+    from trend_analyzer import TrendAnalyzer
+
+    parser = argparse.ArgumentParser(description="키워드 롤업 동기화")
+    parser.add_argument("--full", action="store_true", help="롤업 비우고 보존 기간 전체 다시 적재")
+    args = parser.parse_args()
+
+    engine = sqlalchemy.create_engine(DB_CONNECTION_STRING, pool_pre_ping=True)
+    TrendAnalyzer(engine).rollup.sync(full_refresh=args.full)
+
+
+if __name__ == "__main__":
+    main()
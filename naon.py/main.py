@@ -3,12 +3,13 @@
 """
 import time
 import logging
+import threading
 from typing import Dict, Any
 
 import sqlalchemy
 from sqlalchemy.engine import Engine
 
-from config import BASE_DIR, DB_CONNECTION_STRING, LOG_FORMAT, LOG_LEVEL
+from config import BASE_DIR, DB_CONNECTION_STRING, TTS_PREFETCH_INTERVAL, LOG_FORMAT, LOG_LEVEL
 from smart_curator import SmartCurator
 from shorts_generator import (
     get_target_by_bno,
@@ -16,7 +17,9 @@ from shorts_generator import (
     render_video_with_persona
 )
 from persona_manager import persona_manager
-from trend_analyzer import TrendAnalyzer
+from embedding_service import get_embedding_service
+from trend_stream import get_trend_stream
+from tts_prefetch import TtsPrefetcher
 from upload_scheduler import UploadScheduler
 from upload_youtube import upload_video
 
@@ -36,15 +39,16 @@ CURATE_INTERVAL = 1800  # 30분
 PRODUCTION_INTERVAL = 300  # 5분
 UPLOAD_CHECK_INTERVAL = 600  # 10분
 
+prefetcher = TtsPrefetcher(engine)
+prefetch_stop = threading.Event()
+
 
 def run_curation() -> None:
     """주기적 큐레이션"""
     try:
         logger.info("🎯 큐레이션 시작...")
 
-        trend_analyzer = TrendAnalyzer(engine)
-        trend_analyzer.analyze_recent_trends(days=7)
-
+        # 트렌드는 curate_premium 안에서 공유 스냅샷으로 조회 (TTL 지났을 때만 재계산)
         curator = SmartCurator(engine)
         result = curator.curate_premium(
             agro_count=2,
@@ -135,6 +139,38 @@ def run_production() -> None:
         logger.error(f"❌ 제작 실패: {e}", exc_info=True)
 
 
+def run_prefetch() -> None:
+    """
+    대기열 TTS 선합성 (게시글 본문을 그대로 렌더하는 generate_shorts 경로용)
+
+    OpenAI 대본은 제작 시점에 생성되므로 run_production의 대본 렌더는 선합성 대상이 아님
+    """
+    try:
+        prefetcher.run()
+    except Exception as e:
+        logger.error(f"❌ 선합성 실패: {e}", exc_info=True)
+
+
+def start_prefetch_worker() -> threading.Thread:
+    """선합성 백그라운드 스레드 (TTS_PREFETCH_INTERVAL 간격, 합성 시간이 메인 루프를 막지 않음)"""
+    def loop() -> None:
+        while not prefetch_stop.is_set():
+            run_prefetch()
+            prefetch_stop.wait(TTS_PREFETCH_INTERVAL)
+
+    worker = threading.Thread(target=loop, name="tts-prefetch", daemon=True)
+    worker.start()
+    return worker
+
+
+def run_trend_stream() -> None:
+    """새 게시글/댓글을 실시간 트렌드 카운터에 반영 (주기 저장 → API가 읽음)"""
+    try:
+        get_trend_stream(engine).sync()
+    except Exception as e:
+        logger.error(f"❌ 트렌드 스트림 실패: {e}", exc_info=True)
+
+
 def run_scheduled_upload() -> None:
     """예약된 시간에 업로드"""
     try:
@@ -172,6 +208,9 @@ def main_loop() -> None:
     logger.info("🏭 쇼츠 공장 가동 시작 (edge-tts 무료 90% 버전)")
 
     persona_manager.fetch_all_personas()
+    # 첫 큐레이션 전에 임베딩 모델을 백그라운드로 로드
+    get_embedding_service().warmup(background=True)
+    start_prefetch_worker()
 
     last_curate = 0
     last_produce = 0
@@ -195,6 +234,9 @@ def main_loop() -> None:
                 run_production()
                 last_produce = current_time
 
+            # 실시간 트렌드 (워터마크 이후 새 글/댓글만)
+            run_trend_stream()
+
             if current_time - last_upload_check >= UPLOAD_CHECK_INTERVAL:
                 run_scheduled_upload()
                 last_upload_check = current_time
@@ -204,6 +246,7 @@ def main_loop() -> None:
 
         except KeyboardInterrupt:
             logger.info("\n⚠️ 공장 가동 중지")
+            prefetch_stop.set()
             break
         except Exception as e:
             logger.error(f"❌ 예상치 못한 오류: {e}", exc_info=True)
@@ -0,0 +1,176 @@
+"""
+MinHash / LSH 어휘 중복 사전필터
+- 문자 k-shingle → MinHash 서명 (num_perm개 해시 최소값, 일치 비율 ≈ Jaccard 유사도)
+- LSH 밴드 버킷: 서명을 bands개 구간으로 나눠 구간이 같은 항목만 후보로 조회
+- 거의 그대로 옮긴 재게시글(near-verbatim)은 트랜스포머 없이 바로 중복 판정,
+  나머지(애매한 것)만 SBERT 임베딩으로 넘김
+- 공통 API (ann_index와 같은 형태): add(ids, signatures) / remove(ids) / max_jaccard / save / load
+"""
+import logging
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from config import (
+    MINHASH_NUM_PERM,
+    MINHASH_BANDS,
+    MINHASH_SHINGLE,
+    MINHASH_DUP_THRESHOLD,
+    LOG_FORMAT, LOG_LEVEL
+)
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+_EMPTY_HASH = np.uint32(0xFFFFFFFF)
+
+
+class MinHasher:
+    """텍스트 → MinHash 서명 (uint32, num_perm개)"""
+
+    def __init__(self, num_perm: int = MINHASH_NUM_PERM, shingle: int = MINHASH_SHINGLE, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle = shingle
+        rng = np.random.default_rng(seed)
+        # multiply-shift 해시족: (a·x + b) mod 2^64 상위 32비트, a는 홀수
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """소문자 + 구두점/공백 정규화 후 문자 k-gram 해시 (중복 제거)"""
+        norm = re.sub(r"[\W_]+", " ", (text or "").lower()).strip()
+        if not norm:
+            return np.zeros(0, dtype=np.uint64)
+        k = self.shingle
+        grams = {norm[i: i + k] for i in range(max(1, len(norm) - k + 1))}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _EMPTY_HASH, dtype=np.uint32)
+        mixed = (hashes[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+        return mixed.min(axis=0).astype(np.uint32)
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """(n, num_perm) 서명 행렬"""
+        if not texts:
+            return np.zeros((0, self.num_perm), dtype=np.uint32)
+        return np.stack([self.signature(text) for text in texts])
+
+
+def jaccard(signature: np.ndarray, signatures: np.ndarray) -> np.ndarray:
+    """서명 일치 비율 = 추정 Jaccard 유사도"""
+    return (np.asarray(signatures) == signature).mean(axis=-1)
+
+
+class AcceptedJaccard:
+    """
+    배치 안 greedy 선정용 어휘 중복 판정: 후보별로 '이미 선정된' 후보와의 최대 추정 Jaccard
+    (탈락한 후보와 닮은 것은 중복으로 보지 않음, accept할 때만 갱신)
+    """
+
+    def __init__(self, signatures: np.ndarray, threshold: float = MINHASH_DUP_THRESHOLD):
+        self.signatures = np.asarray(signatures, dtype=np.uint32)
+        self.threshold = threshold
+        self.scores = np.zeros(len(self.signatures), dtype=np.float32)
+        self.rejected: Dict[int, float] = {}  # 행 → 판정 시점 추정 Jaccard
+
+    def is_duplicate(self, idx: int) -> bool:
+        if self.scores[idx] >= self.threshold:
+            self.rejected[idx] = float(self.scores[idx])
+            return True
+        return False
+
+    def accept(self, idx: int) -> None:
+        self.scores = np.maximum(self.scores, jaccard(self.signatures[idx], self.signatures))
+
+
+class LshIndex:
+    """MinHash LSH 버킷 인덱스 (id → 서명, 밴드별 버킷)"""
+
+    backend = "minhash-lsh"
+
+    def __init__(self, num_perm: int = MINHASH_NUM_PERM, bands: int = MINHASH_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm({num_perm})은 bands({bands})로 나누어져야 함")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.signatures: Dict[int, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(bands)]
+
+    def _keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows: (band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, ids: np.ndarray, signatures: np.ndarray) -> None:
+        for item_id, signature in zip(np.asarray(ids, dtype=np.int64), np.asarray(signatures, dtype=np.uint32)):
+            item_id = int(item_id)
+            if item_id in self.signatures:
+                self.remove([item_id])
+            self.signatures[item_id] = signature
+            for band, key in enumerate(self._keys(signature)):
+                self._buckets[band].setdefault(key, set()).add(item_id)
+
+    def remove(self, ids) -> None:
+        for item_id in ids:
+            signature = self.signatures.pop(int(item_id), None)
+            if signature is None:
+                continue
+            for band, key in enumerate(self._keys(signature)):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(int(item_id))
+                    if not bucket:
+                        del self._buckets[band][key]
+
+    def query(self, signature: np.ndarray) -> Set[int]:
+        """밴드가 하나라도 같은 후보 id"""
+        found: Set[int] = set()
+        for band, key in enumerate(self._keys(signature)):
+            found |= self._buckets[band].get(key, set())
+        return found
+
+    def max_jaccard(self, signatures: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        서명별 (LSH 후보 중 최대 추정 Jaccard, 해당 id), 후보가 없으면 (0, -1)
+        """
+        signatures = np.atleast_2d(signatures)
+        scores = np.zeros(len(signatures), dtype=np.float32)
+        best_ids = np.full(len(signatures), -1, dtype=np.int64)
+        for i, signature in enumerate(signatures):
+            candidates = list(self.query(signature))
+            if not candidates:
+                continue
+            sims = jaccard(signature, np.stack([self.signatures[c] for c in candidates]))
+            best = int(np.argmax(sims))
+            scores[i], best_ids[i] = sims[best], candidates[best]
+        return scores, best_ids
+
+    def save(self, path: Path) -> None:
+        ids = np.fromiter(self.signatures.keys(), dtype=np.int64, count=len(self.signatures))
+        sigs = np.stack(list(self.signatures.values())) if self.signatures else np.zeros((0, self.num_perm), np.uint32)
+        with open(path, "wb") as f:
+            np.savez(f, ids=ids, signatures=sigs, bands=np.int64(self.bands))
+
+    def load(self, path: Path) -> None:
+        with np.load(path) as data:
+            signatures = data["signatures"]
+            if signatures.shape[1] != self.num_perm or int(data["bands"]) != self.bands:
+                raise ValueError("MinHash 설정 변경 (num_perm/bands)")
+            self.signatures = {}
+            self._buckets = [{} for _ in range(self.bands)]
+            self.add(data["ids"], signatures)
+
+    def __contains__(self, item_id: int) -> bool:
+        return int(item_id) in self.signatures
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+
+# 공용 해셔 (저장소와 큐레이터가 같은 해시족을 써야 서명 비교 가능)
+minhasher = MinHasher()
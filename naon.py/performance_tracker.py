@@ -12,6 +12,7 @@ import sqlalchemy
 from sqlalchemy.engine import Engine
 
 from config import BASE_DIR, DB_CONNECTION_STRING, LOG_FORMAT, LOG_LEVEL
+from db_utils import bulk_upsert
 
 # ===============================
 # 로깅 설정
@@ -56,46 +57,64 @@ class PerformanceTracker:
         Returns:
             성공 여부
         """
-        # PostgreSQL: INSERT ... ON CONFLICT DO UPDATE
-        query = """
-            INSERT INTO shorts_performance
-                (video_id, bno, views, likes, comments, shares, ctr, avg_view_duration, last_updated)
-            VALUES
-                (:video_id, :bno, :views, :likes, :comments, :shares, :ctr, :avg_view_duration, NOW())
-            ON CONFLICT (video_id)
-            DO UPDATE SET
-                views = EXCLUDED.views,
-                likes = EXCLUDED.likes,
-                comments = EXCLUDED.comments,
-                shares = EXCLUDED.shares,
-                ctr = EXCLUDED.ctr,
-                avg_view_duration = EXCLUDED.avg_view_duration,
-                last_updated = NOW()
+        record = {
+            "video_id": video_id,
+            "bno": bno,
+            "views": views,
+            "likes": likes,
+            "comments": comments,
+            "shares": shares,
+            "ctr": ctr,
+            "avg_view_duration": avg_view_duration
+        }
+        if not self.record_performances([record]):
+            return False
+
+        logger.info(f"✅ 성과 기록: video_id={video_id}, views={views}")
+        return True
+
+    def record_performances(self, records: List[Dict[str, Any]]) -> int:
+        """
+        여러 영상 성과 일괄 기록 (PostgreSQL ON CONFLICT, 배치당 1문장)
+
+        Args:
+            records: record_performance 인자와 같은 키의 dict 목록
+                     (video_id, bno 필수, 나머지는 없으면 0)
+
+        Returns:
+            기록한 영상 수 (같은 video_id는 마지막 값 1번, 실패 시 0)
         """
+        rows = [
+            {
+                "video_id": record['video_id'],
+                "bno": record['bno'],
+                "views": record.get('views', 0),
+                "likes": record.get('likes', 0),
+                "comments": record.get('comments', 0),
+                "shares": record.get('shares', 0),
+                "ctr": record.get('ctr', 0.0),
+                "avg_view_duration": record.get('avg_view_duration', 0.0)
+            }
+            for record in records
+        ]
 
         try:
-            with self.engine.connect() as conn:
-                with conn.begin():
-                    conn.execute(
-                        sqlalchemy.text(query),
-                        {
-                            "video_id": video_id,
-                            "bno": bno,
-                            "views": views,
-                            "likes": likes,
-                            "comments": comments,
-                            "shares": shares,
-                            "ctr": ctr,
-                            "avg_view_duration": avg_view_duration
-                        }
-                    )
-
-            logger.info(f"✅ 성과 기록: video_id={video_id}, views={views}")
-            return True
+            recorded = bulk_upsert(
+                self.engine, "shorts_performance", rows,
+                conflict=["video_id"],
+                update={
+                    column: f"EXCLUDED.{column}"
+                    for column in ("views", "likes", "comments", "shares", "ctr", "avg_view_duration", "last_updated")
+                },
+                sql_values={"last_updated": "NOW()"}
+            )
+            if len(rows) > 1:
+                logger.info(f"✅ 성과 일괄 기록: {recorded}개 영상")
+            return recorded
 
         except Exception as e:
             logger.error(f"❌ 성과 기록 실패: {e}", exc_info=True)
-            return False
+            return 0
 
     def get_performance_stats(self, days: int = 30) -> Dict[str, Any]:
         """
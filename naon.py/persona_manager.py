@@ -11,6 +11,7 @@ from config import (
     JAVA_PERSONA_API,
     EDGE_TTS_VOICES,
     DEFAULT_VOICE,
+    TTS_TEMPO_FACTOR,
     DB_CONNECTION_STRING,
     LOG_FORMAT, LOG_LEVEL
 )
@@ -19,6 +20,14 @@ logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
 
+def rate_to_factor(speed: str) -> float:
+    """edge-tts rate 문자열 → 배속 ('+35%' → 1.35, '-10%' → 0.9)"""
+    try:
+        return 1.0 + float(str(speed).replace("%", "").strip() or 0) / 100.0
+    except ValueError:
+        return 1.0
+
+
 class PersonaManager:
     """Persona 관리 (9090 죽어도 동작)"""
 
@@ -145,6 +154,10 @@ class PersonaManager:
         """속도 조회"""
         return self.speed_mapping.get(p_id, "+35%")
 
+    def get_effective_speed(self, p_id: str) -> float:
+        """최종 배속 (페르소나 rate × TTS_TEMPO_FACTOR)"""
+        return round(rate_to_factor(self.get_speed(p_id)) * TTS_TEMPO_FACTOR, 3)
+
     def get_tts_config(self, p_id: str) -> Dict[str, Any]:
         """TTS 설정"""
         persona = self.get_persona(p_id)
@@ -152,6 +165,7 @@ class PersonaManager:
         return {
             "voice": self.get_voice(p_id),
             "speed": self.get_speed(p_id),
+            "effective_speed": self.get_effective_speed(p_id),
             "persona_name": persona.get("name", "Unknown") if persona else "Unknown"
         }
 
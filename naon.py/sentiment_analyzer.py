@@ -3,16 +3,21 @@
 - VADER Sentiment Analysis
 - 긍정/부정/중립 판단
 - 품질 점수 산출
+- reply_sentiment에 없거나 분석 후 바뀐 댓글만 채점 (content_hash = 본문 md5),
+  게시글별 통계는 SQL 집계 → 댓글이 그대로인 게시글은 재호출 비용이 집계 쿼리 1회
 """
+import hashlib
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterable, Tuple
 from pathlib import Path
 
+import pandas as pd
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import sqlalchemy
 from sqlalchemy.engine import Engine
 
 from config import BASE_DIR, DB_CONNECTION_STRING, LOG_FORMAT, LOG_LEVEL
+from db_utils import bulk_upsert
 
 # ===============================
 # 로깅 설정
@@ -23,6 +28,110 @@ logger = logging.getLogger(__name__)
 # VADER 분석기
 analyzer = SentimentIntensityAnalyzer()
 
+# 분석 후 수정된 댓글 감지용 본문 해시 컬럼 존재 여부 (엔진 URL별, 컬럼 추가는 board_stats --create-indexes)
+# 없으면 경고 후 결과 없는 댓글만 채점, 있다고 확인된 뒤에만 캐시 (마이그레이션 후 재시작 없이 반영)
+_hash_column_ready: Dict[str, bool] = {}
+_HASH_COLUMN_QUERY = """
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = ANY(current_schemas(false))
+      AND table_name = 'reply_sentiment' AND column_name = 'content_hash'
+"""
+
+# 채점이 필요한 댓글: 결과 없음 / 본문이 바뀜 (content_hash로만 판단)
+_PENDING_REPLIES_QUERY = """
+    SELECT r.bno, r.rno, r.content
+    FROM AI_REPLY r
+             LEFT JOIN reply_sentiment rs ON rs.rno = r.rno
+    WHERE r.bno = ANY(:bnos)
+      AND (rs.rno IS NULL
+           {hash_condition})
+"""
+_HASH_CONDITION = "OR rs.content_hash IS DISTINCT FROM md5(COALESCE(r.content, ''))"
+
+# 게시글별 감성 통계 (_calculate_quality_score와 같은 가중치)
+_BOARD_SENTIMENT_QUERY = """
+    SELECT a.bno,
+           a.total AS total_replies,
+           a.pos / a.total AS positive_ratio,
+           a.neg / a.total AS negative_ratio,
+           (a.total - a.pos - a.neg) / a.total AS neutral_ratio,
+           a.avg_score,
+           GREATEST(0, LEAST(10,
+               a.pos / a.total * 4.0
+               - a.neg / a.total * 3.0
+               + (a.avg_score + 1) * 1.0
+               + LEAST(a.total / 10.0, 1.0)
+           )) AS quality_score
+    FROM (
+        SELECT r.bno,
+               CAST(COUNT(*) AS DOUBLE PRECISION) AS total,
+               COUNT(*) FILTER (WHERE rs.sentiment = 'positive') AS pos,
+               COUNT(*) FILTER (WHERE rs.sentiment = 'negative') AS neg,
+               AVG(rs.score) AS avg_score
+        FROM AI_REPLY r
+                 JOIN reply_sentiment rs ON rs.rno = r.rno
+        WHERE r.bno = ANY(:bnos)
+        GROUP BY r.bno
+    ) a
+"""
+
+BOARD_SENTIMENT_COLUMNS = [
+    'total_replies', 'positive_ratio', 'negative_ratio', 'neutral_ratio', 'avg_score', 'quality_score'
+]
+
+
+def classify_compound(compound_score: float) -> str:
+    """Compound 점수 → 'positive' / 'negative' / 'neutral'"""
+    if compound_score >= 0.05:
+        return 'positive'
+    elif compound_score <= -0.05:
+        return 'negative'
+    else:
+        return 'neutral'
+
+
+def content_hash(content: Any) -> str:
+    """댓글 본문 md5 (PostgreSQL md5(COALESCE(content, ''))와 같은 값)"""
+    return hashlib.md5((content if isinstance(content, str) else '').encode('utf-8')).hexdigest()
+
+
+def score_replies(replies: Iterable[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+    """
+    (rno, 본문) 목록 일괄 채점 → reply_sentiment 행 (빈 본문은 '' = neutral 0)
+
+    모듈 함수라 프로세스 풀 작업으로도 그대로 사용
+    """
+    rows = []
+    for rno, content in replies:
+        compound = analyzer.polarity_scores(content if isinstance(content, str) else '')['compound']
+        rows.append({
+            "rno": int(rno),
+            "sentiment": classify_compound(compound),
+            "score": float(compound),
+            "content_hash": content_hash(content)
+        })
+    return rows
+
+
+def hash_column_ready(engine: Engine) -> bool:
+    """reply_sentiment.content_hash 사용 가능 여부 (information_schema 조회, DDL 없음)"""
+    key = str(engine.url)
+    if _hash_column_ready.get(key):
+        return True
+    try:
+        with engine.connect() as conn:
+            ready = conn.execute(sqlalchemy.text(_HASH_COLUMN_QUERY)).first() is not None
+    except Exception as e:
+        logger.warning(f"⚠️ reply_sentiment 컬럼 확인 실패: {e.__class__.__name__}")
+        return False
+    if ready:
+        _hash_column_ready[key] = True
+    elif key not in _hash_column_ready:
+        _hash_column_ready[key] = False
+        logger.warning("⚠️ reply_sentiment.content_hash 없음 → 수정된 댓글 감지 없이 동작 "
+                       "(python board_stats.py --create-indexes)")
+    return ready
+
 
 # ===============================
 # 감성 분석기
@@ -33,6 +142,7 @@ class SentimentAnalyzer:
     def __init__(self, db_engine: Engine):
         self.engine = db_engine
         self.analyzer = analyzer
+        self.stats = {"scored": 0}
 
     def analyze_text(self, text: str) -> Dict[str, float]:
         """
@@ -50,16 +160,11 @@ class SentimentAnalyzer:
         Returns:
             'positive', 'negative', 'neutral'
         """
-        if compound_score >= 0.05:
-            return 'positive'
-        elif compound_score <= -0.05:
-            return 'negative'
-        else:
-            return 'neutral'
+        return classify_compound(compound_score)
 
     def analyze_board_replies(self, bno: int) -> Dict[str, Any]:
         """
-        게시글의 모든 댓글 감성 분석
+        게시글의 모든 댓글 감성 분석 (analyze_boards_replies 1건)
 
         Returns:
             {
@@ -71,74 +176,51 @@ class SentimentAnalyzer:
                 'quality_score': 8.5
             }
         """
-        query = """
-                SELECT r.rno, r.content
-                FROM AI_REPLY r
-                WHERE r.bno = :bno
-                """
+        stats = self.analyze_boards_replies([bno]).loc[int(bno)].to_dict()
+        stats['total_replies'] = int(stats['total_replies'])
+        return stats
+
+    def analyze_boards_replies(self, bnos: List[int], raise_errors: bool = False) -> pd.DataFrame:
+        """
+        여러 게시글의 댓글 감성 일괄 분석
+
+        1. reply_sentiment에 없거나 분석 후 바뀐 댓글만 조회 (1회)
+        2. 일괄 채점 → 1트랜잭션 upsert
+        3. 게시글별 통계는 SQL 집계 (1회)
+        (raise_errors=True면 실패 시 0 대신 예외, 결과를 캐시하는 호출자용)
+
+        Returns:
+            bno 인덱스 DataFrame (total_replies, positive_ratio, negative_ratio,
+            neutral_ratio, avg_score, quality_score), 댓글 없는 bno는 0
+        """
+        bnos = list(dict.fromkeys(int(bno) for bno in bnos))
+        empty = pd.DataFrame(0.0, index=pd.Index(bnos, name='bno'), columns=BOARD_SENTIMENT_COLUMNS)
+        if not bnos:
+            return empty
 
         try:
+            hashed = hash_column_ready(self.engine)
+            query = _PENDING_REPLIES_QUERY.format(hash_condition=_HASH_CONDITION if hashed else "")
             with self.engine.connect() as conn:
-                result = conn.execute(sqlalchemy.text(query), {"bno": bno})
-                replies = result.fetchall()
-
-                if not replies:
-                    return {
-                        'total_replies': 0,
-                        'positive_ratio': 0,
-                        'negative_ratio': 0,
-                        'neutral_ratio': 0,
-                        'avg_score': 0,
-                        'quality_score': 0
-                    }
-
-                sentiments = []
-                scores = []
-
-                for rno, content in replies:
-                    sentiment = self.analyze_text(content)
-                    compound = sentiment['compound']
-
-                    sentiments.append(self.classify_sentiment(compound))
-                    scores.append(compound)
-
-                    # DB에 저장
-                    self._save_sentiment(rno, self.classify_sentiment(compound), compound)
-
-                # 통계 계산
-                total = len(sentiments)
-                positive_count = sentiments.count('positive')
-                negative_count = sentiments.count('negative')
-                neutral_count = sentiments.count('neutral')
-                avg_score = sum(scores) / total if total > 0 else 0
-
-                # 품질 점수 (0~10)
-                quality_score = self._calculate_quality_score(
-                    positive_count / total,
-                    negative_count / total,
-                    avg_score,
-                    total
-                )
-
-                return {
-                    'total_replies': total,
-                    'positive_ratio': positive_count / total,
-                    'negative_ratio': negative_count / total,
-                    'neutral_ratio': neutral_count / total,
-                    'avg_score': avg_score,
-                    'quality_score': quality_score
-                }
+                pending = conn.execute(sqlalchemy.text(query), {"bnos": bnos}).fetchall()
+
+            rows = score_replies((rno, content) for _, rno, content in pending)
+            if rows:
+                if not hashed:
+                    rows = [{k: v for k, v in row.items() if k != "content_hash"} for row in rows]
+                bulk_upsert(self.engine, "reply_sentiment", rows, conflict=["rno"], sql_values={"analyzed_date": "NOW()"})
+            self.stats["scored"] += len(rows)
 
+            with self.engine.connect() as conn:
+                stats = pd.read_sql(sqlalchemy.text(_BOARD_SENTIMENT_QUERY), conn, params={"bnos": bnos})
         except Exception as e:
-            logger.error(f"❌ 감성 분석 실패 (bno={bno}): {e}", exc_info=True)
-            return {
-                'total_replies': 0,
-                'positive_ratio': 0,
-                'negative_ratio': 0,
-                'neutral_ratio': 0,
-                'avg_score': 0,
-                'quality_score': 0
-            }
+            logger.error(f"❌ 일괄 감성 분석 실패 ({len(bnos)}개): {e}", exc_info=True)
+            if raise_errors:
+                raise
+            return empty
+
+        logger.debug(f"💬 감성 분석: 게시글 {len(bnos)}개, 새로 채점한 댓글 {len(rows)}개")
+        return stats.set_index('bno').reindex(empty.index, fill_value=0.0)[BOARD_SENTIMENT_COLUMNS].astype(float)
 
     def _calculate_quality_score(
             self,
@@ -174,26 +256,21 @@ class SentimentAnalyzer:
 
     def _save_sentiment(self, rno: int, sentiment: str, score: float) -> None:
         """감성 분석 결과 DB 저장 (PostgreSQL)"""
-        # PostgreSQL: INSERT ... ON CONFLICT DO UPDATE
-        query = """
-            INSERT INTO reply_sentiment (rno, sentiment, score, analyzed_date)
-            VALUES (:rno, :sentiment, :score, NOW())
-            ON CONFLICT (rno)
-            DO UPDATE SET
-                sentiment = EXCLUDED.sentiment,
-                score = EXCLUDED.score,
-                analyzed_date = NOW()
-        """
+        self._save_sentiments([{"rno": rno, "sentiment": sentiment, "score": score}])
 
+    def _save_sentiments(self, rows: List[Dict[str, Any]]) -> None:
+        """감성 분석 결과 일괄 저장 (배치당 1문장, 1트랜잭션)"""
+        if not rows:
+            return
+
+        params = [
+            {"rno": int(row['rno']), "sentiment": str(row['sentiment']), "score": float(row['score'])}
+            for row in rows
+        ]
         try:
-            with self.engine.connect() as conn:
-                with conn.begin():
-                    conn.execute(
-                        sqlalchemy.text(query),
-                        {"rno": rno, "sentiment": sentiment, "score": score}
-                    )
+            bulk_upsert(self.engine, "reply_sentiment", params, conflict=["rno"], sql_values={"analyzed_date": "NOW()"})
         except Exception as e:
-            logger.error(f"❌ 감성 저장 실패 (rno={rno}): {e}")
+            logger.error(f"❌ 감성 일괄 저장 실패 ({len(params)}건): {e}")
 
 
 # ===============================
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+댓글 감성 백필 (reply_sentiment 일괄 채우기)
+- 과거 게시글을 들여온 뒤 수백만 댓글을 큐레이션 중 게시글 단위로 채점하지 않도록 미리 채움
+- 결과 없는 댓글만 rno 키셋 페이지로 청크 단위 조회 (청크마다 짧은 읽기 트랜잭션, 메모리는 청크 수에 비례)
+  → 장시간 열린 스냅샷이 없어 백필 중에도 VACUUM이 정리할 수 있음
+- VADER는 순수 파이썬(CPU 바운드) → 프로세스 풀로 청크 병렬 채점 (진행 중 청크는 워커 수 x 2개로 제한)
+- 청크 결과는 rno 순서대로 배열 upsert(unnest) + 체크포인트(sync_watermarks.last_rno)를 한 트랜잭션에 기록
+  → 중단 후 다시 실행하면 마지막 체크포인트 다음부터 이어서 진행 (upsert라 중복 실행도 안전)
+- 채점 규칙은 sentiment_analyzer.score_replies (큐레이션 경로와 같은 점수/분류/content_hash)
+
+Usage:
+    python sentiment_backfill.py [--workers 8] [--chunk 2000] [--restart]
+    python sentiment_backfill.py --scaling 1,2,4,8 [--sample 50000]   # 워커 수별 replies/s (DB 쓰기 없음)
+"""
+import argparse
+import logging
+import multiprocessing as mp
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import sqlalchemy
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from board_stats import WATERMARK_DDL
+from config import (
+    DB_CONNECTION_STRING, SENTIMENT_BACKFILL_CHUNK, SENTIMENT_BACKFILL_WORKERS, LOG_FORMAT, LOG_LEVEL
+)
+from sentiment_analyzer import hash_column_ready, score_replies
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "reply_sentiment_backfill"
+PROGRESS_INTERVAL = 10.0  # 진행 로그 간격 (초)
+
+# 키셋 페이지: 직전 청크 마지막 rno 이후 아직 채점되지 않은 댓글 (rno PK 인덱스 범위 스캔)
+_UNSCORED_QUERY = """
+    SELECT r.rno, r.content
+    FROM AI_REPLY r
+    WHERE r.rno > :last_rno AND r.rno <= :max_rno
+      AND NOT EXISTS (SELECT 1 FROM reply_sentiment rs WHERE rs.rno = r.rno)
+    ORDER BY r.rno
+    FETCH FIRST :chunk ROWS ONLY
+"""
+
+# 청크 결과 upsert (열 배열 4개를 unnest, 문장 1개 = 왕복 1회, 파라미터 수가 행 수와 무관)
+_UPSERT_SENTIMENT = """
+    INSERT INTO reply_sentiment (rno, sentiment, score, {hash_column}analyzed_date)
+    SELECT u.*, NOW()
+    FROM unnest(
+        CAST(:rno AS BIGINT[]), CAST(:sentiment AS TEXT[]), CAST(:score AS DOUBLE PRECISION[]){hash_param}
+    ) AS u
+    ON CONFLICT (rno) DO UPDATE SET
+        sentiment = EXCLUDED.sentiment,
+        score = EXCLUDED.score,
+        {hash_update}analyzed_date = EXCLUDED.analyzed_date
+"""
+
+Chunk = List[Tuple[int, Any]]
+
+
+class SentimentBackfill:
+    """reply_sentiment 백필기 (키셋 페이지 + 프로세스 풀 + 체크포인트)"""
+
+    def __init__(
+            self,
+            db_engine: Engine,
+            workers: int = SENTIMENT_BACKFILL_WORKERS,
+            chunk_size: int = SENTIMENT_BACKFILL_CHUNK,
+            name: str = WATERMARK_NAME
+    ):
+        self.engine = db_engine
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.name = name
+        self._hashed = False
+        self._upsert = ""
+
+    # ===============================
+    # 스키마 / 체크포인트
+    # ===============================
+    def ensure_schema(self) -> bool:
+        """워터마크 테이블 준비 + reply_sentiment.content_hash 사용 여부 확인"""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(WATERMARK_DDL))
+        except Exception as e:
+            logger.error(f"❌ 감성 백필 워터마크 테이블 생성 실패: {e}")
+            return False
+        self._hashed = hash_column_ready(self.engine)
+        self._upsert = _UPSERT_SENTIMENT.format(
+            hash_column="content_hash, " if self._hashed else "",
+            hash_param=", CAST(:content_hash AS TEXT[])" if self._hashed else "",
+            hash_update="content_hash = EXCLUDED.content_hash, " if self._hashed else ""
+        )
+        return True
+
+    def _lock_watermark(self, conn: Connection) -> int:
+        conn.execute(
+            text("INSERT INTO sync_watermarks (name) VALUES (:name) ON CONFLICT (name) DO NOTHING"),
+            {"name": self.name}
+        )
+        return conn.execute(
+            text("SELECT last_rno FROM sync_watermarks WHERE name = :name FOR UPDATE"),
+            {"name": self.name}
+        ).scalar()
+
+    def _save_watermark(self, conn: Connection, last_rno: int) -> None:
+        conn.execute(
+            text("UPDATE sync_watermarks SET last_rno = :last_rno, updated_at = NOW() WHERE name = :name"),
+            {"last_rno": last_rno, "name": self.name}
+        )
+
+    # ===============================
+    # 백필
+    # ===============================
+    def _chunks(self, last_rno: int, max_rno: int) -> Iterator[Chunk]:
+        """rno 키셋으로 chunk_size개씩 (청크마다 새 연결/트랜잭션, 읽은 뒤 바로 반환)"""
+        while last_rno < max_rno:
+            with self.engine.connect() as conn:
+                chunk = [
+                    (int(rno), content) for rno, content in conn.execute(
+                        text(_UNSCORED_QUERY), {"last_rno": last_rno, "max_rno": max_rno, "chunk": self.chunk_size}
+                    )
+                ]
+            if not chunk:
+                return
+            yield chunk
+            last_rno = chunk[-1][0]
+
+    def _write(self, rows: List[Dict[str, Any]], checkpoint: int) -> None:
+        """청크 결과 upsert + 체크포인트 (같은 트랜잭션)"""
+        columns = ["rno", "sentiment", "score"] + (["content_hash"] if self._hashed else [])
+        params = {column: [row[column] for row in rows] for column in columns}
+        with self.engine.begin() as conn:
+            self._lock_watermark(conn)
+            conn.execute(text(self._upsert), params)
+            self._save_watermark(conn, checkpoint)
+
+    def run(self, restart: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        체크포인트 이후 결과 없는 댓글 채점 (시작 시점의 MAX(rno)까지, 이후 댓글은 큐레이션 경로가 처리)
+
+        Returns:
+            {'replies': 120000, 'chunks': 60, 'seconds': 12.5, 'replies_per_s': 9600.0, 'workers': 8},
+            실패 시 None (이미 기록된 청크는 유지 → 다시 실행하면 이어서)
+        """
+        if not self.ensure_schema():
+            return None
+
+        started = time.perf_counter()
+        report = {"replies": 0, "chunks": 0, "seconds": 0.0, "replies_per_s": 0.0, "workers": self.workers}
+        try:
+            with self.engine.begin() as conn:
+                last_rno = self._lock_watermark(conn)
+                if restart:
+                    last_rno = 0
+                    self._save_watermark(conn, 0)
+                max_rno = conn.execute(text("SELECT COALESCE(MAX(rno), 0) FROM AI_REPLY")).scalar()
+            logger.info(f"💬 감성 백필 시작: rno {last_rno:,} → {max_rno:,} (워커 {self.workers}, 청크 {self.chunk_size})")
+
+            pending: Deque[Tuple[int, Any]] = deque()
+            last_log = time.perf_counter()
+            ctx = mp.get_context("spawn")  # 부모의 DB 연결/풀을 복제하지 않음
+            with ctx.Pool(self.workers) as pool:
+                for chunk in self._chunks(last_rno, max_rno):
+                    pending.append((chunk[-1][0], pool.apply_async(score_replies, (chunk,))))
+                    # 진행 중 청크 제한 (앞서 읽어 둔 청크가 쌓이지 않음), 완료는 rno 순서대로 기록
+                    while len(pending) >= self.workers * 2 or (pending and pending[0][1].ready()):
+                        self._finish(pending, report)
+                    if time.perf_counter() - last_log >= PROGRESS_INTERVAL:
+                        last_log = time.perf_counter()
+                        self._log_progress(report, started, max_rno)
+                while pending:
+                    self._finish(pending, report)
+
+            with self.engine.begin() as conn:
+                self._lock_watermark(conn)
+                self._save_watermark(conn, max_rno)
+        except Exception as e:
+            logger.error(f"❌ 감성 백필 실패 (체크포인트부터 재실행 가능): {e}", exc_info=True)
+            return None
+
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        report["replies_per_s"] = round(report["replies"] / report["seconds"], 1) if report["seconds"] else 0.0
+        logger.info(
+            f"💬 감성 백필 완료: 댓글 {report['replies']:,}개, {report['seconds']}s "
+            f"({report['replies_per_s']:,.0f} replies/s, 워커 {self.workers})"
+        )
+        return report
+
+    def _finish(self, pending: Deque[Tuple[int, Any]], report: Dict[str, Any]) -> None:
+        checkpoint, result = pending.popleft()
+        rows = result.get()
+        self._write(rows, checkpoint)
+        report["replies"] += len(rows)
+        report["chunks"] += 1
+        report["checkpoint"] = checkpoint
+
+    def _log_progress(self, report: Dict[str, Any], started: float, max_rno: int) -> None:
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"💬 감성 백필 진행: rno {report.get('checkpoint', 0):,} / {max_rno:,}, 댓글 {report['replies']:,}개 "
+            f"({report['replies'] / elapsed:,.0f} replies/s)"
+        )
+
+
+# ===============================
+# 워커 수별 처리량 (DB 쓰기 없음)
+# ===============================
+def measure_scaling(
+        db_engine: Engine,
+        worker_counts: Sequence[int],
+        sample: int,
+        chunk_size: int = SENTIMENT_BACKFILL_CHUNK
+) -> List[Dict[str, Any]]:
+    """
+    앞쪽 댓글 sample개를 워커 수별로 채점한 replies/s (풀 시작 시간 제외)
+
+    Returns:
+        [{'workers': 1, 'seconds': 4.1, 'replies_per_s': 12000.0, 'efficiency': 1.0}, ...]
+    """
+    with db_engine.connect() as conn:
+        replies = [
+            (int(rno), content) for rno, content in conn.execute(
+                text("SELECT rno, content FROM AI_REPLY ORDER BY rno FETCH FIRST :sample ROWS ONLY"),
+                {"sample": sample}
+            )
+        ]
+    chunks = [replies[i: i + chunk_size] for i in range(0, len(replies), chunk_size)]
+
+    results = []
+    ctx = mp.get_context("spawn")
+    for workers in worker_counts:
+        with ctx.Pool(workers) as pool:
+            pool.map(score_replies, [[(0, "warm up")]] * workers)  # 워커 import/VADER 로드
+            started = time.perf_counter()
+            scored = sum(len(rows) for rows in pool.imap(score_replies, chunks))
+            seconds = time.perf_counter() - started
+        rate = scored / seconds if seconds else 0.0
+        base = results[0]["replies_per_s"] / results[0]["workers"] if results else rate / workers
+        results.append({
+            "workers": workers,
+            "seconds": round(seconds, 3),
+            "replies_per_s": round(rate, 1),
+            "efficiency": round(rate / (base * workers), 2) if base else 0.0
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="댓글 감성 백필 (reply_sentiment)")
+    parser.add_argument("--workers", type=int, default=SENTIMENT_BACKFILL_WORKERS, help="채점 프로세스 수")
+    parser.add_argument("--chunk", type=int, default=SENTIMENT_BACKFILL_CHUNK, help="청크당 댓글 수")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 (채점된 댓글은 건너뜀)")
+    parser.add_argument("--scaling", default="", help="워커 수 목록 (예: 1,2,4,8), 처리량만 측정하고 종료")
+    parser.add_argument("--sample", type=int, default=50000, help="--scaling 측정 댓글 수")
+    args = parser.parse_args()
+
+    engine = sqlalchemy.create_engine(DB_CONNECTION_STRING, pool_pre_ping=True)
+    if args.scaling:
+        counts = [int(w) for w in args.scaling.split(",") if w.strip()]
+        print(f"\n{'workers':>7} {'seconds':>9} {'replies/s':>11} {'efficiency':>10}")
+        for row in measure_scaling(engine, counts, args.sample, args.chunk):
+            print(f"{row['workers']:>7} {row['seconds']:>9.2f} {row['replies_per_s']:>11,.0f} {row['efficiency']:>10.2f}")
+        print()
+        return
+
+    report = SentimentBackfill(engine, workers=args.workers, chunk_size=args.chunk).run(restart=args.restart)
+    if report is None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,32 +5,29 @@ AI 쇼츠 자동 생성 (PostgreSQL 완전 호환)
 - 인코딩: 1080x1920, 2.5Mbps 이상
 """
 import logging
-import subprocess
-import asyncio
-import shutil
 import time
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 
-import edge_tts
-from gtts import gTTS
 import sqlalchemy
 from sqlalchemy import text
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
 from moviepy.editor import (
-    VideoClip, AudioFileClip, CompositeVideoClip, TextClip, 
-    concatenate_audioclips
+    VideoClip, AudioFileClip, CompositeVideoClip, TextClip,
+    CompositeAudioClip
 )
 import moviepy.audio.fx.all as afx
 
 from config import (
     DB_CONNECTION_STRING, OUTPUT_DIR, BASE_DIR,
-    LOG_FORMAT, LOG_LEVEL, EDGE_TTS_VOICES, DEFAULT_VOICE
+    LOG_FORMAT, LOG_LEVEL, EDGE_TTS_VOICES, DEFAULT_VOICE, TTS_PAD_SECONDS
 )
 from persona_manager import persona_manager
+from tts_service import synthesize_cached, build_jobs, split_text_into_parts
+from audio_utils import apply_tempo
 
 logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
 logger = logging.getLogger(__name__)
@@ -192,99 +189,28 @@ def insert_upload_schedule(bno: int) -> bool:
         return False
 
 
-async def generate_audio_async(text: str, voice: str, speed: str, output_path: Path) -> bool:
-    """edge-tts 음성 생성"""
-    try:
-        rate_value = speed.replace("+", "").replace("%", "")
-        rate_str = f"+{rate_value}%"
-        
-        communicate = edge_tts.Communicate(text, voice, rate=rate_str)
-        await communicate.save(str(output_path))
-        
-        return output_path.exists()
-    except Exception as e:
-        logger.warning(f"edge-tts 실패: {e}")
-        return False
+def generate_audio_batch(jobs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    TTS 배치 생성 (캐시 조회 → 미스만 단일 이벤트 루프 동시 합성)
 
+    최종 배속은 합성기에 직접 요청하고, 남는 배속(폴백 등)은 결과의
+    remaining_tempo로 돌려받아 합성 단계에서 PCM으로 처리한다.
 
-def generate_audio_with_gtts(text: str, output_path: Path) -> bool:
-    """gTTS fallback"""
-    try:
-        tts = gTTS(text=text, lang='ko', slow=False)
-        tts.save(str(output_path))
-        return output_path.exists()
-    except Exception as e:
-        logger.error(f"gTTS 실패: {e}")
-        return False
+    Returns:
+        (jobs 순서의 결과, {'hits': n, 'misses': m})
+    """
+    return synthesize_cached(jobs)
 
 
-def apply_speed_with_ffmpeg(input_path: Path, output_path: Path, speed: float = 1.35) -> bool:
-    """ffmpeg atempo 속도 조정"""
-    try:
-        cmd = [
-            "ffmpeg", "-y", "-i", str(input_path),
-            "-af", f"atempo={speed},apad=pad_dur=0.2",
-            str(output_path)
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, timeout=30)
-        
-        if result.returncode == 0 and output_path.exists():
-            return True
-        
-        shutil.copy(input_path, output_path)
-        return True
-        
-    except Exception as e:
-        logger.warning(f"ffmpeg 실행 실패: {e}")
-        shutil.copy(input_path, output_path)
-        return True
-
-
-def generate_audio_sync(text: str, voice: str, speed: str, output_path: Path) -> bool:
-    """TTS 생성 + 속도 조정"""
-    temp_path = output_path.parent / f"temp_{output_path.name}"
-    
-    success = asyncio.run(generate_audio_async(text, voice, speed, temp_path))
-    
-    if not success:
-        logger.warning("edge-tts 실패 → gTTS fallback")
-        success = generate_audio_with_gtts(text, temp_path)
-    
-    if not success:
-        return False
-    
-    apply_speed_with_ffmpeg(temp_path, output_path, speed=1.35)
-    
-    if temp_path.exists():
-        temp_path.unlink()
-    
-    return output_path.exists()
-
-
-def split_text_into_parts(text: str, max_length: int = 80) -> List[str]:
-    """텍스트 분할"""
-    sentences = text.replace("! ", "!|").replace(". ", ".|").replace("? ", "?|").split("|")
-    
-    parts = []
-    current = ""
-    
-    for sent in sentences:
-        sent = sent.strip()
-        if not sent:
-            continue
-        
-        if len(current) + len(sent) <= max_length:
-            current += sent + " "
-        else:
-            if current:
-                parts.append(current.strip())
-            current = sent + " "
-    
-    if current:
-        parts.append(current.strip())
-    
-    return parts if parts else [text[:max_length]]
+def generate_audio_sync(text: str, voice: str, speed: float, output_path: Path) -> bool:
+    """TTS 생성 (단일 파트, speed는 최종 배속)"""
+    results, _ = generate_audio_batch([{
+        "text": text,
+        "voice": voice,
+        "speed": speed,
+        "output_path": output_path
+    }])
+    return results[0]["success"]
 
 
 def get_background_images(bno: int, count: int = 3) -> List[Path]:
@@ -479,20 +405,26 @@ def render_video_with_persona(
         
         tts_config = persona_manager.get_tts_config(p_id)
         voice = tts_config["voice"]
-        speed = tts_config["speed"]
+        speed = tts_config["effective_speed"]
         
-        logger.info(f"🎙️ Persona: {tts_config['persona_name']}, Voice: {voice}")
+        logger.info(f"🎙️ Persona: {tts_config['persona_name']}, Voice: {voice}, 배속: {speed:.2f}x")
         
         parts = split_text_into_parts(content, max_length=80)
         logger.info(f"📝 텍스트 분할: {len(parts)}개")
         
+        render_started = time.time()
+        jobs = build_jobs(parts, voice, speed, TEMP_DIR, prefix=f"tts_{bno}")
+        results, cache_stats = generate_audio_batch(jobs)
+        tts_elapsed = time.time() - render_started
+
         audio_files = []
-        for idx, part in enumerate(parts):
-            audio_path = TEMP_DIR / f"tts_{bno}_{idx}.mp3"
-            success = generate_audio_sync(part, voice, speed, audio_path)
-            
-            if success:
-                audio_files.append(audio_path)
+        audio_texts = []
+        audio_tempos = []
+        for idx, (job, result) in enumerate(zip(jobs, results)):
+            if result["success"]:
+                audio_files.append(result["output_path"])
+                audio_texts.append(job["text"])
+                audio_tempos.append(result["remaining_tempo"])
             else:
                 logger.warning(f"TTS 실패: part {idx}")
         
@@ -503,11 +435,14 @@ def render_video_with_persona(
         bg_images = get_background_images(bno, count=len(parts))
         
         body_clips = []
+        voice_clips = []
         body_time = 0.0
         
         for idx, audio_path in enumerate(audio_files):
-            audio = AudioFileClip(str(audio_path))
-            part_dur = audio.duration
+            # 남은 배속은 PCM에서, 파트 사이 무음은 타임라인 간격으로 처리
+            audio = apply_tempo(AudioFileClip(str(audio_path)), audio_tempos[idx])
+            voice_clips.append(audio.set_start(body_time))
+            part_dur = audio.duration + TTS_PAD_SECONDS
             
             img_idx = idx % len(bg_images)
             kb_dir = "zoom_in" if idx % 2 == 0 else "zoom_out"
@@ -518,7 +453,7 @@ def render_video_with_persona(
             
             body_clips.append(kb_clip)
             
-            text = parts[idx]
+            text = audio_texts[idx]
             y_pos = 800 if idx % 2 == 0 else 900
             
             shadow = TextClip(
@@ -549,12 +484,12 @@ def render_video_with_persona(
         
         final_video = CompositeVideoClip(body_clips, size=(VIDEO_WIDTH, VIDEO_HEIGHT))
         
-        full_audio = concatenate_audioclips([AudioFileClip(str(a)) for a in audio_files])
+        full_audio = CompositeAudioClip(voice_clips).set_duration(body_time)
+        final_audio = full_audio
         
         bgm_path = ASSETS_DIR / "bgm.mp3"
         if bgm_path.exists():
             try:
-                from moviepy.audio.AudioClip import CompositeAudioClip
                 bgm = AudioFileClip(str(bgm_path))
                 bgm = bgm.subclip(0, min(bgm.duration, final_video.duration))
                 bgm = bgm.fx(afx.volumex, BGM_VOLUME)
@@ -566,6 +501,9 @@ def render_video_with_persona(
         
         output_path = OUTPUT_DIR / f"shorts_{video_type}_{bno}.mp4"
         
+        compose_elapsed = time.time() - render_started - tts_elapsed
+        encode_started = time.time()
+
         # 품질 보장: 1080x1920, 2.5Mbps
         final_video.write_videofile(
             str(output_path),
@@ -577,6 +515,13 @@ def render_video_with_persona(
             threads=4,
             ffmpeg_params=['-pix_fmt', 'yuv420p']
         )
+        encode_elapsed = time.time() - encode_started
+
+        logger.info(
+            f"⏱️ 렌더 타이밍 bno={bno}: TTS {tts_elapsed:.2f}s "
+            f"(캐시 hit {cache_stats['hits']} / miss {cache_stats['misses']}), "
+            f"합성 {compose_elapsed:.2f}s, 인코딩 {encode_elapsed:.2f}s"
+        )
         
         thumbnail_path = create_thumbnail(title, video_type, bno)
         
@@ -5,24 +5,61 @@ import logging
 from typing import List, Dict, Any, Tuple
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-import torch
-from sentence_transformers import SentenceTransformer, util
 import sqlalchemy
 from sqlalchemy.engine import Engine
 
+from board_stats import BoardStats
+from curation_cache import CurationCache
 from config import (
     BASE_DIR, DB_CONNECTION_STRING,
     SIMILARITY_THRESHOLD, AGRO_HIT_THRESHOLD, INFO_DEPTH_THRESHOLD,
     LOG_FORMAT, LOG_LEVEL
 )
+from embedding_service import get_embedding_service
+from embedding_store import EmbeddingStore, greedy_select
+from minhash_lsh import AcceptedJaccard, minhasher
+from keyword_index import KeywordIndex
 from sentiment_analyzer import SentimentAnalyzer
-from trend_analyzer import TrendAnalyzer
+from trend_snapshot import get_trend_snapshots
 
 logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
-model: SentenceTransformer = SentenceTransformer('all-MiniLM-L6-v2')
+
+def build_candidate_query(video_type: str) -> str:
+    """
+    트랙별 품질 후보 쿼리
+
+    댓글 수/본문 길이는 board_stats에서 읽음 (INFO는 content_length 인덱스 순서로 스캔)
+    """
+    base_query = """
+                 SELECT
+                     b.bno, b.title, b.content, b.shorts_script,
+                     b.hit, b.p_id, b.writer,
+                     s.reply_count
+                 FROM board_stats s
+                          JOIN AI_BOARD b ON b.bno = s.bno
+                 WHERE s.content_length >= 300
+                   AND b.hit > 50
+                   AND NOT EXISTS (
+                     SELECT 1 FROM shorts_queue sq
+                     WHERE sq.bno = b.bno AND sq.status IN (0, 1)
+                 ) \
+                 """
+
+    if video_type == "AGRO":
+        return base_query + """
+            AND b.hit > :hit_threshold
+            ORDER BY b.hit DESC, s.reply_count DESC
+            FETCH FIRST :limit ROWS ONLY
+        """
+    return base_query + """
+            AND s.content_length > :depth_threshold
+            ORDER BY s.content_length DESC, s.reply_count DESC
+            FETCH FIRST :limit ROWS ONLY
+        """
 
 
 class SmartCurator:
@@ -35,39 +72,21 @@ class SmartCurator:
     ):
         self.engine = db_engine
         self.similarity_threshold = similarity_threshold
-        self.model = model
+        self.embedder = get_embedding_service()  # 모델은 첫 인코딩 때 로드
+        self.embedding_store = EmbeddingStore(db_engine, encode=self.encode_texts, text_length=200)
         self.sentiment_analyzer = SentimentAnalyzer(db_engine)
-        self.trend_analyzer = TrendAnalyzer(db_engine)
+        self.trends = get_trend_snapshots(db_engine)  # API/메인 루프와 공유하는 7일 트렌드
+        self.keyword_index = KeywordIndex(db_engine)  # 제목 트렌드 매칭은 색인 조회
+        self.board_stats = BoardStats(db_engine)
+        self.curation_cache = CurationCache(db_engine)  # 본문이 바뀐 게시글만 다시 인코딩
+        self.prefilter_stats = {"candidates": 0, "lexical_rejects": 0}
 
     def fetch_quality_candidates(self, video_type: str, limit: int = 30) -> pd.DataFrame:
-        """품질 기준으로 후보 조회"""
-        base_query = """
-                     SELECT
-                         b.bno, b.title, b.content, b.shorts_script,
-                         b.hit, b.p_id, b.writer,
-                         (SELECT COUNT(*) FROM AI_REPLY r WHERE r.bno = b.bno) as reply_count
-                     FROM AI_BOARD b
-                     WHERE LENGTH(b.content) >= 300
-                       AND b.hit > 50
-                       AND NOT EXISTS (
-                         SELECT 1 FROM shorts_queue sq
-                         WHERE sq.bno = b.bno AND sq.status IN (0, 1)
-                     ) \
-                     """
-
+        """품질 기준으로 후보 조회 (board_stats는 curate_premium에서 동기화)"""
+        query = build_candidate_query(video_type)
         if video_type == "AGRO":
-            query = base_query + """
-                AND b.hit > :hit_threshold
-                ORDER BY b.hit DESC, reply_count DESC
-                FETCH FIRST :limit ROWS ONLY
-            """
             params = {"hit_threshold": AGRO_HIT_THRESHOLD, "limit": limit}
         else:
-            query = base_query + """
-                AND LENGTH(b.content) > :depth_threshold
-                ORDER BY LENGTH(b.content) DESC, reply_count DESC
-                FETCH FIRST :limit ROWS ONLY
-            """
             params = {"depth_threshold": INFO_DEPTH_THRESHOLD, "limit": limit}
 
         try:
@@ -80,96 +99,146 @@ class SmartCurator:
             return pd.DataFrame()
 
     def calculate_quality_score(self, row: pd.Series) -> float:
-        """종합 품질 점수 계산"""
-        bno = int(row['bno'])
+        """종합 품질 점수 계산 (게시글 1개, calculate_quality_scores에 위임)"""
+        return float(self.calculate_quality_scores(pd.DataFrame([row])).iloc[0])
+
+    def calculate_quality_scores(self, candidates_df: pd.DataFrame) -> pd.Series:
+        """
+        후보 전체 종합 품질 점수 (일괄 계산)
+
+        댓글 감성은 후보 전체를 한 번에 조회 (바뀐 댓글만 채점), 트렌드는 1회만 로드
+        """
+        if candidates_df.empty:
+            return pd.Series(dtype=float, index=candidates_df.index)
 
         # 감성 분석
-        sentiment_result = self.sentiment_analyzer.analyze_board_replies(bno)
-        sentiment_score = sentiment_result['quality_score'] * 0.4
+        bnos = candidates_df['bno'].astype(int).tolist()
+        sentiment = self.sentiment_analyzer.analyze_boards_replies(bnos)
+        sentiment_score = sentiment.loc[bnos, 'quality_score'].to_numpy(dtype=float) * 0.4
 
-        # 트렌드 매칭
-        top_trends = self.trend_analyzer.get_top_trends(limit=20)
-        title = row['title']
-        trend_match = sum(1 for keyword in top_trends if keyword in title)
-        trend_score = min(trend_match / 3.0 * 3.0, 3.0)
+        # 트렌드 매칭 (키워드 색인 조회 1회)
+        trend_match = self.trend_matches(candidates_df)
+        trend_score = np.minimum(trend_match / 3.0 * 3.0, 3.0)
 
         # 댓글 수
-        reply_count = row.get('reply_count', 0)
-        reply_score = min(reply_count / 10.0 * 2.0, 2.0)
+        if 'reply_count' in candidates_df:
+            reply_count = candidates_df['reply_count'].fillna(0).to_numpy(dtype=float)
+        else:
+            reply_count = np.zeros(len(candidates_df))
+        reply_score = np.minimum(reply_count / 10.0 * 2.0, 2.0)
 
         # 조회수
-        hit_score = min(row['hit'] / 200.0 * 1.0, 1.0)
-
-        total_score = sentiment_score + trend_score + reply_score + hit_score
-
-        return total_score
+        hit_score = np.minimum(candidates_df['hit'].to_numpy(dtype=float) / 200.0 * 1.0, 1.0)
+
+        return pd.Series(sentiment_score + trend_score + reply_score + hit_score, index=candidates_df.index)
+
+    def trend_matches(self, candidates_df: pd.DataFrame) -> np.ndarray:
+        """
+        후보 제목에 들어 있는 상위 트렌드 키워드 수 (서로 다른 키워드 기준)
+
+        키워드 색인에서 첫 위치가 제목 안인 키워드만 세고, 색인을 못 쓰면 제목마다 오토마톤 스캔
+        """
+        snapshot = self.trends.get(days=7)
+        keywords = self.keyword_index.keyword_frame(candidates_df['bno'])
+        if keywords is None:
+            trend_matcher = snapshot.matcher(limit=20)
+            titles = candidates_df['title'].fillna('').astype(str)
+            return np.array([trend_matcher.count(title) for title in titles], dtype=float)
+
+        # 색인 위치는 post_text(title, content) 기준 → 앞 len(title)자가 제목
+        title_length = pd.Series(
+            [len(title) if isinstance(title, str) else 0 for title in candidates_df['title']],
+            index=candidates_df['bno'].astype('int64').to_numpy()
+        )
+        title_length = title_length[~title_length.index.duplicated()]
+        in_title = keywords[
+            keywords['keyword'].isin(snapshot.top_keywords(20))
+            & (keywords['position'] < keywords['bno'].map(title_length).fillna(0))
+        ]
+        matches = in_title.groupby('bno').size()
+        return candidates_df['bno'].astype('int64').map(matches).fillna(0).to_numpy(dtype=float)
+
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """텍스트 → 정규화 임베딩 (n, dim)"""
+        return self.embedder.encode(texts)
 
     def is_duplicate(self, new_text: str, existing_texts: List[str]) -> Tuple[bool, float]:
-        """90% 유사도 체크"""
+        """90% 유사도 체크 (하위 호환용, 선정은 filter_track의 greedy_select)"""
         if not existing_texts:
             return False, 0.0
 
         try:
-            new_embedding = self.model.encode(new_text, convert_to_tensor=True)
-            existing_embeddings = self.model.encode(existing_texts, convert_to_tensor=True)
-
-            cosine_scores = util.cos_sim(new_embedding, existing_embeddings)
-            max_score: float = float(torch.max(cosine_scores).item())
+            vectors = self.encode_texts([new_text] + list(existing_texts))
+            max_score = float(np.max(vectors[1:] @ vectors[0]))
 
             return max_score > self.similarity_threshold, max_score
         except Exception as e:
             logger.error(f"❌ 유사도 체크 오류: {e}", exc_info=True)
             return False, 0.0
 
-    def fetch_existing_contents(self) -> List[str]:
-        """기존 제작본 텍스트"""
-        query: str = """
-                     SELECT b.title || ' ' || SUBSTR(b.content, 1, 200) as full_text
-                     FROM AI_BOARD b
-                              JOIN shorts_queue sq ON b.bno = sq.bno
-                     WHERE sq.status = 1 \
-                     """
-
-        try:
-            with self.engine.connect() as conn:
-                df = pd.read_sql(sqlalchemy.text(query), conn)
-                return df['full_text'].tolist() if not df.empty else []
-        except Exception as e:
-            logger.error(f"❌ 기존 컨텐츠 조회 실패: {e}", exc_info=True)
-            return []
-
     def filter_track(
             self,
             candidates_df: pd.DataFrame,
             video_type: str,
-            existing_texts: List[str],
             max_selected: int = 3
     ) -> List[Dict[str, Any]]:
-        """특정 트랙 필터링"""
-        selected: List[Dict[str, Any]] = []
+        """
+        특정 트랙 필터링 (제작본 저장소는 curate_premium에서 동기화)
+
+        1단계: MinHash/LSH로 제작본의 재게시글을 임베딩 없이 제외
+        2단계: 남은 후보 임베딩(캐시에 없거나 본문이 바뀐 것만 인코딩) × 이력 유사도를
+               한 번에 계산한 뒤 품질 순서대로 greedy 선정 (선정될 때마다 후보별 최대 유사도 갱신,
+               먼저 선정된 후보의 재게시글도 MinHash로 컷)
+        """
+        if candidates_df.empty:
+            return []
+
+        rows = candidates_df.to_dict('records')
+        texts = [f"{row['title']} {row['content'][:200]}" for row in rows]
+
+        try:
+            signatures = minhasher.signatures(texts)
+            lexical_dup, lexical_scores = self.embedding_store.lexical_duplicates(texts, signatures=signatures)
+            self.prefilter_stats["candidates"] += len(rows)
+            self.prefilter_stats["lexical_rejects"] += int(lexical_dup.sum())
+            for idx in np.flatnonzero(lexical_dup):
+                logger.info(f"🚫 [{video_type}] 어휘 중복 컷: BNO={rows[idx]['bno']} (Jaccard {lexical_scores[idx]:.2f})")
+
+            keep = np.flatnonzero(~lexical_dup)
+            picked = []
+            if len(keep):
+                vectors = self.curation_cache.embeddings(
+                    [int(rows[idx]['bno']) for idx in keep], [texts[idx] for idx in keep], self.encode_texts
+                )
+                history_scores = self.embedding_store.max_similarity(vectors)
+                lexical = AcceptedJaccard(signatures[keep])
+                picked_keep, _ = greedy_select(
+                    vectors, history_scores, self.similarity_threshold, max_selected, lexical=lexical
+                )
+                picked = [int(keep[idx]) for idx in picked_keep]
+                self.prefilter_stats["lexical_rejects"] += len(lexical.rejected)
+                for idx, score in lexical.rejected.items():
+                    logger.info(f"🚫 [{video_type}] 어휘 중복 컷: BNO={rows[keep[idx]]['bno']} (Jaccard {score:.2f})")
+        except Exception as e:
+            logger.error(f"❌ 유사도 체크 오류: {e}", exc_info=True)
+            picked = list(range(min(max_selected, len(rows))))
 
-        for _, row in candidates_df.iterrows():
-            if len(selected) >= max_selected:
-                break
-
-            full_text: str = f"{row['title']} {row['content'][:200]}"
-            is_dup, score = self.is_duplicate(full_text, existing_texts)
-
-            if not is_dup:
-                selected.append({
-                    "bno": int(row['bno']),
-                    "title": str(row['title']),
-                    "content": str(row['content']),
-                    "shorts_script": str(row.get('shorts_script', '')),
-                    "hit": int(row['hit']),
-                    "p_id": str(row.get('p_id', '')),
-                    "writer": str(row.get('writer', '')),
-                    "video_type": video_type,
-                    "quality_score": float(row.get('quality_score', 5.0)),
-                    "priority": int(row.get('quality_score', 5.0))
-                })
-                existing_texts.append(full_text)
-                logger.info(f"✅ [{video_type}] 선정: BNO={row['bno']}")
+        selected: List[Dict[str, Any]] = []
+        for idx in picked:
+            row = rows[idx]
+            selected.append({
+                "bno": int(row['bno']),
+                "title": str(row['title']),
+                "content": str(row['content']),
+                "shorts_script": str(row.get('shorts_script', '')),
+                "hit": int(row['hit']),
+                "p_id": str(row.get('p_id', '')),
+                "writer": str(row.get('writer', '')),
+                "video_type": video_type,
+                "quality_score": float(row.get('quality_score', 5.0)),
+                "priority": int(row.get('quality_score', 5.0))
+            })
+            logger.info(f"✅ [{video_type}] 선정: BNO={row['bno']}")
 
         return selected
 
@@ -177,15 +246,26 @@ class SmartCurator:
             self,
             agro_count: int = 1,
             info_count: int = 1,
-            min_quality_score: float = 6.0
+            min_quality_score: float = 6.0,
+            full_refresh: bool = False
     ) -> Dict[str, List[Dict[str, Any]]]:
-        """프리미엄 큐레이션"""
-        logger.info("🎯 프리미엄 큐레이션 시작")
+        """
+        프리미엄 큐레이션
 
-        self.trend_analyzer.analyze_recent_trends(days=7)
-        existing_texts = self.fetch_existing_contents()
+        평소에는 워터마크 이후 바뀐 게시글만 재평가, full_refresh면 통계/캐시 전체 재계산
+        """
+        logger.info(f"🎯 프리미엄 큐레이션 시작{' (전체 재평가)' if full_refresh else ''}")
+
+        if full_refresh:
+            self.curation_cache.reset()
+        self.board_stats.sync(full_refresh=full_refresh)
+        self.curation_cache.advance()
+        self.trends.get(days=7, refresh=full_refresh)
+        self.embedding_store.sync()
 
         result = {"agro": [], "info": []}
+        scored_before = self.sentiment_analyzer.stats["scored"]
+        self.prefilter_stats = {"candidates": 0, "lexical_rejects": 0}  # 이번 실행분만 보고
 
         for video_type, target_count in [("AGRO", agro_count), ("INFO", info_count)]:
             candidates_df = self.fetch_quality_candidates(video_type, limit=30)
@@ -194,20 +274,29 @@ class SmartCurator:
                 logger.warning(f"⚠️ [{video_type}] 후보 없음")
                 continue
 
-            candidates_df['quality_score'] = candidates_df.apply(
-                self.calculate_quality_score, axis=1
-            )
+            candidates_df['quality_score'] = self.calculate_quality_scores(candidates_df)
 
             candidates_df = candidates_df.sort_values('quality_score', ascending=False)
 
             selected = self.filter_track(
                 candidates_df,
                 video_type,
-                existing_texts.copy(),
                 max_selected=target_count
             )
 
             result[video_type.lower()] = selected
 
+        self.curation_cache.save()
+        stats = self.curation_cache.stats
+        prefilter = self.prefilter_stats
+        if prefilter["candidates"]:
+            logger.info(
+                f"🔎 어휘 사전필터: 후보 {prefilter['candidates']}개 중 {prefilter['lexical_rejects']}개 "
+                f"({prefilter['lexical_rejects'] / prefilter['candidates']:.0%}) MinHash로 중복 판정"
+            )
+        logger.info(
+            f"🧮 재평가: 댓글 채점 {self.sentiment_analyzer.stats['scored'] - scored_before}개, "
+            f"임베딩 {stats['vector_misses']}개 (캐시 {stats['vector_hits']})"
+        )
         logger.info(f"🎯 완료: 어그로 {len(result['agro'])}개, 정보 {len(result['info'])}개")
         return result
\ No newline at end of file
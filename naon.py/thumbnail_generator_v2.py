@@ -17,10 +17,17 @@ from io import BytesIO
 from duckduckgo_search import DDGS
 
 from config import BASE_DIR, OUTPUT_DIR, LOG_FORMAT, LOG_LEVEL
+from keyword_matcher import get_matcher
 
 logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
+# 이미지 검색 키워드 (앞쪽일수록 우선)
+PRIORITY_WORDS = (
+    'AI', 'GPT', 'Claude', 'Gemini', 'OpenAI', 'Google',
+    '인공지능', '딥러닝', '기술', '개발자'
+)
+
 
 class ThumbnailGeneratorV2:
     """AI 쇼츠 썸네일 자동 생성 V2"""
@@ -34,6 +41,9 @@ class ThumbnailGeneratorV2:
         self.font_bold = "/Users/changwan/Library/Fonts/Pretendard-Bold.otf"
         self.font_regular = "/Users/changwan/Library/Fonts/Pretendard-Regular.otf"
 
+        # 검색 키워드 매처 (PRIORITY_WORDS 순서가 우선순위)
+        self.keyword_matcher = get_matcher(PRIORITY_WORDS)
+
     def extract_hook_sentence(self, title: str, content: str) -> str:
         """
         핵심 문장 자동 추출 (6~9단어)
@@ -69,16 +79,8 @@ class ThumbnailGeneratorV2:
         - 랜덤 색상 배경 금지
         """
         try:
-            # AI/기술 관련 키워드 추출
-            keywords = []
-            priority_words = [
-                'AI', 'GPT', 'Claude', 'Gemini', 'OpenAI', 'Google',
-                '인공지능', '딥러닝', '기술', '개발자'
-            ]
-
-            for word in priority_words:
-                if word in title:
-                    keywords.append(word)
+            # AI/기술 관련 키워드 추출 (제목 1회 스캔, 우선순위 순)
+            keywords = self.keyword_matcher.matched(title)
 
             if not keywords:
                 keywords = ['AI', 'technology']
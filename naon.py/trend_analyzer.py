@@ -5,7 +5,6 @@
 - 트렌딩 주제 예측
 """
 import logging
-import re
 from typing import List, Dict, Any, Tuple
 from collections import Counter
 from datetime import datetime, timedelta
@@ -14,7 +13,13 @@ import sqlalchemy
 from sqlalchemy.engine import Engine
 import pandas as pd
 
-from config import BASE_DIR, DB_CONNECTION_STRING, LOG_FORMAT, LOG_LEVEL
+from config import BASE_DIR, DB_CONNECTION_STRING, TREND_SOURCE, LOG_FORMAT, LOG_LEVEL
+from db_utils import bulk_upsert
+from keyword_index import (
+    IMPORTANT_KEYWORDS, PUSHDOWN_TOTALS_QUERY, TOKENIZER_VERSION, KeywordIndex, KeywordTokenizer
+)
+from keyword_matcher import KeywordMatcher, get_matcher
+from keyword_rollup import WATERMARK_NAME, KeywordRollup
 
 # ===============================
 # 로깅 설정
@@ -22,6 +27,19 @@ from config import BASE_DIR, DB_CONNECTION_STRING, LOG_FORMAT, LOG_LEVEL
 logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
+# 최근 N일 게시글 (롤업을 못 쓸 때의 전체 스캔용, 댓글 수는 board_stats)
+RECENT_POSTS_QUERY = """
+        SELECT b.title, b.content, b.hit,
+               COALESCE(s.reply_count, 0) as reply_count
+        FROM AI_BOARD b
+                 LEFT JOIN board_stats s ON s.bno = b.bno
+        WHERE b.regdate > NOW() - INTERVAL ':days days'
+        ORDER BY b.regdate DESC
+        """
+
+# 집계 경로 폴백 순서
+TREND_SOURCES = ("rollup", "sql", "scan")
+
 
 # ===============================
 # 트렌드 분석기
@@ -32,42 +50,73 @@ class TrendAnalyzer:
     def __init__(self, db_engine: Engine):
         self.engine = db_engine
 
-        # AI/기술 관련 중요 키워드 (수동 정의)
-        self.important_keywords = {
-            'GPT', 'Claude', 'Gemini', 'LLM', 'AI', '인공지능',
-            'ChatGPT', 'OpenAI', 'Anthropic', 'Google',
-            '딥러닝', '머신러닝', '트랜스포머', 'NVIDIA',
-            'GPU', '반도체', '오픈소스', 'API', '모델', '학습'
-        }
+        # AI/기술 관련 중요 키워드 (수동 정의, keyword_index와 공유)
+        self.important_keywords = set(IMPORTANT_KEYWORDS)
+        self.tokenizer = KeywordTokenizer(self.important_keywords)
+        self.important_matcher = self.tokenizer.important_matcher
+
+        # 게시글 키워드 색인 (글마다 1번만 토큰화) → 일별 키워드 롤업 (트렌드는 롤업 합산)
+        # 토크나이저 버전이 바뀌면 롤업도 새 워터마크로 다시 적재
+        self.index = KeywordIndex(db_engine, tokenizer=self.tokenizer)
+        self.rollup = KeywordRollup(
+            db_engine,
+            occurrences=self.index.occurrences,
+            name=f"{WATERMARK_NAME}_v{TOKENIZER_VERSION}"
+        )
 
     def extract_keywords(self, text: str) -> List[str]:
         """
-        텍스트에서 키워드 추출
+        텍스트에서 키워드 추출 (등장마다 1개, keyword_index 토크나이저 규칙)
 
         규칙:
-        - 한글 2글자 이상
+        - 중요 키워드: 오토마톤 1회 스캔으로 등장 위치마다 추출
+          (조사가 붙은 한글, 2글자 영문 AI/API 포함, 영문은 단어 경계 기준)
+        - 한글 2글자 이상 (조사 제거 후, 불용어 제외)
         - 영문 3글자 이상 (대문자 포함)
         - 숫자+영문 조합 (GPT-4 등)
         """
-        keywords = []
+        return self.tokenizer.extract(text)
 
-        # 한글 키워드 (2글자 이상)
-        korean_pattern = r'[가-힣]{2,}'
-        keywords.extend(re.findall(korean_pattern, text))
+    def keyword_occurrences(self, posts: pd.DataFrame) -> pd.Series:
+        """
+        게시글 프레임(title, content) → 키워드 등장 (extract_keywords와 같은 규칙, 열 단위 정규식 스캔)
 
-        # 영문 키워드 (3글자 이상, 대문자 포함)
-        english_pattern = r'[A-Z][A-Za-z0-9\-]{2,}'
-        keywords.extend(re.findall(english_pattern, text))
+        Returns:
+            index = 원래 행 라벨, 값 = 키워드 (등장마다 1행)
+        """
+        return self.tokenizer.occurrences(posts)
 
-        # 중요 키워드 필터링
-        filtered = [k for k in keywords if k in self.important_keywords or len(k) >= 3]
+    def keyword_totals(self, posts: pd.DataFrame) -> pd.DataFrame:
+        """
+        게시글 프레임(title, content, hit, reply_count) → 키워드별 합계
 
-        return filtered
+        키워드 등장마다 해당 글의 조회수/댓글 수를 더함 (행 단위 루프와 같은 결과)
 
-    def analyze_recent_trends(self, days: int = 7) -> List[Dict[str, Any]]:
+        Returns:
+            columns = keyword, frequency, total_hit, total_reply
+        """
+        posts = posts.reset_index(drop=True)
+        occurrences = self.keyword_occurrences(posts)
+
+        rows = occurrences.index.to_numpy()
+        frame = pd.DataFrame({
+            'keyword': occurrences.to_numpy(),
+            'hit': posts['hit'].to_numpy()[rows],
+            'reply': posts['reply_count'].to_numpy()[rows]
+        })
+        return frame.groupby('keyword', sort=False).agg(
+            frequency=('hit', 'size'),
+            total_hit=('hit', 'sum'),
+            total_reply=('reply', 'sum')
+        ).reset_index()
+
+    def analyze_recent_trends(self, days: int = 7, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         최근 N일간 트렌드 분석
 
+        키워드별 합계는 window_keyword_totals (기본: 롤업 증분 동기화 후 최근 N개 날짜 버킷 합산)
+        (raise_errors=True면 실패 시 빈 목록 대신 예외, 결과를 캐시하는 호출자용)
+
         Returns:
             [
                 {
@@ -79,81 +128,101 @@ class TrendAnalyzer:
                 }
             ]
         """
-        # PostgreSQL: INTERVAL 사용
-        query = """
-                SELECT b.title, b.content, b.hit,
-                       (SELECT COUNT(*) FROM AI_REPLY r WHERE r.bno = b.bno) as reply_count
-                FROM AI_BOARD b
-                WHERE b.regdate > NOW() - INTERVAL ':days days'
-                ORDER BY b.regdate DESC
-                """
-
         try:
-            with self.engine.connect() as conn:
-                df = pd.read_sql(
-                    sqlalchemy.text(query),
-                    conn,
-                    params={"days": days}
-                )
-
-                if df.empty:
-                    logger.warning("⚠️ 최근 게시글 없음")
-                    return []
-
-                # 키워드 추출 및 통계
-                keyword_stats = {}
-
-                for _, row in df.iterrows():
-                    text = f"{row['title']} {row['content']}"
-                    keywords = self.extract_keywords(text)
-
-                    for keyword in keywords:
-                        if keyword not in keyword_stats:
-                            keyword_stats[keyword] = {
-                                'frequency': 0,
-                                'total_hit': 0,
-                                'total_reply': 0
-                            }
-
-                        keyword_stats[keyword]['frequency'] += 1
-                        keyword_stats[keyword]['total_hit'] += row['hit']
-                        keyword_stats[keyword]['total_reply'] += row['reply_count']
-
-                # 트렌드 점수 계산
-                trends = []
-                for keyword, stats in keyword_stats.items():
-                    freq = stats['frequency']
-
-                    if freq < 2:  # 2회 미만 등장은 제외
-                        continue
-
-                    avg_hit = stats['total_hit'] / freq
-                    avg_reply = stats['total_reply'] / freq
-
-                    # 트렌드 점수 (0~10)
-                    trend_score = self._calculate_trend_score(freq, avg_hit, avg_reply)
-
-                    trends.append({
-                        'keyword': keyword,
-                        'frequency': freq,
-                        'avg_hit': avg_hit,
-                        'avg_reply': avg_reply,
-                        'trend_score': trend_score
-                    })
-
-                # 점수 순 정렬
-                trends.sort(key=lambda x: x['trend_score'], reverse=True)
-
-                # DB 저장
-                self._save_trends(trends)
-
-                logger.info(f"✅ 트렌드 분석 완료: {len(trends)}개 키워드")
-                return trends
+            keyword_totals = self.window_keyword_totals(days, min_frequency=2)
+
+            if not keyword_totals:
+                logger.warning("⚠️ 최근 게시글 없음")
+                return []
+
+            # 트렌드 점수 계산
+            trends = []
+            for stats in keyword_totals:
+                freq = int(stats['frequency'])
+
+                if freq < 2:  # 2회 미만 등장은 제외
+                    continue
+
+                avg_hit = float(stats['total_hit']) / freq
+                avg_reply = float(stats['total_reply']) / freq
+
+                # 트렌드 점수 (0~10)
+                trend_score = self._calculate_trend_score(freq, avg_hit, avg_reply)
+
+                trends.append({
+                    'keyword': stats['keyword'],
+                    'frequency': freq,
+                    'avg_hit': avg_hit,
+                    'avg_reply': avg_reply,
+                    'trend_score': trend_score
+                })
+
+            # 점수 순 정렬
+            trends.sort(key=lambda x: x['trend_score'], reverse=True)
+
+            # DB 저장
+            self._save_trends(trends)
+
+            logger.info(f"✅ 트렌드 분석 완료: {len(trends)}개 키워드")
+            return trends
 
         except Exception as e:
             logger.error(f"❌ 트렌드 분석 실패: {e}", exc_info=True)
+            if raise_errors:
+                raise
             return []
 
+    def window_keyword_totals(
+            self,
+            days: int,
+            source: str = TREND_SOURCE,
+            min_frequency: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        최근 N일 키워드별 합계 (keyword, frequency, total_hit, total_reply)
+
+        source부터 시도하고 못 쓰면 다음 경로로:
+        - rollup: 일별 롤업 합산 (날짜 버킷 단위)
+        - sql: PostgreSQL 안에서 토큰화/집계, 합계 행만 전송 (본문은 DB 밖으로 나오지 않음)
+        - scan: N일치 게시글을 모두 읽어 pandas로 집계
+        (min_frequency 미만 키워드는 sql 경로에서는 DB가 걸러 보내지 않음)
+        """
+        sources = TREND_SOURCES[TREND_SOURCES.index(source):] if source in TREND_SOURCES else TREND_SOURCES
+        for name in sources:
+            if name == "rollup":
+                if self.rollup.sync() is None:
+                    continue
+                totals = self.rollup.window_totals(days)
+            elif name == "sql":
+                try:
+                    totals = self._pushdown_keyword_totals(days, min_frequency)
+                except Exception as e:
+                    logger.warning(f"⚠️ SQL 트렌드 집계 실패, 전체 스캔으로 폴백: {e}")
+                    continue
+            else:
+                totals = self._scan_keyword_totals(days)
+            return [row for row in totals if int(row['frequency']) >= min_frequency]
+        return []
+
+    def _pushdown_keyword_totals(self, days: int, min_frequency: int = 1) -> List[Dict[str, Any]]:
+        """N일치 게시글 토큰화/집계를 PostgreSQL 안에서 (키워드별 합계 행만 받음)"""
+        params = self.tokenizer.pushdown_params()
+        params.update({"days": days, "min_frequency": min_frequency})
+        with self.engine.connect() as conn:
+            result = conn.execute(sqlalchemy.text(PUSHDOWN_TOTALS_QUERY), params)
+            return [dict(row._mapping) for row in result]
+
+    def _scan_keyword_totals(self, days: int) -> List[Dict[str, Any]]:
+        """N일치 게시글을 모두 읽어 키워드별 합계 (롤업 미사용 시 폴백)"""
+        with self.engine.connect() as conn:
+            df = pd.read_sql(
+                sqlalchemy.text(RECENT_POSTS_QUERY),
+                conn,
+                params={"days": days}
+            )
+
+        return self.keyword_totals(df).to_dict('records')
+
     def _calculate_trend_score(
             self,
             frequency: int,
@@ -180,34 +249,20 @@ class TrendAnalyzer:
         return freq_score + hit_score + reply_score
 
     def _save_trends(self, trends: List[Dict[str, Any]]) -> None:
-        """트렌드 데이터 DB 저장 (PostgreSQL ON CONFLICT 사용)"""
-        # PostgreSQL: INSERT ... ON CONFLICT DO UPDATE
-        query = """
-            INSERT INTO keyword_trends (keyword, frequency, avg_hit, avg_reply_count, trend_score, last_seen)
-            VALUES (:keyword, :frequency, :avg_hit, :avg_reply, :trend_score, NOW())
-            ON CONFLICT (keyword)
-            DO UPDATE SET
-                frequency = EXCLUDED.frequency,
-                avg_hit = EXCLUDED.avg_hit,
-                avg_reply_count = EXCLUDED.avg_reply_count,
-                trend_score = EXCLUDED.trend_score,
-                last_seen = NOW()
-        """
+        """트렌드 데이터 DB 저장 (PostgreSQL ON CONFLICT, 배치당 1문장)"""
+        rows = [
+            {
+                "keyword": trend['keyword'],
+                "frequency": trend['frequency'],
+                "avg_hit": trend['avg_hit'],
+                "avg_reply_count": trend['avg_reply'],
+                "trend_score": trend['trend_score']
+            }
+            for trend in trends
+        ]
 
         try:
-            with self.engine.connect() as conn:
-                with conn.begin():
-                    for trend in trends:
-                        conn.execute(
-                            sqlalchemy.text(query),
-                            {
-                                "keyword": trend['keyword'],
-                                "frequency": trend['frequency'],
-                                "avg_hit": trend['avg_hit'],
-                                "avg_reply": trend['avg_reply'],
-                                "trend_score": trend['trend_score']
-                            }
-                        )
+            bulk_upsert(self.engine, "keyword_trends", rows, conflict=["keyword"], sql_values={"last_seen": "NOW()"})
             logger.info(f"✅ 트렌드 {len(trends)}개 저장 완료")
         except Exception as e:
             logger.error(f"❌ 트렌드 저장 실패: {e}", exc_info=True)
@@ -238,6 +293,11 @@ class TrendAnalyzer:
             return []
 
 
+    def get_trend_matcher(self, limit: int = 20) -> KeywordMatcher:
+        """상위 트렌드 키워드 매처 (같은 트렌드 스냅샷이면 빌드된 오토마톤 재사용)"""
+        return get_matcher(tuple(self.get_top_trends(limit=limit)))
+
+
 # ===============================
 # 하위 호환 함수
 # ===============================
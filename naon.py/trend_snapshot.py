@@ -0,0 +1,243 @@
+"""
+트렌드 스냅샷 서비스
+- API(/api/trends, 초기화), 메인 루프, SmartCurator가 같은 N일 트렌드 분석 결과를 공유
+- TTL 안에서는 메모리 스냅샷을 그대로 반환 (DB 왕복/재계산 없음)
+- single-flight: 만료 시 동시에 들어온 호출자는 계산 1회를 기다렸다가 같은 결과를 받음
+- 프로세스 간 공유: DB별 JSON 파일 (version 스탬프 + 계산 시각), flock으로 계산도 1회
+  (다른 프로세스가 TTL 안에 계산해 둔 파일이 있으면 재계산 없이 채택)
+- 계산 실패 시 이전 스냅샷이 있으면 그대로 유지
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from sqlalchemy.engine import Engine
+
+from config import TREND_SNAPSHOT_DIR, TREND_SNAPSHOT_TTL, LOG_FORMAT, LOG_LEVEL
+from keyword_matcher import KeywordMatcher, get_matcher
+from trend_analyzer import TrendAnalyzer
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TrendSnapshot:
+    """N일 트렌드 분석 결과 1벌 (trend_score 내림차순)"""
+    days: int
+    version: int
+    computed_at: float
+    trends: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.computed_at
+
+    def top_keywords(self, limit: int = 10) -> List[str]:
+        return [trend['keyword'] for trend in self.trends[:limit]]
+
+    def matcher(self, limit: int = 20) -> KeywordMatcher:
+        """상위 트렌드 키워드 매처 (같은 키워드 목록이면 빌드된 오토마톤 재사용)"""
+        return get_matcher(tuple(self.top_keywords(limit)))
+
+
+class TrendSnapshotService:
+    """days별 트렌드 스냅샷 (TTL + single-flight + 선택적 파일 공유)"""
+
+    def __init__(
+            self,
+            db_engine: Engine,
+            ttl: float = TREND_SNAPSHOT_TTL,
+            snapshot_dir: Optional[Path] = TREND_SNAPSHOT_DIR
+    ):
+        self.engine = db_engine
+        self.ttl = ttl
+        self.analyzer = TrendAnalyzer(db_engine)
+        # 같은 캐시 디렉터리를 쓰는 다른 DB(벤치 등)와 섞이지 않도록 DB 이름으로 구분
+        self.name = db_engine.url.database or "default"
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        if self.snapshot_dir:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+        self._snapshots: Dict[int, TrendSnapshot] = {}
+        self._flights: Dict[int, threading.Lock] = {}
+        self._flights_lock = threading.Lock()
+        self.stats = {"hits": 0, "shared": 0, "computed": 0, "failed": 0}
+
+    # ===============================
+    # 조회
+    # ===============================
+    def get(self, days: int = 7, refresh: bool = False) -> TrendSnapshot:
+        """
+        N일 트렌드 스냅샷
+
+        Args:
+            days: 분석 기간
+            refresh: True면 TTL과 무관하게 이 호출 이후 계산된 스냅샷을 받음
+                     (동시에 refresh한 호출자끼리도 계산은 1회)
+        """
+        requested_at = time.time()
+        snapshot = self._snapshots.get(days)
+        if self._usable(snapshot, requested_at, refresh):
+            self.stats["hits"] += 1
+            return snapshot
+
+        with self._flight(days):
+            # 기다리는 동안 다른 스레드가 계산을 끝냈으면 그 결과 사용
+            snapshot = self._snapshots.get(days)
+            if self._usable(snapshot, requested_at, refresh):
+                self.stats["hits"] += 1
+                return snapshot
+
+            with self._exclusive(days):
+                shared = self._read(days)
+                if self._usable(shared, requested_at, refresh) and (
+                        snapshot is None or shared.version >= snapshot.version):
+                    self.stats["shared"] += 1
+                    snapshot = shared
+                else:
+                    latest = max((s.version for s in (snapshot, shared) if s is not None), default=0)
+                    snapshot = self._compute(days, latest + 1) or snapshot
+            if snapshot is None:
+                # 첫 계산부터 실패 → 캐시하지 않은 빈 스냅샷 (다음 호출이 다시 시도)
+                return TrendSnapshot(days=days, version=0, computed_at=0.0)
+
+            self._snapshots[days] = snapshot
+            return snapshot
+
+    def trends(self, days: int = 7, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        snapshot = self.get(days)
+        return snapshot.trends if limit is None else snapshot.trends[:limit]
+
+    def invalidate(self, days: Optional[int] = None) -> None:
+        """메모리/파일 스냅샷 폐기 (다음 get에서 재계산)"""
+        for d in ([days] if days is not None else list(self._snapshots)):
+            self._snapshots.pop(d, None)
+            path = self._path(d)
+            if path is not None:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _usable(self, snapshot: Optional[TrendSnapshot], requested_at: float, refresh: bool) -> bool:
+        if snapshot is None or snapshot.age >= self.ttl:
+            return False
+        return not refresh or snapshot.computed_at >= requested_at
+
+    def _flight(self, days: int) -> threading.Lock:
+        with self._flights_lock:
+            return self._flights.setdefault(days, threading.Lock())
+
+    # ===============================
+    # 계산
+    # ===============================
+    def _compute(self, days: int, version: int) -> Optional[TrendSnapshot]:
+        started = time.perf_counter()
+        try:
+            trends = self.analyzer.analyze_recent_trends(days=days, raise_errors=True)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"⚠️ 트렌드 스냅샷 갱신 실패, 이전 스냅샷 유지: {e}")
+            return None
+
+        snapshot = TrendSnapshot(
+            days=days,
+            version=version,
+            computed_at=time.time(),
+            trends=trends
+        )
+        self.stats["computed"] += 1
+        self._write(snapshot)
+        logger.info(
+            f"📈 트렌드 스냅샷 v{snapshot.version} ({days}일, {len(trends)}개 키워드, "
+            f"{time.perf_counter() - started:.2f}s)"
+        )
+        return snapshot
+
+    # ===============================
+    # 프로세스 간 공유 (파일)
+    # ===============================
+    def _path(self, days: int) -> Optional[Path]:
+        if self.snapshot_dir is None:
+            return None
+        return self.snapshot_dir / f"{self.name}_{days}d.json"
+
+    @contextmanager
+    def _exclusive(self, days: int):
+        """프로세스 간 배타 잠금 (다른 프로세스의 계산이 끝나길 기다림)"""
+        path = self._path(days)
+        if path is None or fcntl is None:
+            yield
+            return
+        with open(path.with_suffix(".lock"), "a+") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read(self, days: int) -> Optional[TrendSnapshot]:
+        path = self._path(days)
+        if path is None:
+            return None
+        try:
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+            return TrendSnapshot(
+                days=int(data["days"]),
+                version=int(data["version"]),
+                computed_at=float(data["computed_at"]),
+                trends=data["trends"]
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write(self, snapshot: TrendSnapshot) -> None:
+        """임시 파일 작성 후 원자적 rename"""
+        path = self._path(snapshot.days)
+        if path is None:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix=".json.part")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({
+                    "days": snapshot.days,
+                    "version": snapshot.version,
+                    "computed_at": snapshot.computed_at,
+                    "trends": snapshot.trends
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"트렌드 스냅샷 저장 실패: {e}")
+
+
+# ===============================
+# 공유 인스턴스 (DB별 1개)
+# ===============================
+_services: Dict[str, TrendSnapshotService] = {}
+_services_lock = threading.Lock()
+
+
+def get_trend_snapshots(db_engine: Engine) -> TrendSnapshotService:
+    """같은 DB를 쓰는 호출자끼리 공유하는 스냅샷 서비스"""
+    key = db_engine.url.render_as_string(hide_password=True)
+    service = _services.get(key)
+    if service is None:
+        with _services_lock:
+            service = _services.get(key)
+            if service is None:
+                service = _services[key] = TrendSnapshotService(db_engine)
+    return service
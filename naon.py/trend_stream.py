@@ -0,0 +1,428 @@
+"""
+실시간 트렌드 스트림 (지수 감쇠 카운터 + Space-Saving top-k)
+- 새 게시글 / 댓글이 들어올 때마다 키워드 카운터를 갱신 → 1시간 전에 터진 키워드도 바로 보임
+  (배치 분석은 7일 평균이라 다음 분석 때까지 안 보임)
+- 감쇠: forward decay, 이벤트 가중치를 기준 시각(landmark)부터 e^(λ·t)로 키워 더하고
+  조회 시 e^(λ·now)로 나눔 → 갱신 때 다른 카운터를 건드리지 않음 (반감기 TREND_STREAM_HALF_LIFE)
+- top-k: Space-Saving, 카운터는 CAPACITY개로 고정 (꽉 차면 최솟값 카운터를 새 키워드가 물려받고
+  물려받은 값을 오차로 기록) → 서로 다른 토큰이 아무리 많아도 메모리 일정
+- 갱신 비용: 키워드당 dict 갱신 + 최소 힙 push (O(log k), k는 고정 상수)
+- 게시글은 글의 서로 다른 키워드마다 1, 댓글은 원글 상위 키워드에 REPLY_WEIGHT씩 (키워드 색인 조회)
+- 입력은 bno / rno 워터마크 SYNC_OVERLAP_IDS개 앞부터 읽되, 겹침 구간에서 이미 반영한 id는 상태에
+  기억해 두고 제외 (늦게 커밋된 글/댓글 보정, 같은 글을 두 번 세지 않음)
+- 상태(카운터 + 워터마크 + 겹침 구간 반영 id)는 JSON 파일에 주기적으로 저장
+  (메인 루프가 갱신/저장, API는 파일이 바뀌었을 때만 다시 읽음)
+
+Usage:
+    python trend_stream.py [--top 20] [--reset]
+"""
+import argparse
+import heapq
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+import sqlalchemy
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from config import (
+    DB_CONNECTION_STRING,
+    SYNC_OVERLAP_IDS,
+    TREND_SNAPSHOT_DIR,
+    TREND_STREAM_CAPACITY,
+    TREND_STREAM_HALF_LIFE,
+    TREND_STREAM_REPLY_WEIGHT,
+    TREND_STREAM_REPLY_KEYWORDS,
+    TREND_STREAM_SAVE_INTERVAL,
+    LOG_FORMAT, LOG_LEVEL
+)
+from keyword_index import KeywordIndex
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 2  # 2: 겹침 구간 반영 id(seen) 저장
+
+# landmark 이후 지수가 이 값을 넘으면 전체 카운터를 한 번 나눠 기준 시각을 옮김 (float 오버플로 방지)
+_RESCALE_EXPONENT = 40.0
+
+
+class DecayedSpaceSaving:
+    """감쇠 가중치 Space-Saving (keyword → [증폭된 카운트, 증폭된 오차])"""
+
+    def __init__(self, capacity: int = TREND_STREAM_CAPACITY, half_life: float = TREND_STREAM_HALF_LIFE):
+        self.capacity = capacity
+        self.half_life = half_life
+        self.rate = math.log(2) / half_life
+        self.landmark = 0.0
+        self.counters: Dict[str, List[float]] = {}
+        self._heap: List[Tuple[float, str]] = []  # (카운트, 키워드), 낡은 항목은 꺼낼 때 건너뜀
+
+    def _boost(self, ts: float) -> float:
+        exponent = self.rate * (ts - self.landmark)
+        if exponent > _RESCALE_EXPONENT:
+            self._rescale(ts)
+            exponent = 0.0
+        return math.exp(exponent)
+
+    def _rescale(self, ts: float) -> None:
+        factor = math.exp(-self.rate * (ts - self.landmark))
+        for counter in self.counters.values():
+            counter[0] *= factor
+            counter[1] *= factor
+        self.landmark = ts
+        self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(counter[0], keyword) for keyword, counter in self.counters.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[str, float]:
+        while True:
+            count, keyword = heapq.heappop(self._heap)
+            counter = self.counters.get(keyword)
+            if counter is not None and counter[0] == count:
+                return keyword, count
+
+    def add(self, keyword: str, weight: float, ts: float) -> None:
+        """ts 시각에 weight만큼 관측"""
+        boosted = weight * self._boost(ts)
+        counter = self.counters.get(keyword)
+        if counter is not None:
+            counter[0] += boosted
+        elif len(self.counters) < self.capacity:
+            counter = self.counters[keyword] = [boosted, 0.0]
+        else:
+            # 최솟값 카운터를 물려받음 (실제 값은 [count - error, count] 사이)
+            evicted, floor = self._pop_min()
+            del self.counters[evicted]
+            counter = self.counters[keyword] = [floor + boosted, floor]
+        heapq.heappush(self._heap, (counter[0], keyword))
+
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    def top(self, limit: int, now: float) -> List[Dict[str, Any]]:
+        """now 시각 기준 감쇠 점수 상위 limit개"""
+        decay = math.exp(-self.rate * (now - self.landmark))
+        ranked = heapq.nlargest(limit, self.counters.items(), key=lambda item: item[1][0])
+        return [
+            {"keyword": keyword, "score": count * decay, "error": error * decay}
+            for keyword, (count, error) in ranked
+        ]
+
+    def __len__(self) -> int:
+        return len(self.counters)
+
+
+# 워터마크(겹침 구간 포함) 이후 아직 반영하지 않은 게시글 / 댓글 (시각은 DB 시계 기준 epoch 초)
+_NEW_POSTS_QUERY = """
+    SELECT bno, title, content, EXTRACT(EPOCH FROM regdate) AS ts
+    FROM AI_BOARD
+    WHERE bno > :last_bno - :overlap
+      AND bno <> ALL(CAST(:seen AS BIGINT[]))
+    ORDER BY bno
+    FETCH FIRST :batch ROWS ONLY
+"""
+
+_NEW_REPLIES_QUERY = """
+    SELECT rno, bno, EXTRACT(EPOCH FROM regdate) AS ts
+    FROM AI_REPLY
+    WHERE rno > :last_rno - :overlap
+      AND rno <> ALL(CAST(:seen AS BIGINT[]))
+    ORDER BY rno
+    FETCH FIRST :batch ROWS ONLY
+"""
+
+# 상태 파일이 없을 때: 반감기 4배(가중치 1/16)보다 오래된 글/댓글은 건너뛰고 시작
+_START_QUERY = """
+    SELECT (SELECT COALESCE(MAX(bno), 0) FROM AI_BOARD WHERE regdate < LOCALTIMESTAMP - make_interval(secs => :horizon)),
+           (SELECT COALESCE(MAX(rno), 0) FROM AI_REPLY WHERE regdate < LOCALTIMESTAMP - make_interval(secs => :horizon)),
+           EXTRACT(EPOCH FROM LOCALTIMESTAMP)
+"""
+
+
+class TrendStream:
+    """게시글/댓글 스트림 → 감쇠 top-k 키워드 (워터마크 증분 + 파일 영속화)"""
+
+    def __init__(
+            self,
+            db_engine: Engine,
+            keyword_index: Optional[KeywordIndex] = None,
+            capacity: int = TREND_STREAM_CAPACITY,
+            half_life: float = TREND_STREAM_HALF_LIFE,
+            reply_weight: float = TREND_STREAM_REPLY_WEIGHT,
+            reply_keywords: int = TREND_STREAM_REPLY_KEYWORDS,
+            save_interval: int = TREND_STREAM_SAVE_INTERVAL,
+            state_dir: Path = TREND_SNAPSHOT_DIR,
+            batch_size: int = 5000,
+            overlap: int = SYNC_OVERLAP_IDS
+    ):
+        self.engine = db_engine
+        self.keyword_index = keyword_index or KeywordIndex(db_engine)
+        self.reply_weight = reply_weight
+        self.reply_keywords = reply_keywords
+        self.save_interval = save_interval
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.state_dir / f"{db_engine.url.database or 'default'}_stream.json"
+
+        self.sketch = DecayedSpaceSaving(capacity, half_life)
+        self.marks: Dict[str, int] = {}  # 비어 있으면 아직 시작 전
+        self.seen: Dict[str, Set[int]] = {"bno": set(), "rno": set()}  # 겹침 구간에서 이미 반영한 id
+        self.clock_offset = 0.0  # DB 시계 - 로컬 시계 (조회 시 DB 호출 없이 현재 시각 계산)
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self._loaded_mtime = 0.0
+        self.load()
+
+    # ===============================
+    # 갱신
+    # ===============================
+    def observe_post(self, keywords: List[str], ts: float) -> None:
+        """게시글 1개: 서로 다른 키워드마다 1"""
+        for keyword in keywords:
+            self.sketch.add(keyword, 1.0, ts)
+
+    def observe_reply(self, keywords: List[str], ts: float) -> None:
+        """댓글 1개: 원글 상위 키워드마다 reply_weight"""
+        for keyword in keywords:
+            self.sketch.add(keyword, self.reply_weight, ts)
+
+    def sync(self) -> Optional[Dict[str, Any]]:
+        """
+        워터마크 이후 게시글/댓글 반영, save_interval마다 상태 저장
+
+        Returns:
+            {'posts': 3, 'replies': 41, 'seconds': 0.02}, 실패 시 None
+        """
+        started = time.time()
+        report = {"posts": 0, "replies": 0, "seconds": 0.0}
+        try:
+            self.load()  # 다른 프로세스가 더 최근 상태를 저장했으면 그 워터마크부터
+            with self._lock:
+                if not self.marks:
+                    self._start()
+                report["posts"] = self._consume_posts()
+                report["replies"] = self._consume_replies()
+                if time.time() - self._saved_at >= self.save_interval:
+                    self.save()
+        except Exception as e:
+            logger.error(f"❌ 트렌드 스트림 갱신 실패: {e}", exc_info=True)
+            return None
+
+        report["seconds"] = round(time.time() - started, 3)
+        if report["posts"] or report["replies"]:
+            logger.info(
+                f"📡 트렌드 스트림: 게시글 {report['posts']}개, 댓글 {report['replies']}개 "
+                f"(카운터 {len(self.sketch)}/{self.sketch.capacity}, {report['seconds']}s)"
+            )
+        return report
+
+    def _start(self) -> None:
+        with self.engine.connect() as conn:
+            last_bno, last_rno, db_now = conn.execute(
+                text(_START_QUERY), {"horizon": 4 * self.sketch.half_life}
+            ).fetchone()
+        self.marks = {"last_bno": int(last_bno), "last_rno": int(last_rno)}
+        self.seen = {"bno": set(), "rno": set()}
+        self.clock_offset = float(db_now) - time.time()
+        self.sketch.landmark = float(db_now)
+        logger.info(f"📡 트렌드 스트림 시작: bno > {last_bno}, rno > {last_rno}")
+
+    def _advance(self, kind: str, ids: List[int]) -> None:
+        """워터마크 전진 + 겹침 구간 안에서 반영한 id 기억 (구간 밖으로 밀려난 id는 버림)"""
+        mark = f"last_{kind}"
+        self.marks[mark] = max(self.marks[mark], max(ids))
+        floor = self.marks[mark] - self.overlap
+        self.seen[kind] = {i for i in self.seen[kind].union(ids) if i > floor}
+
+    def _pending_params(self, kind: str) -> Dict[str, Any]:
+        return {
+            f"last_{kind}": self.marks[f"last_{kind}"],
+            "overlap": self.overlap,
+            "seen": sorted(self.seen[kind]),
+            "batch": self.batch_size
+        }
+
+    def _consume_posts(self) -> int:
+        consumed = 0
+        while True:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(_NEW_POSTS_QUERY), self._pending_params("bno")).fetchall()
+            if not rows:
+                return consumed
+
+            posts = pd.DataFrame(rows, columns=["bno", "title", "content", "ts"])
+            keywords = self.keyword_index.keyword_frame(posts["bno"], posts=posts)
+            if keywords is None:
+                raise RuntimeError("키워드 색인 조회 실패")
+            by_post = keywords.groupby("bno")["keyword"].agg(list)
+            for bno, ts in zip(posts["bno"], posts["ts"]):
+                if ts is not None and bno in by_post.index:
+                    self.observe_post(by_post.at[bno], float(ts))
+
+            self._advance("bno", [int(bno) for bno in posts["bno"]])
+            consumed += len(posts)
+            if len(rows) < self.batch_size:
+                return consumed
+
+    def _consume_replies(self) -> int:
+        consumed = 0
+        while True:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(_NEW_REPLIES_QUERY), self._pending_params("rno")).fetchall()
+            if not rows:
+                return consumed
+
+            replies = pd.DataFrame(rows, columns=["rno", "bno", "ts"])
+            keywords = self.keyword_index.keyword_frame(replies["bno"])
+            if keywords is None:
+                raise RuntimeError("키워드 색인 조회 실패")
+            # 원글마다 많이 나온 순 상위 키워드
+            keywords = keywords.sort_values(["bno", "count", "position"], ascending=[True, False, True])
+            by_post = keywords.groupby("bno").head(self.reply_keywords).groupby("bno")["keyword"].agg(list)
+            for bno, ts in zip(replies["bno"], replies["ts"]):
+                if ts is not None and bno in by_post.index:
+                    self.observe_reply(by_post.at[bno], float(ts))
+
+            self._advance("rno", [int(rno) for rno in replies["rno"]])
+            consumed += len(replies)
+            if len(rows) < self.batch_size:
+                return consumed
+
+    # ===============================
+    # 조회
+    # ===============================
+    def now(self) -> float:
+        """DB 시계 기준 현재 시각"""
+        return time.time() + self.clock_offset
+
+    def state_age(self) -> float:
+        """마지막으로 저장하거나 읽은 상태 파일의 나이 (초, 상태가 없으면 inf)"""
+        if not self.marks or not self._loaded_mtime:
+            return float("inf")
+        return time.time() - self._loaded_mtime
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        지금 기준 감쇠 점수 상위 키워드 (DB 조회 없음)
+
+        Returns:
+            [{'keyword': 'GPT-5', 'score': 42.7, 'error': 0.0}, ...]
+            score = 반감기 감쇠된 게시글 수 (댓글은 reply_weight), error = Space-Saving 과대 추정 상한
+        """
+        with self._lock:
+            return self.sketch.top(limit, self.now())
+
+    # ===============================
+    # 영속화
+    # ===============================
+    def save(self) -> None:
+        """임시 파일 작성 후 원자적 rename"""
+        state = {
+            "version": STATE_VERSION,
+            "capacity": self.sketch.capacity,
+            "half_life": self.sketch.half_life,
+            "landmark": self.sketch.landmark,
+            "marks": self.marks,
+            "seen": {kind: sorted(ids) for kind, ids in self.seen.items()},
+            "clock_offset": self.clock_offset,
+            "counters": [[keyword, count, error] for keyword, (count, error) in self.sketch.counters.items()]
+        }
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".json.part")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._saved_at = time.time()
+            self._loaded_mtime = self.path.stat().st_mtime
+        except OSError as e:
+            logger.warning(f"트렌드 스트림 저장 실패: {e}")
+
+    def load(self) -> bool:
+        """상태 파일이 마지막으로 읽은/쓴 뒤 바뀌었으면 다시 읽음 (설정이 바뀐 상태는 버림)"""
+        try:
+            mtime = self.path.stat().st_mtime
+            if mtime <= self._loaded_mtime:
+                return False
+            with self.path.open(encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if (state.get("version") != STATE_VERSION or state.get("capacity") != self.sketch.capacity
+                or state.get("half_life") != self.sketch.half_life):
+            logger.info("📡 트렌드 스트림 설정 변경 → 상태 새로 시작")
+            return False
+
+        with self._lock:
+            sketch = DecayedSpaceSaving(self.sketch.capacity, self.sketch.half_life)
+            sketch.landmark = float(state["landmark"])
+            sketch.counters = {keyword: [count, error] for keyword, count, error in state["counters"]}
+            sketch._rebuild_heap()
+            self.sketch = sketch
+            self.marks = {k: int(v) for k, v in state["marks"].items()}
+            self.seen = {kind: set(map(int, state["seen"].get(kind, []))) for kind in ("bno", "rno")}
+            self.clock_offset = float(state["clock_offset"])
+            self._loaded_mtime = mtime
+        return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self.sketch = DecayedSpaceSaving(self.sketch.capacity, self.sketch.half_life)
+            self.marks = {}
+            self.seen = {"bno": set(), "rno": set()}
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+# ===============================
+# 공유 인스턴스 (DB별 1개)
+# ===============================
+_streams: Dict[str, TrendStream] = {}
+_streams_lock = threading.Lock()
+
+
+def get_trend_stream(db_engine: Engine) -> TrendStream:
+    """같은 DB를 쓰는 호출자끼리 공유하는 트렌드 스트림"""
+    key = db_engine.url.render_as_string(hide_password=True)
+    stream = _streams.get(key)
+    if stream is None:
+        with _streams_lock:
+            stream = _streams.get(key)
+            if stream is None:
+                stream = _streams[key] = TrendStream(db_engine)
+    return stream
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="실시간 트렌드 스트림 갱신 + 상위 키워드 출력")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--reset", action="store_true", help="상태 버리고 최근 반감기 4배 구간부터 다시 시작")
+    args = parser.parse_args()
+
+    engine = sqlalchemy.create_engine(DB_CONNECTION_STRING, pool_pre_ping=True)
+    stream = TrendStream(engine)
+    if args.reset:
+        stream.reset()
+    stream.sync()
+    stream.save()
+    for rank, item in enumerate(stream.top(args.top), 1):
+        print(f"{rank:>3}. {item['keyword']:<20} {item['score']:>10.2f} (±{item['error']:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+TTS 오디오 디스크 캐시
+- 키: 정규화된 (text, voice, rate) 해시
+- 값: 속도 조정까지 끝난 최종 오디오 + 재생 길이
+- 총 용량 기준 LRU 삭제 (mtime = 최근 사용 시각)
+- 여러 워커 프로세스 동시 접근 안전 (원자적 rename + flock)
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, LOG_FORMAT, LOG_LEVEL
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value: str) -> str:
+    """NFC 정규화 + 공백 압축"""
+    return " ".join(unicodedata.normalize("NFC", str(value)).split())
+
+
+class TtsCache:
+    """(text, voice, rate) → 최종 오디오 파일 캐시"""
+
+    def __init__(self, cache_dir: Path = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock_path = self.cache_dir / ".lock"
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, voice: str, rate: str) -> str:
+        """캐시 키 (sha256)"""
+        raw = "\x1f".join([_normalize(text), _normalize(voice), _normalize(rate)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._meta_path(key).open(encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @contextmanager
+    def _exclusive(self):
+        """프로세스 간 배타 잠금 (eviction 직렬화)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a+") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def fetch(self, key: str, dest_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        캐시 히트 시 dest_path(확장자는 저장된 포맷으로 교체)로 복사하고
+        {'path', 'duration'} 반환, 미스면 None
+
+        다른 프로세스가 eviction 중이어도 복사 실패는 미스로 처리된다.
+        """
+        meta = self._read_meta(key)
+        if meta:
+            ext = meta.get("ext", "mp3")
+            audio_path = self.cache_dir / f"{key}.{ext}"
+            target = Path(dest_path).with_suffix(f".{ext}")
+            try:
+                shutil.copyfile(audio_path, target)
+                now = time.time()
+                os.utime(audio_path, (now, now))
+                self._count(True)
+                return {"path": target, "duration": float(meta.get("duration") or 0.0)}
+            except OSError:
+                pass
+
+        self._count(False)
+        return None
+
+    def contains(self, key: str) -> bool:
+        """통계에 반영하지 않는 존재 확인"""
+        meta = self._read_meta(key)
+        if not meta:
+            return False
+        return (self.cache_dir / f"{key}.{meta.get('ext', 'mp3')}").exists()
+
+    def size(self, key: str) -> int:
+        """저장된 오디오 용량 (없으면 0)"""
+        meta = self._read_meta(key)
+        return int(meta.get("size") or 0) if meta else 0
+
+    def put(self, key: str, src_path: Path, duration: Optional[float]) -> bool:
+        """최종 오디오 저장 (임시 파일 작성 후 원자적 rename)"""
+        src_path = Path(src_path)
+        ext = src_path.suffix.lstrip(".") or "mp3"
+        audio_path = self.cache_dir / f"{key}.{ext}"
+
+        try:
+            fd, tmp_audio = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            os.close(fd)
+            shutil.copyfile(src_path, tmp_audio)
+            os.replace(tmp_audio, audio_path)
+
+            meta = {
+                "ext": ext,
+                "duration": duration,
+                "size": audio_path.stat().st_size,
+                "created_at": time.time()
+            }
+            fd, tmp_meta = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_meta, self._meta_path(key))
+        except OSError as e:
+            logger.warning(f"TTS 캐시 저장 실패: {e}")
+            return False
+
+        self.evict()
+        return True
+
+    def total_bytes(self) -> int:
+        """캐시 오디오 총 용량"""
+        return sum(
+            p.stat().st_size for p in self.cache_dir.iterdir()
+            if p.is_file() and p.suffix in (".mp3", ".wav")
+        )
+
+    def evict(self) -> int:
+        """총 용량이 max_bytes 이하가 될 때까지 오래 안 쓴 항목부터 삭제"""
+        removed = 0
+        with self._exclusive():
+            entries = []
+            total = 0
+            for p in self.cache_dir.iterdir():
+                if not p.is_file() or p.suffix not in (".mp3", ".wav"):
+                    continue
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+
+            if total <= self.max_bytes:
+                return 0
+
+            entries.sort(key=lambda e: e[0])
+            for _, size, p in entries:
+                if total <= self.max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                self._meta_path(p.stem).unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        if removed:
+            logger.info(f"🧹 TTS 캐시 LRU 정리: {removed}개 삭제")
+        return removed
+
+    def remove(self, key: str) -> None:
+        """항목 삭제 (무효화)"""
+        meta = self._read_meta(key)
+        self._meta_path(key).unlink(missing_ok=True)
+        if meta:
+            (self.cache_dir / f"{key}.{meta.get('ext', 'mp3')}").unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 통계"""
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+
+tts_cache = TtsCache()
@@ -0,0 +1,264 @@
+"""
+TTS 선합성 (speculative prefetch)
+- shorts_queue status=0 항목을 우선순위 순으로 미리 합성해 TTS 캐시에 적재
+- 렌더 워커가 항목을 가져가면 TTS 단계는 캐시 읽기로 끝남
+- 항목 수 / 디스크 용량 예산 안에서만 선합성
+- 본문·음성·배속 지문(fingerprint)이 바뀌면 다시 선합성 (이전 오디오는 공유될 수 있어 캐시 LRU가 정리)
+- 대상 렌더 경로: generate_shorts (API 제작, 게시글 본문을 그대로 분할·합성)
+  제작 시점에 OpenAI로 대본을 만드는 경로는 렌더할 텍스트를 미리 알 수 없어 대상 아님
+- 메인 루프에서는 백그라운드 스레드가 TTS_PREFETCH_INTERVAL 간격으로 실행
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+
+import sqlalchemy
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from config import (
+    DB_CONNECTION_STRING,
+    TEMP_DIR,
+    TTS_PREFETCH_MAX_ITEMS,
+    TTS_PREFETCH_MAX_BYTES,
+    TTS_PREFETCH_INTERVAL,
+    LOG_FORMAT, LOG_LEVEL
+)
+from persona_manager import persona_manager
+from tts_cache import tts_cache, TtsCache
+from tts_service import build_jobs, split_text_into_parts, warm_cache
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+
+def make_fingerprint(content: str, voice: str, effective_speed: float) -> str:
+    """선합성 결과를 결정하는 입력(본문, 음성, 최종 배속) 지문"""
+    raw = "\x1f".join([content or "", voice, f"{effective_speed:.3f}"])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TtsPrefetcher:
+    """대기열 선합성기"""
+
+    def __init__(
+            self,
+            db_engine: Engine,
+            cache: TtsCache = tts_cache,
+            max_items: int = TTS_PREFETCH_MAX_ITEMS,
+            max_bytes: int = TTS_PREFETCH_MAX_BYTES
+    ):
+        self.engine = db_engine
+        self.cache = cache
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.manifest_dir = cache.cache_dir / "prefetch"
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+
+    # ===============================
+    # 대기열 조회
+    # ===============================
+    def fetch_queued(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """status=0 항목 (렌더 워커와 같은 우선순위 순서), 조회 실패 시 None"""
+        query = text("""
+            SELECT q.bno, b.content, COALESCE(b.p_id, 'default') AS p_id
+            FROM shorts_queue q
+            JOIN ai_board b ON q.bno = b.bno
+            WHERE q.status = 0
+            ORDER BY q.priority DESC, q.quality_score DESC
+            LIMIT :limit
+        """)
+
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(query, {"limit": limit}).fetchall()
+            return [{"bno": row[0], "content": row[1] or "", "p_id": row[2]} for row in rows]
+        except Exception as e:
+            logger.error(f"선합성 대기열 조회 실패: {e}")
+            return None
+
+    def fetch_queued_bnos(self) -> Optional[Set[int]]:
+        """status=0 전체 bno (매니페스트 정리용, max_items 제한 없음), 조회 실패 시 None"""
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text("SELECT bno FROM shorts_queue WHERE status = 0")).fetchall()
+            return {row[0] for row in rows}
+        except Exception as e:
+            logger.error(f"선합성 대기열 조회 실패: {e}")
+            return None
+
+    # ===============================
+    # 매니페스트 (bno별 지문 + 캐시 키)
+    # ===============================
+    def _manifest_path(self, bno: int) -> Path:
+        return self.manifest_dir / f"{bno}.json"
+
+    def load_manifest(self, bno: int) -> Optional[Dict[str, Any]]:
+        try:
+            with self._manifest_path(bno).open(encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_manifest(self, bno: int, manifest: Dict[str, Any]) -> None:
+        """임시 파일 작성 후 원자적 rename"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.manifest_dir, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path(bno))
+
+    def list_manifests(self) -> Dict[int, Dict[str, Any]]:
+        manifests = {}
+        for path in self.manifest_dir.glob("*.json"):
+            try:
+                bno = int(path.stem)
+            except ValueError:
+                continue
+            manifest = self.load_manifest(bno)
+            if manifest:
+                manifests[bno] = manifest
+        return manifests
+
+    def prefetched_bytes(self, manifests: Dict[int, Dict[str, Any]]) -> int:
+        """아직 캐시에 남아 있는 선합성 항목 용량 합계"""
+        return sum(
+            m.get("bytes", 0) for m in manifests.values()
+            if all(self.cache.contains(k) for k in m.get("keys", []))
+        )
+
+    # ===============================
+    # 선합성
+    # ===============================
+    def plan(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """항목 → 렌더와 동일한 파트 분할/음성/배속의 job 목록 + 지문"""
+        tts_config = persona_manager.get_tts_config(item["p_id"])
+        voice = tts_config["voice"]
+        speed = tts_config["effective_speed"]
+        parts = split_text_into_parts(item["content"], max_length=80)
+
+        return {
+            "fingerprint": make_fingerprint(item["content"], voice, speed),
+            "parts": parts,
+            "voice": voice,
+            "speed": speed
+        }
+
+    def prefetch_item(self, item: Dict[str, Any], work_dir: Path) -> Dict[str, Any]:
+        """항목 1개 선합성 (지문이 같고 캐시에 모두 남아 있으면 건너뜀)"""
+        bno = item["bno"]
+        plan = self.plan(item)
+        manifest = self.load_manifest(bno)
+
+        if manifest and manifest.get("fingerprint") == plan["fingerprint"]:
+            if all(self.cache.contains(k) for k in manifest.get("keys", [])):
+                return {"bno": bno, "status": "ready", "bytes": 0}
+
+        jobs = build_jobs(plan["parts"], plan["voice"], plan["speed"], work_dir, prefix=f"prefetch_{bno}")
+        summary = warm_cache(jobs, cache=self.cache)
+
+        # 항목 용량 = 파트별 캐시 메타 용량 합 (일부만 재합성해도 이전 합계에 누적하지 않음)
+        total_bytes = sum(self.cache.size(key) for key in summary["keys"])
+        if manifest and manifest.get("fingerprint") != plan["fingerprint"]:
+            # 캐시 키는 내용 주소(text, voice, rate)라 다른 항목/렌더와 공유될 수 있음 → 매니페스트만 교체, 오디오는 LRU에 맡김
+            logger.info(f"♻️ 선합성 무효화: bno={bno} (본문/음성 변경)")
+
+        self.save_manifest(bno, {
+            "fingerprint": plan["fingerprint"],
+            "keys": summary["keys"],
+            "bytes": total_bytes,
+            "created_at": time.time()
+        })
+
+        # prefetched_bytes는 파트가 모두 남은 항목만 세므로 재합성한 항목은 전체 용량을 더함
+        status = "failed" if summary["failed"] else "synthesized"
+        return {"bno": bno, "status": status, "bytes": total_bytes}
+
+    def run(self) -> Dict[str, Any]:
+        """
+        대기열 앞쪽부터 예산 안에서 선합성
+
+        Returns:
+            {'ready': n, 'synthesized': n, 'failed': n, 'skipped_budget': n, 'dropped': n}
+        """
+        report = {"ready": 0, "synthesized": 0, "failed": 0, "skipped_budget": 0, "dropped": 0}
+
+        queued = self.fetch_queued(self.max_items)
+        queued_bnos = self.fetch_queued_bnos()
+        if queued is None or queued_bnos is None:
+            return report
+
+        # 대기열에서 빠진 항목(렌더 완료/실패)의 매니페스트 정리 (오디오는 캐시 LRU에 맡김)
+        # max_items 밖이라도 아직 대기 중인 항목은 유지 (우선순위가 오르면 그대로 재사용)
+        manifests = self.list_manifests()
+        for bno in list(manifests):
+            if bno not in queued_bnos:
+                self._manifest_path(bno).unlink(missing_ok=True)
+                manifests.pop(bno)
+                report["dropped"] += 1
+
+        if not queued:
+            return report
+
+        if not persona_manager.persona_cache:
+            persona_manager.fetch_all_personas()
+
+        used_bytes = self.prefetched_bytes(manifests)
+        TEMP_DIR.mkdir(exist_ok=True)
+
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR, prefix="prefetch_") as tmp:
+            for item in queued:
+                if used_bytes >= self.max_bytes:
+                    report["skipped_budget"] += 1
+                    continue
+
+                try:
+                    result = self.prefetch_item(item, Path(tmp))
+                except Exception as e:
+                    logger.error(f"선합성 실패: bno={item['bno']}: {e}")
+                    report["failed"] += 1
+                    continue
+
+                report[result["status"]] += 1
+                used_bytes += result["bytes"]
+
+        logger.info(
+            f"🔮 TTS 선합성: 준비됨 {report['ready']}, 합성 {report['synthesized']}, "
+            f"실패 {report['failed']}, 예산 초과 {report['skipped_budget']}, "
+            f"정리 {report['dropped']} ({used_bytes / 1024 / 1024:.1f}MB / "
+            f"{self.max_bytes / 1024 / 1024:.0f}MB)"
+        )
+        return report
+
+
+# ===============================
+# 하위 호환 함수
+# ===============================
+def run_prefetch(db_engine: Engine) -> Dict[str, Any]:
+    """선합성 1회 실행"""
+    return TtsPrefetcher(db_engine).run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="shorts_queue TTS 선합성")
+    parser.add_argument("--loop", action="store_true", help=f"{TTS_PREFETCH_INTERVAL}초 간격으로 반복")
+    parser.add_argument("--max-items", type=int, default=TTS_PREFETCH_MAX_ITEMS)
+    args = parser.parse_args()
+
+    engine = sqlalchemy.create_engine(DB_CONNECTION_STRING, pool_pre_ping=True)
+    prefetcher = TtsPrefetcher(engine, max_items=args.max_items)
+
+    while True:
+        prefetcher.run()
+        if not args.loop:
+            break
+        time.sleep(TTS_PREFETCH_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
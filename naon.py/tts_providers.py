@@ -0,0 +1,466 @@
+"""
+TTS 프로바이더 추상화
+- 공통 인터페이스: edge-tts / gTTS / 로컬 엔진(오프라인 테스트용) / HTTP
+- 프로바이더별 서킷 브레이커
+- Hedged request: 1순위가 p95 지연을 넘기면 다음 프로바이더 동시 발사,
+  먼저 성공한 결과 채택
+"""
+import asyncio
+import logging
+import math
+import os
+import random
+import threading
+import time
+import wave
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    EDGE_TTS_MAX_RATE, TTS_MAX_RETRIES, TTS_RETRY_BASE_DELAY,
+    TTS_PROVIDERS, TTS_HEDGE_ENABLED, TTS_HEDGE_DEFAULT_DELAY, TTS_HEDGE_MIN_DELAY,
+    TTS_BREAKER_FAILURES, TTS_BREAKER_RESET_SECONDS,
+    LOG_FORMAT, LOG_LEVEL
+)
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+# 남은 배속이 이 범위 안이면 PCM 처리 생략
+TEMPO_EPSILON = 0.005
+
+
+def factor_to_rate(factor: float) -> str:
+    """배속 → edge-tts rate 문자열 (1.35 → '+35%')"""
+    percent = int(round((factor - 1.0) * 100))
+    return f"{percent:+d}%"
+
+
+def split_speed(effective_speed: float, max_native: float) -> Tuple[float, float]:
+    """
+    최종 배속을 (합성기 요청 배속, PCM 잔여 배속)으로 분리
+
+    합성기 요청 rate는 정수 % 단위로 반올림되므로 잔여 배속에서 보정한다.
+    """
+    native = min(max(effective_speed, 0.5), max_native)
+    native = 1.0 + round((native - 1.0) * 100) / 100.0
+    remaining = effective_speed / native
+    if abs(remaining - 1.0) < TEMPO_EPSILON:
+        remaining = 1.0
+    return native, remaining
+
+
+# ===============================
+# 프로바이더
+# ===============================
+class TtsProvider:
+    """TTS 프로바이더 인터페이스"""
+
+    name: str = "base"
+    ext: str = "mp3"
+    # 합성기에 직접 요청 가능한 최대 배속 (1.0 = 속도 지정 불가)
+    max_rate: float = 1.0
+
+    async def synthesize(self, text: str, voice: str, rate: float, output_path: Path) -> bool:
+        """output_path에 오디오 저장, 성공 여부 반환"""
+        raise NotImplementedError
+
+
+class EdgeTtsProvider(TtsProvider):
+    """Microsoft edge-tts (무료, 속도 지정 가능)"""
+
+    name = "edge-tts"
+    ext = "mp3"
+    max_rate = EDGE_TTS_MAX_RATE
+
+    async def synthesize(self, text: str, voice: str, rate: float, output_path: Path) -> bool:
+        import edge_tts
+
+        communicate = edge_tts.Communicate(text, voice, rate=factor_to_rate(rate))
+        await communicate.save(str(output_path))
+        return output_path.exists() and output_path.stat().st_size > 0
+
+
+class GttsProvider(TtsProvider):
+    """Google gTTS (속도 지정 불가, 동기 API → 스레드 실행)"""
+
+    name = "gtts"
+    ext = "mp3"
+    max_rate = 1.0
+
+    async def synthesize(self, text: str, voice: str, rate: float, output_path: Path) -> bool:
+        from gtts import gTTS
+
+        def _save() -> bool:
+            gTTS(text=text, lang='ko', slow=False).save(str(output_path))
+            return output_path.exists()
+
+        return await asyncio.to_thread(_save)
+
+
+def render_local_tone(text: str, rate: float = 1.0, sample_rate: int = 24000) -> np.ndarray:
+    """
+    결정적 합성음 (글자당 짧은 톤, 공백은 무음)
+
+    네트워크 없이 재생 길이가 텍스트/배속에 비례하는 오디오가 필요할 때 사용.
+    """
+    char_len = int(sample_rate * 0.07 / max(rate, 0.1))
+    t = np.arange(char_len) / sample_rate
+    envelope = np.hanning(char_len)
+    chunks = []
+    for ch in text:
+        if ch.isspace():
+            chunks.append(np.zeros(char_len))
+        else:
+            freq = 180.0 + (ord(ch) % 48) * 6.0
+            chunks.append(0.3 * np.sin(2 * math.pi * freq * t) * envelope)
+    if not chunks:
+        chunks.append(np.zeros(char_len))
+    return np.concatenate(chunks)
+
+
+def write_wav(path, samples: np.ndarray, sample_rate: int = 24000) -> None:
+    """float PCM(-1~1) → 16bit mono WAV (path 또는 파일 객체)"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    target = path if hasattr(path, "write") else str(path)
+    with wave.open(target, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
+
+
+class LocalToneProvider(TtsProvider):
+    """오프라인 로컬 엔진 (테스트/벤치마크용, 네트워크 불필요)"""
+
+    name = "local"
+    ext = "wav"
+    max_rate = 4.0
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def synthesize(self, text: str, voice: str, rate: float, output_path: Path) -> bool:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        write_wav(output_path, render_local_tone(text, rate))
+        return True
+
+
+class HttpTtsProvider(TtsProvider):
+    """HTTP TTS 서버 (POST {text, voice, rate} → 오디오 바이트)"""
+
+    ext = "wav"
+    max_rate = 4.0
+
+    def __init__(self, url: str, name: str = "http", timeout: float = 30.0):
+        self.url = url
+        self.name = name
+        self.timeout = timeout
+
+    async def synthesize(self, text: str, voice: str, rate: float, output_path: Path) -> bool:
+        import aiohttp
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(self.url, json={"text": text, "voice": voice, "rate": rate}) as resp:
+                if resp.status != 200:
+                    raise RuntimeError(f"{self.name} HTTP {resp.status}")
+                output_path.write_bytes(await resp.read())
+        return output_path.stat().st_size > 0
+
+
+PROVIDER_FACTORIES = {
+    "edge-tts": EdgeTtsProvider,
+    "gtts": GttsProvider,
+    "local": LocalToneProvider,
+}
+
+
+# ===============================
+# 서킷 브레이커 / 지연 추적
+# ===============================
+class CircuitBreaker:
+    """연속 실패 시 open → reset_timeout 후 half-open 1회 시도"""
+
+    def __init__(self, failure_threshold: int = TTS_BREAKER_FAILURES,
+                 reset_timeout: float = TTS_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.half_open_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.half_open_in_flight:
+                self.half_open_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.half_open_in_flight = False
+
+    def release(self) -> None:
+        """취소된 half-open 시도 슬롯 반납"""
+        with self._lock:
+            self.half_open_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.half_open_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.half_open_in_flight = False
+
+
+class LatencyTracker:
+    """최근 성공 지연 시간 분포 (p95 기반 hedge 지연 산출)"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples: deque = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)
+        return ordered[max(0, idx)]
+
+    def hedge_delay(self) -> float:
+        if len(self.samples) < self.min_samples:
+            return TTS_HEDGE_DEFAULT_DELAY
+        return max(TTS_HEDGE_MIN_DELAY, self.percentile(0.95))
+
+
+# ===============================
+# Hedged 합성기
+# ===============================
+class HedgedSynthesizer:
+    """프로바이더 체인 + 서킷 브레이커 + hedged request"""
+
+    def __init__(
+            self,
+            providers: List[TtsProvider],
+            hedge: bool = TTS_HEDGE_ENABLED,
+            max_retries: int = TTS_MAX_RETRIES,
+            base_delay: float = TTS_RETRY_BASE_DELAY
+    ):
+        self.providers = providers
+        self.hedge = hedge
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.breakers: Dict[str, CircuitBreaker] = {p.name: CircuitBreaker() for p in providers}
+        self.latency: Dict[str, LatencyTracker] = {p.name: LatencyTracker() for p in providers}
+        self.hedges = 0
+
+    async def _attempt(
+            self,
+            provider: TtsProvider,
+            job: Dict[str, Any],
+            semaphore: asyncio.Semaphore,
+            slot: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        프로바이더 1회 시도 (성공 시 결과, 실패 시 None)
+
+        slot: 세마포어를 잡은 시각을 기록 (hedge 시계는 대기열 시간을 빼고 이때부터)
+        """
+        output_path = Path(job["output_path"])
+        temp_path = output_path.with_name(f"{output_path.stem}.{provider.name}.{provider.ext}")
+        native, remaining = split_speed(float(job.get("speed", 1.0)), provider.max_rate)
+
+        # 세마포어 대기 중 취소돼도 half-open 시험 슬롯을 돌려줘야 함 (안 그러면 allow()가 계속 False)
+        try:
+            async with semaphore:
+                started = time.monotonic()
+                if slot is not None:
+                    slot["started"] = started
+                    slot["event"].set()
+                try:
+                    ok = await provider.synthesize(job["text"], job["voice"], native, temp_path)
+                except Exception as e:
+                    logger.warning(f"{provider.name} 실패: {output_path.name}: {e}")
+                    ok = False
+                elapsed = time.monotonic() - started
+        except asyncio.CancelledError:
+            self.breakers[provider.name].release()
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        if not ok:
+            self.breakers[provider.name].record_failure()
+            temp_path.unlink(missing_ok=True)
+            return None
+
+        self.breakers[provider.name].record_success()
+        self.latency[provider.name].record(elapsed)
+        return {
+            "success": True,
+            "temp_path": temp_path,
+            "remaining_tempo": remaining,
+            "provider": provider.name,
+            "latency": elapsed
+        }
+
+    async def _race(self, job: Dict[str, Any], semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        """
+        한 라운드: 1순위 발사 → p95 초과 또는 실패 시 다음 프로바이더 추가 발사
+
+        hedge 지연은 LatencyTracker처럼 세마포어를 잡은 뒤부터 잼
+        (배치 대기열에서 기다리는 정상 요청은 hedge하지 않음)
+        """
+        pending: Dict[asyncio.Task, TtsProvider] = {}
+        slots: Dict[asyncio.Task, Dict[str, Any]] = {}
+        next_idx = 0
+        last_task: Optional[asyncio.Task] = None
+
+        def launch() -> Optional[TtsProvider]:
+            # 브레이커는 실제 발사 시점에만 확인 (half-open 슬롯 낭비 방지)
+            nonlocal next_idx, last_task
+            while next_idx < len(self.providers):
+                provider = self.providers[next_idx]
+                next_idx += 1
+                if self.breakers[provider.name].allow():
+                    slot = {"started": None, "event": asyncio.Event()}
+                    last_task = asyncio.ensure_future(self._attempt(provider, job, semaphore, slot))
+                    pending[last_task] = provider
+                    slots[last_task] = slot
+                    return provider
+                logger.debug(f"{provider.name} 서킷 open → 건너뜀")
+            return None
+
+        last = launch()
+        if last is None:
+            logger.warning("모든 TTS 프로바이더 서킷 open")
+            return None
+
+        winner: Optional[Dict[str, Any]] = None
+        try:
+            while pending and winner is None:
+                timeout = None
+                acquired: Optional[asyncio.Future] = None
+                if self.hedge and next_idx < len(self.providers):
+                    slot = slots.get(last_task)
+                    if slot is None or slot["started"] is not None:
+                        started = slot["started"] if slot else time.monotonic()
+                        timeout = max(0.0, self.latency[last.name].hedge_delay() - (time.monotonic() - started))
+                    else:
+                        # 아직 세마포어 대기 중 → 슬롯을 잡을 때까지 hedge 시계를 돌리지 않음
+                        acquired = asyncio.ensure_future(slot["event"].wait())
+
+                waiters = set(pending.keys()) | ({acquired} if acquired else set())
+                done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if acquired is not None:
+                    acquired.cancel()
+                    done.discard(acquired)
+                    if not done:
+                        continue
+
+                if not done:
+                    hedged = launch()
+                    if hedged:
+                        self.hedges += 1
+                        logger.info(f"⏩ hedge: {last.name} p95 초과 → {hedged.name} 동시 요청")
+                        last = hedged
+                    continue
+
+                for task in done:
+                    pending.pop(task)
+                    slots.pop(task, None)
+                    result = task.result()
+                    if result and winner is None:
+                        winner = result
+                    elif result:
+                        result["temp_path"].unlink(missing_ok=True)
+
+                # 실패한 경우 다음 프로바이더 즉시 발사
+                if winner is None:
+                    last = launch() or last
+            return winner
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                leftovers = await asyncio.gather(*pending.keys(), return_exceptions=True)
+                for result in leftovers:
+                    if isinstance(result, dict):
+                        result["temp_path"].unlink(missing_ok=True)
+
+    async def synthesize(self, job: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """
+        job 합성 (라운드 실패 시 지터 백오프 후 재시도)
+
+        Returns:
+            {'success', 'output_path', 'remaining_tempo', 'provider'}
+        """
+        output_path = Path(job["output_path"])
+
+        for attempt in range(1, self.max_retries + 1):
+            result = await self._race(job, semaphore)
+            if result:
+                final_path = output_path.with_suffix(result["temp_path"].suffix)
+                os.replace(result["temp_path"], final_path)
+                return {
+                    "success": True,
+                    "output_path": final_path,
+                    "remaining_tempo": result["remaining_tempo"],
+                    "provider": result["provider"]
+                }
+
+            if attempt < self.max_retries:
+                delay = random.uniform(0, self.base_delay * (2 ** (attempt - 1)))
+                logger.warning(
+                    f"TTS 라운드 실패 (시도 {attempt}/{self.max_retries}) "
+                    f"| {delay:.2f}초 후 재시도: {output_path.name}"
+                )
+                await asyncio.sleep(delay)
+
+        logger.error(f"TTS 최종 실패: {output_path.name}")
+        return {"success": False, "output_path": output_path, "remaining_tempo": 1.0, "provider": "none"}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """프로바이더별 브레이커 상태 / 지연 통계"""
+        return {
+            name: {
+                "state": self.breakers[name].state,
+                "p50": self.latency[name].percentile(0.50),
+                "p95": self.latency[name].percentile(0.95),
+                "samples": len(self.latency[name].samples)
+            }
+            for name in self.breakers
+        }
+
+
+def build_synthesizer(names: List[str] = TTS_PROVIDERS, **kwargs) -> HedgedSynthesizer:
+    """설정된 프로바이더 이름 목록으로 합성기 생성"""
+    providers = []
+    for name in names:
+        factory = PROVIDER_FACTORIES.get(name.strip())
+        if factory is None:
+            logger.warning(f"알 수 없는 TTS 프로바이더 무시: {name}")
+            continue
+        providers.append(factory())
+    return HedgedSynthesizer(providers, **kwargs)
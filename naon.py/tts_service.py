@@ -0,0 +1,213 @@
+"""
+TTS 배치 합성 모듈
+- 여러 파트(여러 대본)를 하나의 이벤트 루프에서 동시 합성
+- 세마포어로 동시 요청 수 제한
+- 프로바이더 체인(tts_providers): 서킷 브레이커 + hedged request + 지터 백오프 재시도
+- 입력 순서 그대로 결과 반환
+- 단일 속도 모델: 최종 배속을 합성기에 직접 요청, 남는 배속만 PCM 처리
+"""
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import TTS_CONCURRENCY, LOG_FORMAT, LOG_LEVEL
+from tts_cache import tts_cache, TtsCache
+from tts_providers import HedgedSynthesizer, build_synthesizer
+from audio_utils import probe_duration
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+# 프로세스 공용 합성기 (브레이커/지연 통계를 렌더 간에 유지)
+default_synthesizer: HedgedSynthesizer = build_synthesizer()
+
+
+def _failed(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "output_path": Path(job["output_path"]),
+        "remaining_tempo": 1.0,
+        "provider": "none"
+    }
+
+
+async def synthesize_batch_async(
+        jobs: List[Dict[str, Any]],
+        concurrency: int = TTS_CONCURRENCY,
+        synthesizer: Optional[HedgedSynthesizer] = None
+) -> List[Dict[str, Any]]:
+    """배치 합성 (동시 실행, 입력 순서 보존)"""
+    synthesizer = synthesizer or default_synthesizer
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results = await asyncio.gather(
+        *(synthesizer.synthesize(job, semaphore) for job in jobs),
+        return_exceptions=True
+    )
+
+    ordered: List[Dict[str, Any]] = []
+    for job, result in zip(jobs, results):
+        if isinstance(result, BaseException):
+            logger.error(f"TTS 예외: {Path(job['output_path']).name}: {result}")
+            ordered.append(_failed(job))
+        else:
+            ordered.append(result)
+    return ordered
+
+
+def synthesize_batch(
+        jobs: List[Dict[str, Any]],
+        concurrency: Optional[int] = None,
+        synthesizer: Optional[HedgedSynthesizer] = None
+) -> List[Dict[str, Any]]:
+    """
+    배치 합성 동기 래퍼 (이벤트 루프 1회 생성)
+
+    여러 대본의 파트를 한 번에 넘겨도 됨. 결과는 jobs와 같은 순서의
+    {'success', 'output_path', 'remaining_tempo', 'provider'}.
+    """
+    if not jobs:
+        return []
+
+    return asyncio.run(synthesize_batch_async(
+        jobs,
+        concurrency=concurrency or TTS_CONCURRENCY,
+        synthesizer=synthesizer
+    ))
+
+
+def cache_key_for(job: Dict[str, Any], cache: TtsCache = tts_cache) -> str:
+    """최종 배속 기준 캐시 키"""
+    return cache.make_key(job["text"], job["voice"], f"x{float(job['speed']):.3f}")
+
+
+def synthesize_cached(
+        jobs: List[Dict[str, Any]],
+        cache: TtsCache = tts_cache,
+        concurrency: Optional[int] = None,
+        synthesizer: Optional[HedgedSynthesizer] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    캐시 조회 → 미스만 배치 합성 → 최종 배속 오디오만 캐시에 저장
+
+    Returns:
+        (jobs 순서의 결과 [{'success', 'output_path', 'remaining_tempo',
+          'duration', 'cached', 'provider'}],
+         {'hits': n, 'misses': m})
+    """
+    outputs: List[Dict[str, Any]] = [
+        dict(_failed(job), duration=None, cached=False) for job in jobs
+    ]
+    keys = [cache_key_for(job, cache) for job in jobs]
+    stats = {"hits": 0, "misses": 0}
+
+    pending: List[int] = []
+    for idx, (job, key) in enumerate(zip(jobs, keys)):
+        hit = cache.fetch(key, Path(job["output_path"]))
+        if hit is not None:
+            outputs[idx].update(
+                success=True, output_path=hit["path"], duration=hit["duration"],
+                cached=True, provider="cache"
+            )
+            stats["hits"] += 1
+        else:
+            pending.append(idx)
+            stats["misses"] += 1
+
+    results = synthesize_batch(
+        [jobs[idx] for idx in pending], concurrency=concurrency, synthesizer=synthesizer
+    )
+
+    for idx, result in zip(pending, results):
+        output_path = Path(result["output_path"])
+        success = result["success"] and output_path.exists()
+        remaining = result["remaining_tempo"]
+        duration = probe_duration(output_path) if success else None
+
+        outputs[idx].update(
+            success=success, output_path=output_path, remaining_tempo=remaining,
+            duration=duration, provider=result["provider"]
+        )
+
+        # 폴백 결과(잔여 배속 있음)는 최종본이 아니므로 캐시하지 않음 → 다음 렌더에서 재시도
+        if success and remaining == 1.0:
+            cache.put(keys[idx], output_path, duration)
+
+    return outputs, stats
+
+
+def split_text_into_parts(text: str, max_length: int = 80) -> List[str]:
+    """텍스트 분할"""
+    sentences = text.replace("! ", "!|").replace(". ", ".|").replace("? ", "?|").split("|")
+    
+    parts = []
+    current = ""
+    
+    for sent in sentences:
+        sent = sent.strip()
+        if not sent:
+            continue
+        
+        if len(current) + len(sent) <= max_length:
+            current += sent + " "
+        else:
+            if current:
+                parts.append(current.strip())
+            current = sent + " "
+    
+    if current:
+        parts.append(current.strip())
+    
+    return parts if parts else [text[:max_length]]
+
+
+def warm_cache(
+        jobs: List[Dict[str, Any]],
+        cache: TtsCache = tts_cache,
+        concurrency: Optional[int] = None,
+        synthesizer: Optional[HedgedSynthesizer] = None
+) -> Dict[str, Any]:
+    """
+    캐시에 없는 job만 합성해 적재 (선합성용, 히트/미스 통계에 반영하지 않음)
+
+    Returns:
+        {'keys': jobs 순서의 캐시 키, 'synthesized': n, 'failed': m, 'bytes': 적재 용량}
+    """
+    keys = [cache_key_for(job, cache) for job in jobs]
+    pending = [idx for idx, key in enumerate(keys) if not cache.contains(key)]
+    summary = {"keys": keys, "synthesized": 0, "failed": 0, "bytes": 0}
+
+    results = synthesize_batch(
+        [jobs[idx] for idx in pending], concurrency=concurrency, synthesizer=synthesizer
+    )
+
+    for idx, result in zip(pending, results):
+        output_path = Path(result["output_path"])
+        if not (result["success"] and output_path.exists()) or result["remaining_tempo"] != 1.0:
+            summary["failed"] += 1
+            continue
+
+        if cache.put(keys[idx], output_path, probe_duration(output_path)):
+            summary["synthesized"] += 1
+            summary["bytes"] += output_path.stat().st_size
+
+    return summary
+
+
+def build_jobs(
+        parts: List[str],
+        voice: str,
+        effective_speed: float,
+        output_dir: Path,
+        prefix: str
+) -> List[Dict[str, Any]]:
+    """대본 파트 목록 → 합성 job 목록"""
+    return [
+        {
+            "text": part,
+            "voice": voice,
+            "speed": effective_speed,
+            "output_path": output_dir / f"{prefix}_{idx}.mp3"
+        }
+        for idx, part in enumerate(parts)
+    ]